@@ -0,0 +1,546 @@
+"""
+Local storage of tool results too large for an agent's context, which agents read through
+companion tools that page, filter and aggregate them.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from mcp.types import Tool, ToolAnnotations
+
+from posthog_agent_toolkit.metrics import tokens_for_size
+from posthog_agent_toolkit.offload import Offloader
+
+PAGE_TOOL = "artifact-page"
+FILTER_TOOL = "artifact-filter"
+AGGREGATE_TOOL = "artifact-aggregate"
+ARTIFACT_TOOL_CATEGORY = "Artifacts"
+
+FILTER_OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "contains", "in")
+AGGREGATE_OPERATIONS = ("count", "count_distinct", "sum", "avg", "min", "max")
+
+# Levels of nesting described by an artifact's schema, and properties described per object
+SCHEMA_DEPTH = 4
+SCHEMA_MAX_PROPERTIES = 30
+# Items of a list sampled to describe its items
+SCHEMA_SAMPLE_SIZE = 20
+
+# Most items a page or filter returns
+MAX_PAGE_SIZE = 100
+
+# Longest string, and most list items, kept in previews
+PREVIEW_MAX_STRING = 200
+PREVIEW_MAX_ITEMS = 10
+
+_ARTIFACT_PROPERTIES: dict[str, Any] = {
+    "artifact": {"type": "string", "description": "Handle of the stored result"},
+    "path": {
+        "type": "string",
+        "description": "Dotted path of the list to read, e.g. tiles or results (default: the artifact's main list)",
+    },
+}
+
+_WHERE_SCHEMA: dict[str, Any] = {
+    "type": "array",
+    "description": "Conditions items must all meet",
+    "items": {
+        "type": "object",
+        "properties": {
+            "field": {"type": "string", "description": "Dotted path within an item, e.g. insight.name, or a column index for rows"},
+            "op": {"type": "string", "enum": list(FILTER_OPERATORS)},
+            "value": {"description": "Value to compare with; a list for in"},
+        },
+        "required": ["field", "op"],
+        "additionalProperties": False,
+    },
+}
+
+_READ_ONLY = ToolAnnotations(readOnlyHint=True, destructiveHint=False, idempotentHint=True, openWorldHint=False)
+
+PAGE_TOOL_SCHEMA = Tool(
+    name=PAGE_TOOL,
+    title="Page through a stored result",
+    description="Read items of a tool result that was too large to return whole and was stored as an artifact.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            **_ARTIFACT_PROPERTIES,
+            "offset": {"type": "integer", "minimum": 0, "description": "Index of the first item (default: 0)"},
+            "limit": {"type": "integer", "minimum": 1, "maximum": 100, "description": "Number of items (default: 20)"},
+            "fields": {"type": "array", "items": {"type": "string"}, "description": "Dotted paths of the fields to return of each item (default: all)"},
+        },
+        "required": ["artifact"],
+        "additionalProperties": False,
+    },
+    annotations=_READ_ONLY,
+)
+
+FILTER_TOOL_SCHEMA = Tool(
+    name=FILTER_TOOL,
+    title="Filter a stored result",
+    description="Find the items of a stored tool result that meet conditions, without calling PostHog again.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            **_ARTIFACT_PROPERTIES,
+            "where": _WHERE_SCHEMA,
+            "offset": {"type": "integer", "minimum": 0, "description": "Number of matches to skip (default: 0)"},
+            "limit": {"type": "integer", "minimum": 1, "maximum": 100, "description": "Number of matches (default: 20)"},
+            "fields": {"type": "array", "items": {"type": "string"}, "description": "Dotted paths of the fields to return of each item (default: all)"},
+        },
+        "required": ["artifact", "where"],
+        "additionalProperties": False,
+    },
+    annotations=_READ_ONLY,
+)
+
+AGGREGATE_TOOL_SCHEMA = Tool(
+    name=AGGREGATE_TOOL,
+    title="Aggregate a stored result",
+    description="Count, sum, average or take the minimum or maximum of the items of a stored tool result, optionally by group.",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            **_ARTIFACT_PROPERTIES,
+            "where": _WHERE_SCHEMA,
+            "group_by": {"type": "array", "items": {"type": "string"}, "description": "Dotted paths of the fields to group items by"},
+            "metrics": {
+                "type": "array",
+                "description": "Values to compute per group (default: count)",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "op": {"type": "string", "enum": list(AGGREGATE_OPERATIONS)},
+                        "field": {"type": "string", "description": "Dotted path of the field, not needed for count"},
+                    },
+                    "required": ["op"],
+                    "additionalProperties": False,
+                },
+            },
+            "limit": {"type": "integer", "minimum": 1, "maximum": 100, "description": "Number of groups, largest first (default: 50)"},
+        },
+        "required": ["artifact"],
+        "additionalProperties": False,
+    },
+    annotations=_READ_ONLY,
+)
+
+ARTIFACT_TOOL_SCHEMAS = (PAGE_TOOL_SCHEMA, FILTER_TOOL_SCHEMA, AGGREGATE_TOOL_SCHEMA)
+
+
+@dataclass(frozen=True)
+class ArtifactOptions:
+    """Options for storing large tool results as artifacts."""
+
+    # Characters of text above which a result is stored rather than returned whole
+    threshold: int = 20_000
+    # Directory to create the artifact files in (default: the system's temporary directory)
+    directory: str | None = None
+    # Artifacts kept at once; the oldest are deleted first
+    max_artifacts: int = 100
+    # Items of the main list shown to the agent when a result is stored
+    preview_items: int = 3
+    # Decoded artifacts kept in memory, so paging through one doesn't decode it every time
+    max_loaded: int = 2
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """A stored tool result and the description the agent gets instead of it."""
+
+    handle: str
+    tool: str
+    file: Path
+    # Size of the file in bytes
+    size: int
+    # Whether the result is JSON; other text is stored as a list of lines
+    is_json: bool
+    # Dotted path of the largest list in the result, which the companion tools read by default
+    main_path: str | None
+    # Length of each list in the result, by dotted path
+    lists: dict[str, int]
+    schema: dict[str, Any]
+    preview: Any
+    created_at: float = field(default_factory=time.time)
+
+    def summary(self) -> dict[str, Any]:
+        """What the agent gets instead of the result."""
+        return {
+            "artifact": self.handle,
+            "tool": self.tool,
+            "note": (
+                f"The result of {self.tool} was too large to return whole, so it was stored. "
+                f"Read it with {PAGE_TOOL}, {FILTER_TOOL} or {AGGREGATE_TOOL} instead of calling {self.tool} again."
+            ),
+            "estimated_tokens": tokens_for_size(self.size),
+            "lists": self.lists,
+            "main_list": self.main_path,
+            "schema": self.schema,
+            "preview": self.preview,
+        }
+
+
+class ArtifactStore:
+    """
+    Keeps large tool results in temporary files, and reads them back memory-mapped for the
+    companion tools.
+
+    Files are deleted when the artifact is evicted and when the store is closed.
+    """
+
+    def __init__(self, options: ArtifactOptions | None = None, offloader: Offloader | None = None):
+        """
+        Initialize the store.
+
+        Args:
+            options: Threshold, location and limits of the store (default: ArtifactOptions())
+            offloader: Runs the writing and decoding of large artifacts off the event loop
+        """
+        self.options = options or ArtifactOptions()
+        self.offloader = offloader or Offloader()
+        self._artifacts: OrderedDict[str, Artifact] = OrderedDict()
+        self._loaded: OrderedDict[str, Any] = OrderedDict()
+        self._directory: Path | None = None
+
+    def __len__(self) -> int:
+        return len(self._artifacts)
+
+    def get(self, handle: str) -> Artifact:
+        """
+        Get a stored artifact.
+
+        Raises:
+            ValueError: If there is no artifact with the handle, e.g. because it was evicted
+        """
+        artifact = self._artifacts.get(handle)
+        if artifact is None:
+            raise ValueError(f"Unknown artifact {handle!r}. It may have been evicted, so call the tool that returned it again.")
+        return artifact
+
+    async def spill(self, tool: str, text: str) -> str:
+        """
+        Store a tool result if it is longer than the threshold.
+
+        Args:
+            tool: Name of the tool that returned the text
+            text: Text returned by the tool
+
+        Returns:
+            The text itself if it is short enough or comes from a companion tool, otherwise the
+            JSON of the artifact's summary
+        """
+        if len(text) <= self.options.threshold or tool in (PAGE_TOOL, FILTER_TOOL, AGGREGATE_TOOL):
+            return text
+        artifact = await self.put(tool, text)
+        return json.dumps(artifact.summary(), separators=(",", ":"))
+
+    async def put(self, tool: str, text: str) -> Artifact:
+        """Store a tool result, evicting the oldest artifacts beyond `max_artifacts`."""
+        if self._directory is None:
+            self._directory = Path(tempfile.mkdtemp(prefix="posthog-artifacts-", dir=self.options.directory))
+        handle = uuid.uuid4().hex[:16]
+        artifact = await self.offloader.run(len(text), _write, self._directory / handle, handle, tool, text, self.options.preview_items)
+        self._artifacts[handle] = artifact
+        while len(self._artifacts) > self.options.max_artifacts:
+            _, evicted = self._artifacts.popitem(last=False)
+            self._loaded.pop(evicted.handle, None)
+            evicted.file.unlink(missing_ok=True)
+        return artifact
+
+    async def load(self, handle: str) -> Any:
+        """Read a stored result back, decoded."""
+        artifact = self.get(handle)
+        if handle in self._loaded:
+            self._loaded.move_to_end(handle)
+            return self._loaded[handle]
+        value = await self.offloader.run(artifact.size, _read, artifact.file, artifact.is_json)
+        self._loaded[handle] = value
+        while len(self._loaded) > self.options.max_loaded:
+            self._loaded.popitem(last=False)
+        return value
+
+    async def answer(self, tool: str, arguments: dict[str, Any]) -> str:
+        """
+        Run a companion tool against a stored artifact.
+
+        Raises:
+            ValueError: If the artifact, its list or the arguments are invalid
+        """
+        handle = arguments.get("artifact")
+        if not handle:
+            raise ValueError("artifact is required.")
+        artifact = self.get(handle)
+        path = arguments.get("path", artifact.main_path)
+        if path is None:
+            raise ValueError(f"The artifact has no list to read; its schema is {json.dumps(artifact.schema)}.")
+        items = _resolve(await self.load(handle), path)
+        offset = max(0, arguments.get("offset") or 0)
+        limit = min(max(1, arguments.get("limit") or 20), MAX_PAGE_SIZE)
+
+        if tool == PAGE_TOOL:
+            result = {"path": path, "total": len(items), "offset": offset, "items": _select(items[offset : offset + limit], arguments.get("fields"))}
+        elif tool == FILTER_TOOL:
+            matched = filter_items(items, arguments.get("where") or [])
+            result = {"path": path, "matches": len(matched), "offset": offset, "items": _select(matched[offset : offset + limit], arguments.get("fields"))}
+        elif tool == AGGREGATE_TOOL:
+            matched = filter_items(items, arguments.get("where") or [])
+            groups = aggregate_items(matched, arguments.get("group_by") or [], arguments.get("metrics") or [{"op": "count"}])
+            result = {"path": path, "items": len(matched), "groups": groups[: min(max(1, arguments.get("limit") or 50), MAX_PAGE_SIZE)]}
+        else:
+            raise ValueError(f"{tool} is not an artifact tool.")
+        return json.dumps(result, separators=(",", ":"), default=str)
+
+    def close(self) -> None:
+        """Delete all artifacts and their files."""
+        self._artifacts.clear()
+        self._loaded.clear()
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+
+def filter_items(items: list[Any], where: list[dict[str, Any]]) -> list[Any]:
+    """
+    Get the items that meet all conditions.
+
+    Args:
+        items: Items of a list in an artifact
+        where: Conditions like {"field": "aggregations.users", "op": "gt", "value": 100}
+
+    Raises:
+        ValueError: If a condition lacks a field or has an unknown operator
+    """
+    for condition in where:
+        if not isinstance(condition, dict):
+            raise ValueError(f"Conditions must be objects with a field, op and value, got {condition!r}.")
+        if not isinstance(condition.get("field"), str) or not condition["field"]:
+            raise ValueError(f"The condition {json.dumps(condition, default=str)} needs a field.")
+        if condition.get("op") not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown operator {condition.get('op')!r}, expected one of {', '.join(FILTER_OPERATORS)}.")
+    return [item for item in items if all(_meets(field_value(item, condition["field"]), condition["op"], condition.get("value")) for condition in where)]
+
+
+def aggregate_items(items: list[Any], group_by: list[str], metrics: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Compute metrics over items, per group.
+
+    Args:
+        items: Items of a list in an artifact
+        group_by: Dotted paths of the fields to group by, or none for a single group
+        metrics: Metrics like {"op": "sum", "field": "count"}
+
+    Returns:
+        One dict per group with the group's field values and its metrics, named like "sum(count)",
+        ordered by the first metric, largest first
+
+    Raises:
+        ValueError: If a metric has an unknown operation or lacks a field
+    """
+    for metric in metrics:
+        if not isinstance(metric, dict):
+            raise ValueError(f"Metrics must be objects with an op and a field, got {metric!r}.")
+        if metric.get("op") not in AGGREGATE_OPERATIONS:
+            raise ValueError(f"Unknown operation {metric.get('op')!r}, expected one of {', '.join(AGGREGATE_OPERATIONS)}.")
+        if metric["op"] != "count" and not metric.get("field"):
+            raise ValueError(f"{metric['op']} needs a field.")
+
+    groups: dict[str, tuple[dict[str, Any], list[Any]]] = {}
+    for item in items:
+        key = {name: field_value(item, name) for name in group_by}
+        groups.setdefault(json.dumps(key, sort_keys=True, default=str), (key, []))[1].append(item)
+
+    results = []
+    for key, members in groups.values():
+        row = dict(key)
+        for metric in metrics:
+            name = metric["op"] if metric["op"] == "count" else f"{metric['op']}({metric['field']})"
+            row[name] = _compute(metric["op"], [field_value(member, metric["field"]) for member in members] if metric.get("field") else members)
+        results.append(row)
+    if metrics:
+        first = next(name for name in results[0] if name not in group_by) if results else None
+        results.sort(key=lambda row: (row[first] is not None, row[first] if isinstance(row[first], int | float) else 0), reverse=True)
+    return results
+
+
+def field_value(item: Any, path: str) -> Any:
+    """Get the value at a dotted path within an item, with list indexes as numbers, or None if it is missing."""
+    value = item
+    for part in path.split(".") if path else ():
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.lstrip("-").isdigit() and -len(value) <= int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value
+
+
+def _resolve(document: Any, path: str) -> list[Any]:
+    value = field_value(document, path)
+    if not isinstance(value, list):
+        raise ValueError(f"{path or 'The artifact'} is not a list.")
+    return value
+
+
+def _select(items: list[Any], fields: list[str] | None) -> list[Any]:
+    if not fields:
+        return items
+    return [{name: field_value(item, name) for name in fields} for item in items]
+
+
+def _meets(value: Any, operator: str, expected: Any) -> bool:
+    try:
+        if operator == "eq":
+            return value == expected
+        if operator == "ne":
+            return value != expected
+        if operator == "contains":
+            if isinstance(value, list):
+                return expected in value
+            return value is not None and str(expected).lower() in str(value).lower()
+        if operator == "in":
+            return isinstance(expected, list) and value in expected
+        if value is None or expected is None:
+            return False
+        if operator == "gt":
+            return value > expected
+        if operator == "gte":
+            return value >= expected
+        if operator == "lt":
+            return value < expected
+        return value <= expected
+    except TypeError:
+        # Values of different types, e.g. a string compared with a number, don't match
+        return False
+
+
+def _compute(operation: str, values: list[Any]) -> Any:
+    if operation == "count":
+        return len(values)
+    if operation == "count_distinct":
+        return len({json.dumps(value, sort_keys=True, default=str) for value in values})
+    numbers = [value for value in values if isinstance(value, int | float) and not isinstance(value, bool)]
+    if not numbers:
+        return None
+    if operation == "sum":
+        return sum(numbers)
+    if operation == "avg":
+        return sum(numbers) / len(numbers)
+    return min(numbers) if operation == "min" else max(numbers)
+
+
+def _write(file: Path, handle: str, tool: str, text: str, preview_items: int) -> Artifact:
+    """Write a result to its file and describe it. Runs in the offloader's executor for large results."""
+    try:
+        value = json.loads(text)
+        is_json = True
+    except ValueError:
+        value = text.splitlines()
+        is_json = False
+    data = text.encode("utf-8")
+    # Write to a temporary name first, so the file is never read half-written
+    partial = file.with_suffix(".partial")
+    partial.write_bytes(data)
+    os.replace(partial, file)
+
+    lists = dict(_lists(value))
+    main_path = max(lists, key=lists.__getitem__) if lists else None
+    preview = _truncate(_resolve(value, main_path)[:preview_items] if main_path is not None else value)
+    return Artifact(handle, tool, file, len(data), is_json, main_path, lists, describe(value), preview)
+
+
+def _read(file: Path, is_json: bool) -> Any:
+    """Read a result back from its file through a memory map, rather than buffered reads."""
+    with open(file, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        # Decode the mapped pages straight into text, without copying them into bytes first
+        text = str(mapped, "utf-8")
+    return json.loads(text) if is_json else text.splitlines()
+
+
+def _lists(value: Any, path: str = "", depth: int = 0) -> list[tuple[str, int]]:
+    # Lists within lists, such as the series of each tile's insight, are reached through their parent
+    if isinstance(value, list):
+        return [(path, len(value))]
+    if isinstance(value, dict) and depth < SCHEMA_DEPTH:
+        return [found for key, item in value.items() for found in _lists(item, f"{path}.{key}" if path else key, depth + 1)]
+    return []
+
+
+def describe(value: Any, depth: int = 0) -> dict[str, Any]:
+    """
+    Describe the shape of decoded JSON in the manner of a JSON Schema, sampling the items of lists.
+
+    Args:
+        value: Decoded JSON
+        depth: Nesting level of `value`; deeper than `SCHEMA_DEPTH` only the type is given
+
+    Returns:
+        The schema, with the length of each list under "length"
+    """
+    if isinstance(value, dict):
+        schema: dict[str, Any] = {"type": "object"}
+        if depth < SCHEMA_DEPTH:
+            keys = list(value)
+            schema["properties"] = {key: describe(value[key], depth + 1) for key in keys[:SCHEMA_MAX_PROPERTIES]}
+            if len(keys) > SCHEMA_MAX_PROPERTIES:
+                schema["more_properties"] = len(keys) - SCHEMA_MAX_PROPERTIES
+        return schema
+    if isinstance(value, list):
+        schema = {"type": "array", "length": len(value)}
+        if value and depth < SCHEMA_DEPTH:
+            schema["items"] = _merge([describe(item, depth + 1) for item in value[:SCHEMA_SAMPLE_SIZE]])
+        return schema
+    if value is None:
+        return {"type": "null"}
+    if isinstance(value, bool):
+        return {"type": "boolean"}
+    if isinstance(value, int):
+        return {"type": "integer"}
+    if isinstance(value, float):
+        return {"type": "number"}
+    return {"type": "string"}
+
+
+def _merge(schemas: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine the schemas of sampled list items into one."""
+    # Schemas merged before may have several types already
+    types = list(dict.fromkeys(kind for schema in schemas for kind in (schema["type"] if isinstance(schema["type"], list) else [schema["type"]])))
+    if len(types) > 1:
+        return {"type": types}
+    merged = dict(schemas[0])
+    merged.pop("length", None)
+    if types[0] == "object":
+        properties: dict[str, list[dict[str, Any]]] = {}
+        for schema in schemas:
+            for key, child in schema.get("properties", {}).items():
+                properties.setdefault(key, []).append(child)
+        if properties:
+            merged["properties"] = {key: _merge(children) for key, children in list(properties.items())[:SCHEMA_MAX_PROPERTIES]}
+    elif types[0] == "array":
+        items = [schema["items"] for schema in schemas if "items" in schema]
+        if items:
+            merged["items"] = _merge(items)
+    return merged
+
+
+def _truncate(value: Any) -> Any:
+    """Shorten long strings and lists within decoded JSON for a preview."""
+    if isinstance(value, str) and len(value) > PREVIEW_MAX_STRING:
+        return value[:PREVIEW_MAX_STRING] + "..."
+    if isinstance(value, list):
+        items = [_truncate(item) for item in value[:PREVIEW_MAX_ITEMS]]
+        if len(value) > PREVIEW_MAX_ITEMS:
+            items.append(f"... {len(value) - PREVIEW_MAX_ITEMS} more")
+        return items
+    if isinstance(value, dict):
+        return {key: _truncate(item) for key, item in value.items()}
+    return value
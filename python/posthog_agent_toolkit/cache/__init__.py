@@ -0,0 +1,50 @@
+"""
+Caches scoped to one API key, mirroring `ScopedCache` of the TypeScript server.
+
+The toolkit keeps its tool list, cached read results and active organization/project in a
+`ScopedCache`. With a backend shared between processes, such as SQLite or Redis, the workers of a
+server warm these caches once rather than each on its own.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Any
+
+
+class ScopedCache(ABC):
+    """
+    Stores JSON-compatible values under string keys, separately for each scope.
+
+    Values may come back as the same objects they were stored as, so they must not be changed
+    after they are set or once they are read.
+    """
+
+    def __init__(self, scope: str):
+        self.scope = scope
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        """Get the value of a key, or None if it is not set or has expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """
+        Set the value of a key.
+
+        Args:
+            key: Key within the scope
+            value: JSON-compatible value
+            ttl: Seconds after which the value expires, or None to keep it until it is deleted
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete a key, if it is set."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Delete all keys of the scope."""
+
+
+# Creates the cache of a scope, e.g. `functools.partial(RedisCache, client=client)`
+CacheFactory = Callable[[str], ScopedCache]
@@ -0,0 +1,44 @@
+"""In-process cache backend."""
+
+import time
+from typing import Any
+
+from posthog_agent_toolkit.cache import ScopedCache
+
+# Entries of the shared caches of each scope, as expiry time and value
+_cache_store: dict[str, dict[str, tuple[float | None, Any]]] = {}
+
+
+class MemoryCache(ScopedCache):
+    """
+    Keeps values in the memory of the process.
+
+    Caches of the same scope share their entries, as in the TypeScript server, unless created
+    with `shared=False`. Entries are not shared with other processes.
+    """
+
+    def __init__(self, scope: str, shared: bool = True):
+        super().__init__(scope)
+        if shared:
+            self._entries = _cache_store.setdefault(scope, {})
+        else:
+            self._entries = {}
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._entries[key] = (time.monotonic() + ttl if ttl is not None else None, value)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,71 @@
+"""
+Cache backend on a server speaking the Redis protocol, shared by the processes of any machine.
+
+Works with Redis, Valkey and other compatible servers, and with local stand-ins such as
+`fakeredis` in tests. Requires the `redis` package (`pip install posthog-agent-toolkit[redis]`).
+"""
+
+import json
+from typing import Any
+
+try:
+    import redis.asyncio as redis
+except ImportError as e:
+    raise ImportError("posthog_agent_toolkit.cache.redis requires the `redis` package. Install it with `pip install posthog-agent-toolkit[redis]`.") from e
+
+from posthog_agent_toolkit.cache import ScopedCache
+
+# Prefix of the keys of all scopes, so the cache can share a database with other data
+DEFAULT_PREFIX = "posthog-agent-toolkit:"
+
+# Keys deleted per round trip when clearing a scope
+CLEAR_BATCH_SIZE = 500
+
+
+class RedisCache(ScopedCache):
+    """
+    Keeps values on a Redis server as JSON strings, under `<prefix><scope>:<key>`.
+
+    Expiry is left to the server. Share one client, and so its connection pool, between the
+    caches of all scopes.
+    """
+
+    def __init__(self, scope: str, client: redis.Redis, prefix: str = DEFAULT_PREFIX):
+        """
+        Initialize the cache.
+
+        Args:
+            scope: Scope of the cache
+            client: Client of the server, e.g. `redis.asyncio.Redis.from_url("redis://localhost")`
+            prefix: Prefix of the keys of all scopes
+        """
+        super().__init__(scope)
+        self.client = client
+        self._prefix = f"{prefix}{scope}:"
+
+    async def get(self, key: str) -> Any | None:
+        value = await self.client.get(self._prefix + key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        encoded = json.dumps(value, separators=(",", ":"))
+        # The server only expires keys with a positive TTL
+        await self.client.set(self._prefix + key, encoded, px=max(int(ttl * 1000), 1) if ttl is not None else None)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self._prefix + key)
+
+    async def clear(self) -> None:
+        keys: list[Any] = []
+        async for key in self.client.scan_iter(match=_escape_pattern(self._prefix) + "*", count=CLEAR_BATCH_SIZE):
+            keys.append(key)
+            if len(keys) >= CLEAR_BATCH_SIZE:
+                await self.client.delete(*keys)
+                keys = []
+        if keys:
+            await self.client.delete(*keys)
+
+
+def _escape_pattern(text: str) -> str:
+    """Escape the characters of `text` that a SCAN pattern treats as wildcards."""
+    return "".join(f"\\{char}" if char in "*?[]\\" else char for char in text)
@@ -0,0 +1,97 @@
+"""Cache backend in a SQLite database, shared by the processes of one machine."""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from posthog_agent_toolkit.cache import ScopedCache
+
+T = TypeVar("T")
+
+# Seconds to wait for another process to finish writing before failing
+BUSY_TIMEOUT = 5.0
+
+
+class SQLiteStorage:
+    """
+    A database file holding the entries of any number of scopes.
+
+    Create one per process and share it between the caches of all scopes. Queries run in the
+    event loop's default thread pool, one at a time.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the database, creating it if it doesn't exist.
+
+        Args:
+            path: Path of the database file; all processes sharing the cache must use the same one
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            # Readers don't block the writer, or each other, across processes
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (scope TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL, PRIMARY KEY (scope, key))"
+            )
+            self._connection.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    async def run(self, query: Callable[[sqlite3.Connection], T]) -> T:
+        """Run a query on the database in a thread."""
+        return await asyncio.to_thread(self._run, query)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _run(self, query: Callable[[sqlite3.Connection], T]) -> T:
+        with self._lock:
+            return query(self._connection)
+
+
+class SQLiteCache(ScopedCache):
+    """
+    Keeps values in a SQLite database, shared by all processes that open the same file.
+
+    Values are stored as JSON. Expired entries are deleted when they are read, and when the
+    database is opened.
+    """
+
+    def __init__(self, scope: str, storage: SQLiteStorage):
+        super().__init__(scope)
+        self.storage = storage
+
+    async def get(self, key: str) -> Any | None:
+        def query(connection: sqlite3.Connection) -> Any | None:
+            row = connection.execute("SELECT value, expires_at FROM cache WHERE scope = ? AND key = ?", (self.scope, key)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                connection.execute("DELETE FROM cache WHERE scope = ? AND key = ? AND expires_at <= ?", (self.scope, key, time.time()))
+                return None
+            return value
+
+        value = await self.storage.run(query)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        encoded = json.dumps(value, separators=(",", ":"))
+        expires_at = time.time() + ttl if ttl is not None else None
+        await self.storage.run(
+            lambda connection: connection.execute(
+                "INSERT OR REPLACE INTO cache (scope, key, value, expires_at) VALUES (?, ?, ?, ?)", (self.scope, key, encoded, expires_at)
+            )
+        )
+
+    async def delete(self, key: str) -> None:
+        await self.storage.run(lambda connection: connection.execute("DELETE FROM cache WHERE scope = ? AND key = ?", (self.scope, key)))
+
+    async def clear(self) -> None:
+        await self.storage.run(lambda connection: connection.execute("DELETE FROM cache WHERE scope = ?", (self.scope,)))
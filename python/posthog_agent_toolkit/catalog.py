@@ -0,0 +1,82 @@
+"""A meta-tool that lists the available tools and loads the full schemas of the ones an agent picks."""
+
+import json
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from mcp.types import Tool, ToolAnnotations
+
+from posthog_agent_toolkit.tool_definitions import UNKNOWN_CATEGORY, get_tool_definitions
+
+CATALOG_TOOL = "posthog-catalog"
+
+CATALOG_TOOL_SCHEMA = Tool(
+    name=CATALOG_TOOL,
+    title="PostHog tool catalog",
+    description=(
+        "Discover and load PostHog tools. Call it without arguments to list the available tools by "
+        "category with a one-line summary each. Then call it with `load` set to the names of the tools "
+        "you need; they become available to call from your next step on."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "category": {"type": "string", "description": "Only list the tools of this category"},
+            "load": {"type": "array", "items": {"type": "string"}, "description": "Names of the tools to load"},
+        },
+        "additionalProperties": False,
+    },
+    annotations=ToolAnnotations(readOnlyHint=True, destructiveHint=False, idempotentHint=True, openWorldHint=False),
+)
+
+
+def _summary(tool: Tool, categories: Mapping[str, str]) -> tuple[str, str]:
+    definition = get_tool_definitions().get(tool.name)
+    if definition is not None:
+        return definition.category, definition.summary
+    # Tools without a bundled definition are summarized by the first sentence of their description
+    sentence = (tool.description or "").strip().split(". ", 1)[0].rstrip(".")
+    return categories.get(tool.name, UNKNOWN_CATEGORY), f"{sentence}." if sentence else ""
+
+
+def format_catalog(
+    tools: Iterable[Tool],
+    category: str | None = None,
+    loaded: Iterable[str] = (),
+    categories: Mapping[str, str] | None = None,
+) -> str:
+    """
+    List tools by category with their one-line summaries.
+
+    Args:
+        tools: Tools that can be loaded
+        category: Only list the tools of this category, ignoring case
+        loaded: Names of the tools already loaded, which are marked as such
+        categories: Categories of the tools that have no bundled definition
+
+    Returns:
+        A compact Markdown listing
+    """
+    loaded = set(loaded)
+    by_category: dict[str, list[str]] = {}
+    for tool in tools:
+        tool_category, summary = _summary(tool, categories or {})
+        if category is not None and tool_category.lower() != category.lower():
+            continue
+        marker = " (loaded)" if tool.name in loaded else ""
+        by_category.setdefault(tool_category, []).append(f"- {tool.name}{marker}: {summary}")
+
+    if not by_category:
+        return f"No tools in category {category!r}." if category is not None else "No tools available."
+    sections = [f"## {name}\n" + "\n".join(lines) for name, lines in sorted(by_category.items())]
+    return "\n\n".join(sections) + f'\n\nLoad tools with {CATALOG_TOOL} {{"load": ["tool-name", ...]}}.'
+
+
+def format_loaded(tools: Iterable[Tool], unknown: Iterable[str] = ()) -> str:
+    """Describe newly loaded tools with their full input schemas, and name the tools that do not exist."""
+    loaded: list[dict[str, Any]] = [{"name": tool.name, "description": tool.description, "inputSchema": tool.inputSchema} for tool in tools]
+    result: dict[str, Any] = {"loaded": loaded}
+    unknown = list(unknown)
+    if unknown:
+        result["unknown"] = unknown
+    return json.dumps(result)
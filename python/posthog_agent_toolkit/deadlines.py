@@ -0,0 +1,98 @@
+"""Deadlines of tool calls: a timeout per call, and an optional deadline shared by all calls of an agent run."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+# Seconds a call of a tool that usually takes longer than most may run, by tool. Queries of
+# event data can take minutes, while reads of entities and listings return within seconds.
+TOOL_TIMEOUTS: dict[str, float] = {
+    "query-run": 300.0,
+    "query-generate-hogql-from-question": 180.0,
+    "insight-query": 180.0,
+    "experiment-results-get": 120.0,
+    "survey-stats": 120.0,
+    "surveys-global-stats": 120.0,
+    "error-triage": 180.0,
+    "dashboard-snapshot": 300.0,
+}
+
+# Seconds a call of any other tool may run
+DEFAULT_TIMEOUT = 60.0
+
+# Time by which every call made in the current context must finish, from time.monotonic()
+_deadline: ContextVar[float | None] = ContextVar("posthog_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Limit all tool calls made within the context, e.g. by an agent run, to finish in the given time.
+
+    Calls still running when the deadline passes are cancelled. Nested deadlines can only shorten
+    the one they are in.
+
+    Args:
+        seconds: Seconds from now until the deadline
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(current, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> float | None:
+    """The deadline of the current context from time.monotonic(), or None without one."""
+    return _deadline.get()
+
+
+def call_deadline(tool: str, timeout: float | None, timeouts: Mapping[str, float], default_timeout: float | None) -> float | None:
+    """
+    Get the time by which a call must finish, from time.monotonic().
+
+    Args:
+        tool: Name of the tool being called
+        timeout: Seconds this call may take, overriding the tool's timeout
+        timeouts: Seconds calls may take by tool
+        default_timeout: Seconds calls of tools not in `timeouts` may take, or None for no limit
+
+    Returns:
+        The earlier of the call's timeout and the deadline of the current context, or None if
+        neither applies
+    """
+    if timeout is None:
+        timeout = timeouts.get(tool, default_timeout)
+    at = time.monotonic() + timeout if timeout is not None else None
+    current = _deadline.get()
+    if current is None or at is None:
+        return current if at is None else at
+    return min(current, at)
+
+
+@asynccontextmanager
+async def enforce(at: float | None) -> AsyncIterator[None]:
+    """
+    Cancel the code run within the context once a deadline passes, and make it the deadline of
+    the calls made within the context.
+
+    Args:
+        at: Deadline from time.monotonic(), or None for no deadline
+
+    Raises:
+        TimeoutError: If the deadline passes before the context exits
+    """
+    if at is None:
+        yield
+        return
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(current, at))
+    try:
+        async with asyncio.timeout(at - time.monotonic()):
+            yield
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,300 @@
+"""An in-memory index of each project's event and property definitions, searchable without calling the server."""
+
+import asyncio
+import bisect
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from mcp.types import Tool, ToolAnnotations
+
+from posthog_agent_toolkit.metrics import MetricsSink, NoopMetricsSink
+from posthog_agent_toolkit.offload import Offloader
+from posthog_agent_toolkit.tool_definitions import get_tool_category
+
+logger = logging.getLogger(__name__)
+
+EVENTS_TOOL = "event-definitions-list"
+PROPERTIES_TOOL = "properties-list"
+
+# Local tool that searches the index, offered to agents when the index is enabled
+SEARCH_TOOL = "definitions-search"
+SEARCH_TOOL_CATEGORY = "Events & properties"
+
+NGRAM_SIZE = 3
+
+# Minimum share of n-grams a name must have in common with the query to count as a fuzzy match
+MIN_SIMILARITY = 0.3
+
+SEARCH_KINDS = ("event", "event_property", "person_property")
+
+SEARCH_TOOL_SCHEMA = Tool(
+    name=SEARCH_TOOL,
+    title="Search events and properties",
+    description=(
+        "Search the event names, event properties or person properties of the project by name. "
+        "Matches prefixes and substrings and tolerates typos, so use it to find the exact name to use in a query."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "Name or part of a name to look for"},
+            "kind": {"type": "string", "enum": list(SEARCH_KINDS), "description": "What to search"},
+            "eventName": {"type": "string", "description": "Event whose properties to search, required for event_property"},
+            "limit": {"type": "integer", "minimum": 1, "maximum": 100, "description": "Maximum number of results (default: 20)"},
+        },
+        "required": ["query", "kind"],
+        "additionalProperties": False,
+    },
+    annotations=ToolAnnotations(readOnlyHint=True, destructiveHint=False, idempotentHint=True, openWorldHint=False),
+)
+
+# Fetches a tool's text result with the given organization/project context applied
+DefinitionsFetcher = Callable[[str, dict[str, Any], dict[str, dict[str, Any]]], Awaitable[str]]
+
+
+def _ngrams(key: str) -> set[str]:
+    # Pad with spaces so that the start and end of a name weigh in, which favours prefix matches
+    padded = f" {key} "
+    return {padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """
+    Definitions indexed by name for prefix, substring and fuzzy search.
+
+    Strings are interned, since the same property names and types repeat across events, and every
+    name is lower-cased and split into character n-grams once when the index is built.
+    """
+
+    def __init__(self, entries: list[dict[str, Any]]):
+        self.entries = [
+            {sys.intern(k): sys.intern(v) if isinstance(v, str) else v for k, v in entry.items()} for entry in entries if isinstance(entry.get("name"), str)
+        ]
+        self._keys = [entry["name"].lower() for entry in self.entries]
+        self._order = sorted(range(len(self._keys)), key=self._keys.__getitem__)
+        self._sorted_keys = [self._keys[i] for i in self._order]
+        self._postings: dict[str, list[int]] = {}
+        self._ngram_counts: list[int] = []
+        for position, key in enumerate(self._keys):
+            ngrams = _ngrams(key)
+            self._ngram_counts.append(len(ngrams))
+            for ngram in ngrams:
+                self._postings.setdefault(ngram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def prefix(self, query: str) -> list[int]:
+        """Positions of the names starting with `query`, in alphabetical order."""
+        query = query.lower()
+        start = bisect.bisect_left(self._sorted_keys, query)
+        end = bisect.bisect_left(self._sorted_keys, query + "\uffff", lo=start)
+        return self._order[start:end]
+
+    def filter(self, query: str) -> list[dict[str, Any]]:
+        """
+        Get the definitions whose name contains `query`, ignoring case, like the server's search.
+
+        Returns:
+            Matching definitions, names starting with the query first
+        """
+        query = query.lower()
+        if not query:
+            return list(self.entries)
+        prefixed = self.prefix(query)
+        seen = set(prefixed)
+        contained = [position for position in self._candidates(query) if position not in seen and query in self._keys[position]]
+        return [self.entries[position] for position in [*prefixed, *sorted(contained)]]
+
+    def search(self, query: str, limit: int = 20) -> list[dict[str, Any]]:
+        """
+        Rank definitions by how well their name matches `query`, tolerating typos.
+
+        Exact matches come first, then prefix matches, then other substrings, then names that share
+        enough n-grams with the query.
+
+        Args:
+            query: Name or part of a name
+            limit: Maximum number of results
+
+        Returns:
+            The best matching definitions
+        """
+        query = query.lower().strip()
+        if not query:
+            return self.entries[:limit]
+
+        ranked: list[int] = []
+        seen: set[int] = set()
+
+        def add(positions: list[int]) -> None:
+            for position in positions:
+                if position not in seen:
+                    seen.add(position)
+                    ranked.append(position)
+
+        prefixed = self.prefix(query)
+        add(sorted(prefixed, key=lambda position: len(self._keys[position])))
+        if len(ranked) < limit:
+            add(sorted((p for p in self._candidates(query) if query in self._keys[p]), key=lambda position: len(self._keys[position])))
+        if len(ranked) < limit:
+            add(self._fuzzy(query))
+        return [self.entries[position] for position in ranked[:limit]]
+
+    def _candidates(self, query: str) -> list[int]:
+        # Names containing the query contain all of its inner n-grams, so intersect their postings
+        if len(query) < NGRAM_SIZE:
+            return list(range(len(self._keys)))
+        inner = [query[i : i + NGRAM_SIZE] for i in range(len(query) - NGRAM_SIZE + 1)]
+        postings = sorted((self._postings.get(ngram, []) for ngram in inner), key=len)
+        candidates = set(postings[0])
+        for positions in postings[1:]:
+            candidates.intersection_update(positions)
+            if not candidates:
+                break
+        return sorted(candidates)
+
+    def _fuzzy(self, query: str) -> list[int]:
+        ngrams = _ngrams(query)
+        shared: Counter[int] = Counter()
+        for ngram in ngrams:
+            shared.update(self._postings.get(ngram, ()))
+        scored = []
+        for position, count in shared.items():
+            # Dice coefficient of the two n-gram sets
+            similarity = 2 * count / (len(ngrams) + self._ngram_counts[position])
+            if similarity >= MIN_SIMILARITY:
+                scored.append((-similarity, self._keys[position], position))
+        return [position for _, _, position in sorted(scored)]
+
+
+@dataclass
+class _Entry:
+    index: SearchIndex
+    fetched_at: float = field(default_factory=time.monotonic)
+    refresh: asyncio.Task[None] | None = None
+
+
+class DefinitionsIndex:
+    """
+    Keeps the event and property definitions of each project in memory and answers
+    `event-definitions-list`, `properties-list` and `definitions-search` from them.
+
+    Definitions are fetched on first use, or up front with `prefetch()`. Once older than
+    `refresh_interval` seconds they are still served while a fresh copy is fetched in the background.
+    """
+
+    def __init__(
+        self,
+        fetch: DefinitionsFetcher,
+        refresh_interval: float = 300.0,
+        metrics: MetricsSink | None = None,
+        offloader: Offloader | None = None,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            fetch: Calls a tool on the server within an organization/project context and returns its text
+            refresh_interval: Seconds after which definitions are refreshed in the background
+            metrics: Sink that receives cache hits and misses
+            offloader: Builds the indexes of large listings off the event loop (default: indexes
+                of listings over a megabyte)
+        """
+        self.refresh_interval = refresh_interval
+        self.metrics = metrics or NoopMetricsSink()
+        self.offloader = offloader or Offloader()
+        self._fetch = fetch
+        self._entries: dict[tuple[str, str, str], _Entry] = {}
+        self._loading: dict[tuple[str, str, str], asyncio.Task[_Entry]] = {}
+
+    async def prefetch(self, context: dict[str, dict[str, Any]]) -> None:
+        """Load the event definitions and person properties of the project selected by `context`."""
+        await asyncio.gather(
+            self._get(EVENTS_TOOL, {}, context),
+            self._get(PROPERTIES_TOOL, {"type": "person"}, context),
+        )
+
+    async def answer(self, tool: str, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> str | None:
+        """
+        Answer a call to one of the indexed tools.
+
+        Returns:
+            The tool's text result, or None if the call cannot be answered from the index
+        """
+        if tool == SEARCH_TOOL:
+            return await self._search(arguments, context)
+        if tool == EVENTS_TOOL:
+            index = await self._get(EVENTS_TOOL, {}, context)
+            return json.dumps(index.filter(arguments["q"]) if arguments.get("q") else index.entries)
+        if tool == PROPERTIES_TOOL:
+            if arguments.get("type") not in ("event", "person") or (arguments["type"] == "event" and not arguments.get("eventName")):
+                # Let the server report the invalid arguments
+                return None
+            index = await self._get(PROPERTIES_TOOL, arguments, context)
+            return json.dumps(index.entries)
+        return None
+
+    async def aclose(self) -> None:
+        """Stop background refreshes and forget all definitions."""
+        tasks = [entry.refresh for entry in self._entries.values() if entry.refresh is not None]
+        tasks.extend(self._loading.values())
+        self._entries.clear()
+        self._loading.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _search(self, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> str:
+        kind = arguments.get("kind")
+        if kind == "event":
+            index = await self._get(EVENTS_TOOL, {}, context)
+        elif kind == "event_property":
+            if not arguments.get("eventName"):
+                raise ValueError("eventName is required to search event properties.")
+            index = await self._get(PROPERTIES_TOOL, {"type": "event", "eventName": arguments["eventName"]}, context)
+        elif kind == "person_property":
+            index = await self._get(PROPERTIES_TOOL, {"type": "person"}, context)
+        else:
+            raise ValueError(f"kind must be one of {', '.join(SEARCH_KINDS)}.")
+        return json.dumps(index.search(arguments.get("query", ""), limit=arguments.get("limit") or 20))
+
+    async def _get(self, tool: str, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> SearchIndex:
+        key = (json.dumps(context, sort_keys=True), tool, json.dumps(arguments, sort_keys=True))
+        entry = self._entries.get(key)
+        self.metrics.record_cache_access(tool, get_tool_category(tool), "definitions", entry is not None)
+        if entry is None:
+            # Concurrent calls share one fetch, which carries on if one of them is cancelled
+            loading = self._loading.get(key)
+            if loading is None:
+                loading = self._loading[key] = asyncio.create_task(self._load(key, tool, arguments, context))
+                loading.add_done_callback(lambda _task: self._loading.pop(key, None))
+            entry = await asyncio.shield(loading)
+        elif entry.refresh is None and time.monotonic() - entry.fetched_at >= self.refresh_interval:
+            entry.refresh = asyncio.create_task(self._refresh(key, entry, tool, arguments, context))
+        return entry.index
+
+    async def _load(self, key: tuple[str, str, str], tool: str, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> _Entry:
+        text = await self._fetch(tool, arguments, context)
+        entry = self._entries[key] = _Entry(index=await self.offloader.run(len(text), _build_index, text))
+        return entry
+
+    async def _refresh(self, key: tuple[str, str, str], entry: _Entry, tool: str, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> None:
+        try:
+            await self._load(key, tool, arguments, context)
+        except Exception:
+            # Keep serving the stale definitions and try again on a later use
+            logger.warning("Failed to refresh %s definitions", tool, exc_info=True)
+            entry.fetched_at = time.monotonic()
+        finally:
+            entry.refresh = None
+
+
+def _build_index(text: str) -> SearchIndex:
+    return SearchIndex(json.loads(text))
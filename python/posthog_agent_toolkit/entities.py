@@ -0,0 +1,204 @@
+"""Recently read or written entities, used to send only the fields of an update that change something."""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from posthog_agent_toolkit.cache import ScopedCache
+from posthog_agent_toolkit.cache.memory import MemoryCache
+from posthog_agent_toolkit.invalidation import ENTITY_IDS, Invalidation
+from posthog_agent_toolkit.metrics import MetricsSink, NoopMetricsSink
+from posthog_agent_toolkit.operations import equals, matches
+from posthog_agent_toolkit.operations.flags import REPLACED_FIELDS as FLAG_REPLACED_FIELDS
+from posthog_agent_toolkit.tool_definitions import get_tool_category
+
+
+@dataclass(frozen=True)
+class UpdateTool:
+    """How the payload of an update tool relates to the entity its read tool returns."""
+
+    # Feature of the tools in the tool definitions
+    feature: str
+    # Argument holding the ID of the entity, in both the update and the read tool
+    id_argument: str
+    read_tool: str
+    # Payload fields stored under the same name and in the same format in the entity; other
+    # fields are transformed by the server before they are saved, so they are always sent
+    fields: frozenset[str]
+    # Fields of the entity that identify it, in addition to the ID argument it was fetched by
+    id_fields: tuple[str, ...] = ("id",)
+    # Argument holding the payload, or None if its fields sit next to the ID argument
+    payload_argument: str | None = "data"
+    # Payload fields the server requires in every update, which are sent even when unchanged
+    required: tuple[str, ...] = ()
+    # Fields the server replaces as a whole, which are only trimmed when exactly the same as the
+    # entity's, since leaving out a key of theirs removes it; other fields are partially matched
+    replaced: frozenset[str] = frozenset()
+
+
+UPDATE_TOOLS = {
+    "dashboard-update": UpdateTool(
+        "dashboards",
+        "dashboardId",
+        "dashboard-get",
+        frozenset({"name", "description", "pinned", "tags"}),
+        replaced=frozenset({"tags"}),
+    ),
+    "insight-update": UpdateTool(
+        "insights",
+        "insightId",
+        "insight-get",
+        frozenset({"name", "description", "filters", "query", "favorited", "tags"}),
+        id_fields=("id", "short_id"),
+        required=("query",),
+        replaced=frozenset({"filters", "query", "tags"}),
+    ),
+    "update-feature-flag": UpdateTool(
+        "flags",
+        "flagKey",
+        "feature-flag-get-definition",
+        frozenset({"name", "description", "filters", "active", "tags"}),
+        id_fields=("key",),
+        replaced=FLAG_REPLACED_FIELDS,
+    ),
+    "survey-update": UpdateTool(
+        "surveys",
+        "surveyId",
+        "survey-get",
+        frozenset({"name", "description", "type", "conditions", "appearance", "archived", "responses_limit", "iteration_count"}),
+        payload_argument=None,
+        replaced=frozenset({"conditions", "appearance"}),
+    ),
+    "experiment-update": UpdateTool("experiments", "experimentId", "experiment-get", frozenset({"name", "description"})),
+}
+
+_READ_TOOLS = {tool.read_tool: tool for tool in UPDATE_TOOLS.values()}
+
+
+class EntityCache:
+    """
+    Keeps the entities returned by read and update tools for a short time, and trims update
+    payloads to the fields that differ from them.
+
+    Entities are only as fresh as the last call that returned them, so changes made elsewhere
+    within `ttl` seconds can be missed: an update that sets a field back to the cached value
+    is then skipped.
+    """
+
+    def __init__(self, ttl: float = 60.0, metrics: MetricsSink | None = None, cache: ScopedCache | None = None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds an entity is trusted after it was read or written
+            metrics: Sink that receives cache hits and misses
+            cache: Where to keep the entities, e.g. shared with other processes (default: in memory)
+        """
+        self.ttl = ttl
+        self.metrics = metrics or NoopMetricsSink()
+        # Each entity is stored once per ID it can be named by, along with those keys and the
+        # time it was stored, under `entities:<context>:<feature>:<argument>=<ID>`
+        self.cache = cache or MemoryCache("entities", shared=False)
+
+    def stores(self, tool: str) -> bool:
+        """Whether the cache keeps the entities returned by a tool."""
+        return tool in UPDATE_TOOLS or tool in _READ_TOOLS
+
+    async def store(self, tool: str, arguments: dict[str, Any], text: str, context: str, entity: Any = None) -> None:
+        """
+        Remember the entity returned by a read or update tool.
+
+        Args:
+            tool: Name of the tool that returned the entity
+            arguments: Arguments of the call
+            text: Text returned by the tool
+            context: Key of the organization/project the call ran in
+            entity: The text decoded from JSON, if the caller has decoded it already
+        """
+        spec = UPDATE_TOOLS.get(tool) or _READ_TOOLS.get(tool)
+        if spec is None:
+            return
+        if entity is None:
+            try:
+                entity = json.loads(text)
+            except ValueError:
+                return
+        if not isinstance(entity, dict):
+            return
+        # The IDs update tools look entities up by, and the ones invalidations name them by
+        names = [(spec.id_argument, arguments.get(spec.id_argument)), *((spec.id_argument, entity.get(field)) for field in spec.id_fields)]
+        names.extend((argument, entity.get(field)) for argument, fields in ENTITY_IDS.get(spec.feature, {}).items() for field in fields)
+        keys = list(dict.fromkeys(self._key(context, spec.feature, argument, value) for argument, value in names if value is not None))
+        entry = {"stored_at": time.time(), "text": text, "keys": keys}
+        await asyncio.gather(*(self.cache.set(key, entry, self.ttl) for key in keys))
+
+    async def trim(self, tool: str, arguments: dict[str, Any], context: str) -> tuple[dict[str, Any], str | None]:
+        """
+        Drop the fields of an update that would not change the cached entity.
+
+        Args:
+            tool: Name of the tool being called
+            arguments: Arguments of the call
+            context: Key of the organization/project the call runs in
+
+        Returns:
+            The arguments to send, and the cached entity's text if nothing would change and
+            the call can be skipped
+        """
+        spec = UPDATE_TOOLS.get(tool)
+        if spec is None or spec.id_argument not in arguments:
+            return arguments, None
+        if spec.payload_argument is None:
+            payload = {key: value for key, value in arguments.items() if key != spec.id_argument}
+        else:
+            payload = arguments.get(spec.payload_argument)
+        if not isinstance(payload, dict):
+            return arguments, None
+
+        entry, invalidated_at = await asyncio.gather(
+            self.cache.get(self._key(context, spec.feature, spec.id_argument, arguments[spec.id_argument])),
+            self.cache.get(self._invalidated_key(context, spec.feature)),
+        )
+        if entry is not None and (time.time() - entry["stored_at"] >= self.ttl or (invalidated_at is not None and entry["stored_at"] <= invalidated_at)):
+            entry = None
+        self.metrics.record_cache_access(tool, get_tool_category(tool), "entities", entry is not None)
+        if entry is None:
+            return arguments, None
+
+        try:
+            entity = json.loads(entry["text"])
+        except ValueError:
+            return arguments, None
+        differing = {field for field, value in payload.items() if field not in spec.fields or not _unchanged(spec, field, entity.get(field), value)}
+        if not differing:
+            return arguments, entry["text"]
+        changed = {field: value for field, value in payload.items() if field in differing or field in spec.required}
+        if spec.payload_argument is None:
+            return {spec.id_argument: arguments[spec.id_argument], **changed}, None
+        return {**arguments, spec.payload_argument: changed}, None
+
+    async def invalidate(self, invalidation: Invalidation, context: str) -> None:
+        """Forget the entities changed by a write, under all of their identifiers."""
+        if invalidation.ids is None:
+            # Entities stored up to now are stale, and later ones would have expired by the time this does
+            await self.cache.set(self._invalidated_key(context, invalidation.feature), time.time(), self.ttl)
+            return
+        named = [self._key(context, invalidation.feature, argument, value) for argument, values in invalidation.ids.items() for value in values]
+        entries = await asyncio.gather(*(self.cache.get(key) for key in named))
+        stale = {*named, *(key for entry in entries if entry is not None for key in entry["keys"])}
+        await asyncio.gather(*(self.cache.delete(key) for key in stale))
+
+    @staticmethod
+    def _key(context: str, feature: str, argument: str, value: Any) -> str:
+        return f"entities:{context}:{feature}:{argument}={value}"
+
+    @staticmethod
+    def _invalidated_key(context: str, feature: str) -> str:
+        # Time any entity of the feature last changed without the write naming it
+        return f"entities:{context}:{feature}"
+
+
+def _unchanged(spec: UpdateTool, field: str, current: Any, desired: Any) -> bool:
+    return equals(current, desired) if field in spec.replaced else matches(current, desired)
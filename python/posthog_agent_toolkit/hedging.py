@@ -0,0 +1,82 @@
+"""Hedged requests: a duplicate of a slow read-only call, sent once it is slower than most calls of its tool."""
+
+import math
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class HedgingOptions:
+    """When to send a duplicate request for a slow read-only tool call."""
+
+    # Percentile of a tool's recent latencies after which a call is hedged
+    percentile: float = 95.0
+    # Calls a tool must have completed before its calls are hedged
+    min_samples: int = 20
+    # Number of recent latencies kept per tool
+    window: int = 200
+    # Lower bound of the delay in seconds, so fast tools are not hedged on jitter alone
+    min_delay: float = 0.05
+    # Extra requests allowed per hedgeable call, e.g. 0.05 for at most 5% more requests
+    budget: float = 0.05
+    # Hedges that can be saved up while calls are fast, and then sent in a burst
+    max_burst: float = 10.0
+
+
+class LatencyTracker:
+    """Keeps the latencies of the most recent calls of each tool."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._latencies: dict[str, deque[float]] = {}
+
+    def observe(self, tool: str, seconds: float) -> None:
+        latencies = self._latencies.get(tool)
+        if latencies is None:
+            latencies = self._latencies[tool] = deque(maxlen=self.window)
+        latencies.append(seconds)
+
+    def count(self, tool: str) -> int:
+        return len(self._latencies.get(tool, ()))
+
+    def percentile(self, tool: str, percentile: float) -> float | None:
+        """The given percentile of the tool's recent latencies, or None if none were observed."""
+        latencies = self._latencies.get(tool)
+        if not latencies:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+
+class Hedger:
+    """
+    Decides when to hedge a call, and limits hedges to a budget.
+
+    The budget is a token bucket: every hedgeable call adds `budget` tokens, up to `max_burst`,
+    and every hedge takes one.
+    """
+
+    def __init__(self, options: HedgingOptions | None = None):
+        self.options = options or HedgingOptions()
+        self.latencies = LatencyTracker(self.options.window)
+        self._tokens = self.options.max_burst
+
+    def delay(self, tool: str) -> float | None:
+        """
+        Get the seconds to wait for a call before hedging it, and credit the budget.
+
+        Returns:
+            The delay, or None until enough calls of the tool have been observed
+        """
+        self._tokens = min(self.options.max_burst, self._tokens + self.options.budget)
+        if self.latencies.count(tool) < self.options.min_samples:
+            return None
+        latency = self.latencies.percentile(tool, self.options.percentile)
+        return max(self.options.min_delay, latency or 0.0)
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget, if any is left."""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
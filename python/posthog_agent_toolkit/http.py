@@ -0,0 +1,270 @@
+"""Shared HTTP connection pool used by all MCP sessions of a toolkit, and compression of its responses."""
+
+import time
+import zlib
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from langchain_mcp_adapters.sessions import McpHttpClientFactory
+
+# Content codings the toolkit can decode
+SUPPORTED_ENCODINGS = ("zstd", "gzip")
+
+# Receives the content coding of a response, its size on the wire and its size once decoded
+CompressionObserver = Callable[[str, int, int], None]
+
+
+@dataclass(frozen=True)
+class HttpClientOptions:
+    """
+    Tuning options for the HTTP client created by the toolkit.
+
+    `compression` also applies to the requests of the MCP sessions when a client is passed in.
+    """
+
+    # Multiplex concurrent requests over a single connection per host
+    http2: bool = True
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    # Seconds an idle keep-alive connection is kept open
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 10.0
+    # Long enough for slow queries and for the server-sent event streams used by MCP
+    read_timeout: float = 300.0
+    write_timeout: float = 30.0
+    # Seconds to wait for a free connection from the pool
+    pool_timeout: float = 30.0
+    # Content codings to ask the server to compress responses with, in order of preference.
+    # zstd is only asked for when the `zstandard` package is installed; empty asks for none.
+    compression: tuple[str, ...] = SUPPORTED_ENCODINGS
+
+
+def create_http_client(options: HttpClientOptions | None = None) -> httpx.AsyncClient:
+    """
+    Create an HTTP client suitable for sharing between MCP sessions.
+
+    Args:
+        options: Connection pool and timeout settings (default: HttpClientOptions())
+
+    Returns:
+        An httpx.AsyncClient; the caller is responsible for closing it
+    """
+    options = options or HttpClientOptions()
+    return httpx.AsyncClient(
+        http2=options.http2,
+        limits=httpx.Limits(
+            max_connections=options.max_connections,
+            max_keepalive_connections=options.max_keepalive_connections,
+            keepalive_expiry=options.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            connect=options.connect_timeout,
+            read=options.read_timeout,
+            write=options.write_timeout,
+            pool=options.pool_timeout,
+        ),
+        follow_redirects=True,
+    )
+
+
+def available_encodings(preferred: tuple[str, ...] = SUPPORTED_ENCODINGS) -> tuple[str, ...]:
+    """
+    Get the content codings of `preferred` that can be decoded in this environment.
+
+    Raises:
+        ValueError: If a coding is not one of `SUPPORTED_ENCODINGS`
+    """
+    for encoding in preferred:
+        if encoding not in SUPPORTED_ENCODINGS:
+            raise ValueError(f"Unsupported compression {encoding!r}, expected one of {', '.join(SUPPORTED_ENCODINGS)}.")
+    if "zstd" not in preferred:
+        return preferred
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return tuple(encoding for encoding in preferred if encoding != "zstd")
+    return preferred
+
+
+def _decompressor(encoding: str) -> tuple[Any, type[Exception]]:
+    """Create a streaming decompressor for a content coding, and get the error it raises on bad input."""
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj(), zstandard.ZstdError
+    # Accept a zlib header as well as a gzip one
+    return zlib.decompressobj(zlib.MAX_WBITS | 32), zlib.error
+
+
+class _DecompressingStream(httpx.AsyncByteStream):
+    """Decompresses a response body chunk by chunk as it is read, counting the bytes before and after."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, encoding: str, observer: CompressionObserver | None):
+        self._stream = stream
+        self._encoding = encoding
+        self._observer = observer
+        self._decompressor, self._error = _decompressor(encoding)
+        self.compressed_bytes = 0
+        self.decoded_bytes = 0
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._stream:
+                self.compressed_bytes += len(chunk)
+                data = self._decompress(chunk)
+                if data:
+                    self.decoded_bytes += len(data)
+                    yield data
+        except self._error as e:
+            raise httpx.DecodingError(f"Failed to decompress the {self._encoding} response: {e}") from e
+        if self.compressed_bytes and not self._decompressor.eof:
+            raise httpx.DecodingError(f"The {self._encoding} response ended in the middle of a frame")
+
+    def _decompress(self, chunk: bytes) -> bytes:
+        # A body may hold several zstd frames or gzip members one after another, and each
+        # decompressor stops at the end of the first, leaving the rest in `unused_data`
+        parts = []
+        while chunk:
+            if self._decompressor.eof:
+                self._decompressor, _ = _decompressor(self._encoding)
+            parts.append(self._decompressor.decompress(chunk))
+            chunk = self._decompressor.unused_data if self._decompressor.eof else b""
+        return b"".join(parts)
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        await self._stream.aclose()
+        if self._observer is not None and self.compressed_bytes:
+            self._observer(self._encoding, self.compressed_bytes, self.decoded_bytes)
+
+
+class _SharedClientTransport(httpx.AsyncBaseTransport):
+    """
+    Sends requests through a shared client, leaving it open when a session closes its own client.
+
+    Responses compressed with one of `encodings` are decompressed here rather than by the
+    session's client, so their size before and after can be reported.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, encodings: tuple[str, ...] | None = None, observer: CompressionObserver | None = None):
+        self._client = client
+        self._encodings = encodings
+        self._accept_encoding = (", ".join(encodings) or "identity") if encodings is not None else None
+        self._observer = observer
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._accept_encoding is not None:
+            request.headers["Accept-Encoding"] = self._accept_encoding
+        response = await self._client.send(request, stream=True)
+        headers = response.headers
+        stream: httpx.AsyncByteStream = response.stream
+        encoding = headers.get("Content-Encoding", "").strip().lower()
+        if self._encodings and encoding in self._encodings:
+            headers = httpx.Headers([(name, value) for name, value in headers.multi_items() if name.lower() not in ("content-encoding", "content-length")])
+            stream = _DecompressingStream(stream, encoding, self._observer)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            stream=stream,
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        pass
+
+
+def shared_client_factory(
+    client: httpx.AsyncClient,
+    compression: tuple[str, ...] | None = None,
+    on_compression: CompressionObserver | None = None,
+) -> McpHttpClientFactory:
+    """
+    Build an `httpx_client_factory` for MCP connections that routes every session through `client`.
+
+    Each session still gets its own lightweight client carrying its headers and auth, so sessions
+    for different API keys can share the same connection pool. The shared client's timeouts apply
+    instead of the MCP defaults.
+
+    Args:
+        client: Client whose connection pool the sessions share
+        compression: Content codings to ask for, in order of preference, of which those that
+            can't be decoded here are left out (default: leave it to httpx)
+        on_compression: Called with the coding, compressed size and decoded size of each
+            compressed response once it has been read
+    """
+    encodings = available_encodings(compression) if compression is not None else None
+
+    def create_client(
+        headers: dict[str, str] | None = None,
+        timeout: httpx.Timeout | None = None,
+        auth: httpx.Auth | None = None,
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=_SharedClientTransport(client, encodings, on_compression),
+            headers=headers,
+            timeout=client.timeout,
+            auth=auth,
+            follow_redirects=True,
+        )
+
+    return create_client
+
+
+class ResponseTimer:
+    """
+    Measures how long the server takes to start responding to the tool calls of one session, and
+    the size of their requests.
+
+    Only the request sent right after `expect_call()` is timed, so other requests sent during a
+    call, such as the `tools/list` the MCP client sends to validate the first result of a
+    session, don't replace the call's wait.
+    """
+
+    def __init__(self):
+        # Seconds until the server started responding to the last tool call
+        self.last_wait: float | None = None
+        # Bytes in the body of the last tool call's request, as the MCP client encoded it
+        self.last_request_size: int | None = None
+        # Set from `expect_call()` until the tool call's request is sent
+        self._call_pending = False
+
+    def expect_call(self) -> None:
+        """Time the next request, which must be the tool call about to be sent."""
+        self.last_wait = None
+        self.last_request_size = None
+        self._call_pending = True
+
+    def wrap(self, factory: McpHttpClientFactory) -> McpHttpClientFactory:
+        """Add event hooks that time the tool calls to the clients created by `factory`."""
+
+        def create_client(
+            headers: dict[str, str] | None = None,
+            timeout: httpx.Timeout | None = None,
+            auth: httpx.Auth | None = None,
+        ) -> httpx.AsyncClient:
+            client = factory(headers=headers, timeout=timeout, auth=auth)
+            hooks = client.event_hooks
+            client.event_hooks = {
+                "request": [*hooks["request"], self._on_request],
+                "response": [*hooks["response"], self._on_response],
+            }
+            return client
+
+        return create_client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        if self._call_pending and request.method == "POST":
+            self._call_pending = False
+            size = request.headers.get("Content-Length")
+            self.last_request_size = int(size) if size is not None else None
+            request.extensions["posthog_sent_at"] = time.perf_counter()
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        sent_at = response.request.extensions.get("posthog_sent_at")
+        if sent_at is not None:
+            self.last_wait = time.perf_counter() - sent_at
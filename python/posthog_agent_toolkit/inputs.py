@@ -0,0 +1,108 @@
+"""
+Validation of tool arguments with the msgspec structs generated from the tool input schemas.
+
+Arguments are converted into the tool's input struct, which checks them against the same
+constraints as the Pydantic models in `schema/tool_inputs.py` at a fraction of the cost. Calls
+with invalid arguments fail before they are sent to the server, which the MCP client encodes
+them for as usual.
+
+Requires the `msgspec` package (`pip install posthog-agent-toolkit[msgspec]`).
+"""
+
+from collections.abc import Mapping
+from functools import cache
+from typing import Any
+
+try:
+    import msgspec
+except ImportError as e:
+    raise ImportError("posthog_agent_toolkit.inputs requires the `msgspec` package. Install it with `pip install posthog-agent-toolkit[msgspec]`.") from e
+
+from posthog_agent_toolkit import tool_input_structs as structs
+
+# Input struct of each tool, as the TypeScript tools name their schemas
+INPUT_TYPES: dict[str, type[msgspec.Struct]] = {
+    "add-insight-to-dashboard": structs.DashboardAddInsightSchema,
+    "dashboard-create": structs.DashboardCreateSchema,
+    "dashboard-delete": structs.DashboardDeleteSchema,
+    "dashboard-get": structs.DashboardGetSchema,
+    "dashboards-get-all": structs.DashboardGetAllSchema,
+    "dashboard-update": structs.DashboardUpdateSchema,
+    "docs-search": structs.DocumentationSearchSchema,
+    "error-details": structs.ErrorTrackingDetailsSchema,
+    "list-errors": structs.ErrorTrackingListSchema,
+    "create-feature-flag": structs.FeatureFlagCreateSchema,
+    "delete-feature-flag": structs.FeatureFlagDeleteSchema,
+    "feature-flag-get-all": structs.FeatureFlagGetAllSchema,
+    "feature-flag-get-definition": structs.FeatureFlagGetDefinitionSchema,
+    "update-feature-flag": structs.FeatureFlagUpdateSchema,
+    "experiment-get-all": structs.ExperimentGetAllSchema,
+    "experiment-create": structs.ExperimentCreateSchema,
+    "experiment-delete": structs.ExperimentDeleteSchema,
+    "experiment-update": structs.ExperimentUpdateSchema,
+    "experiment-get": structs.ExperimentGetSchema,
+    "experiment-results-get": structs.ExperimentResultsGetSchema,
+    "insight-create-from-query": structs.InsightCreateSchema,
+    "insight-delete": structs.InsightDeleteSchema,
+    "insight-get": structs.InsightGetSchema,
+    "insight-query": structs.InsightQueryInputSchema,
+    "insights-get-all": structs.InsightGetAllSchema,
+    "insight-update": structs.InsightUpdateSchema,
+    "query-run": structs.QueryRunInputSchema,
+    "query-generate-hogql-from-question": structs.InsightGenerateHogQLFromQuestionSchema,
+    "get-llm-total-costs-for-project": structs.LLMAnalyticsGetCostsSchema,
+    "organization-details-get": structs.OrganizationGetDetailsSchema,
+    "organizations-get": structs.OrganizationGetAllSchema,
+    "switch-organization": structs.OrganizationSetActiveSchema,
+    "projects-get": structs.ProjectGetAllSchema,
+    "event-definitions-list": structs.ProjectEventDefinitionsSchema,
+    "properties-list": structs.ProjectPropertyDefinitionsInputSchema,
+    "switch-project": structs.ProjectSetActiveSchema,
+    "survey-create": structs.SurveyCreateSchema,
+    "survey-get": structs.SurveyGetSchema,
+    "surveys-get-all": structs.SurveyGetAllSchema,
+    "survey-update": structs.SurveyUpdateSchema,
+    "survey-delete": structs.SurveyDeleteSchema,
+    "surveys-global-stats": structs.SurveyGlobalStatsSchema,
+    "survey-stats": structs.SurveyStatsSchema,
+}
+
+
+@cache
+def _input_type(tool: str) -> type[msgspec.Struct] | None:
+    input_type = INPUT_TYPES.get(tool)
+    if input_type is None:
+        return None
+    try:
+        # Fails like a conversion would for types msgspec does not support
+        msgspec.inspect.type_info(input_type)
+    except TypeError:
+        # msgspec can only tell the members of a union of objects apart by a tag field, which
+        # some schemas don't have, e.g. the property filters of query-run and the rating
+        # questions of surveys. The server still checks the arguments of these tools.
+        return None
+    return input_type
+
+
+def validates(tool: str) -> bool:
+    """Whether the arguments of a tool are checked by `validate_arguments`."""
+    return _input_type(tool) is not None
+
+
+def validate_arguments(tool: str, arguments: Mapping[str, Any]) -> None:
+    """
+    Check a tool's arguments against the tool's input struct.
+
+    Args:
+        tool: Name of the tool; arguments of tools without an input struct are not checked
+        arguments: Arguments of the call
+
+    Raises:
+        ValueError: If the arguments don't match the tool's input schema
+    """
+    input_type = _input_type(tool)
+    if input_type is not None:
+        try:
+            msgspec.convert(arguments, input_type)
+        except msgspec.ValidationError as e:
+            raise ValueError(f"Invalid arguments for {tool}: {e}") from e
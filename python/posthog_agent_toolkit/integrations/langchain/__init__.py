@@ -1,5 +1,6 @@
 """PostHog LangChain Integration."""
 
+from .manager import ToolkitManager
 from .toolkit import PostHogAgentToolkit
 
-__all__ = ["PostHogAgentToolkit"]
+__all__ = ["PostHogAgentToolkit", "ToolkitManager"]
@@ -0,0 +1,237 @@
+"""Per-tenant PostHog Agent Toolkits for services that act on behalf of many API keys."""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from types import TracebackType
+
+import httpx
+from langchain_core.tools import BaseTool
+from mcp.types import Tool
+
+from posthog_agent_toolkit.cache import CacheFactory
+from posthog_agent_toolkit.http import HttpClientOptions, create_http_client
+from posthog_agent_toolkit.metrics import MetricsSink, NoopMetricsSink
+from posthog_agent_toolkit.profiling import ToolCall, ToolCallHooks
+from posthog_agent_toolkit.scheduling import Scheduler
+from posthog_agent_toolkit.schemas import SchemaCompaction
+
+from .toolkit import DEFAULT_URL, PostHogAgentToolkit
+
+
+class _Tenant(ToolCallHooks):
+    """A cached toolkit, marked as used whenever one of its tools is called."""
+
+    def __init__(self, toolkit: PostHogAgentToolkit):
+        self.toolkit = toolkit
+        self.last_used_at = time.monotonic()
+        # Tool calls started and not yet ended, including those waiting for the scheduler or
+        # between the inner calls of a composite tool, which hold no session
+        self.in_flight = 0
+        toolkit.add_hooks(self)
+
+    def on_call_start(self, call: ToolCall) -> None:
+        self.last_used_at = time.monotonic()
+        self.in_flight += 1
+
+    def on_call_end(self, call: ToolCall) -> None:
+        self.last_used_at = time.monotonic()
+        self.in_flight -= 1
+
+    @property
+    def busy(self) -> bool:
+        return self.in_flight > 0 or self.toolkit.sessions_in_use > 0
+
+
+class ToolkitManager:
+    """
+    Hands out a PostHogAgentToolkit per API key from an LRU cache.
+
+    All toolkits share one HTTP connection pool and the tool schemas listed from the server,
+    while authentication, MCP sessions, caches and the active project stay isolated per tenant.
+    With a shared `cache`, a tenant's caches and active project outlive the eviction of its toolkit.
+    Toolkits are evicted when the cache is full or after `idle_timeout` seconds without use,
+    unless they have tool calls in flight. Get a toolkit from the manager for each request rather
+    than holding on to it.
+    """
+
+    def __init__(
+        self,
+        url: str = DEFAULT_URL,
+        max_size: int = 256,
+        idle_timeout: float = 900.0,
+        metrics: MetricsSink | None = None,
+        hooks: Iterable[ToolCallHooks] = (),
+        http_client: httpx.AsyncClient | None = None,
+        http_options: HttpClientOptions | None = None,
+        max_sessions_per_tenant: int = 4,
+        session_idle_timeout: float = 300.0,
+        schema_compaction: SchemaCompaction | None = None,
+        scheduler: Scheduler | None = None,
+        cache: CacheFactory | None = None,
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            url: The URL of the PostHog MCP server
+            max_size: Maximum number of tenant toolkits kept at once
+            idle_timeout: Seconds after which an unused tenant toolkit is evicted
+            metrics: Sink that receives the metrics of every tenant (default: discard them)
+            hooks: Hooks notified of the tool calls of every tenant
+            http_client: HTTP client shared by all tenants; it is not closed by the manager
+            http_options: Settings for the HTTP client created when `http_client` is not given,
+                and the compression the tenants ask for either way
+            max_sessions_per_tenant: Maximum number of MCP sessions each tenant keeps open
+            session_idle_timeout: Seconds after which an unused MCP session is closed
+            schema_compaction: Compact the input schemas of the tenants' LangChain tools
+            scheduler: Scheduler shared by all tenants, which admits their tool calls by priority
+                and takes turns between tenants
+            cache: Creates the cache of each tenant's toolkit, e.g. one shared between worker
+                processes (default: in memory, per toolkit)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+
+        self.url = url
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.metrics = metrics or NoopMetricsSink()
+        self.hooks = list(hooks)
+        self.max_sessions_per_tenant = max_sessions_per_tenant
+        self.session_idle_timeout = session_idle_timeout
+        self.schema_compaction = schema_compaction
+        self.scheduler = scheduler
+        self.cache = cache
+
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or create_http_client(http_options)
+        self.http_options = http_options
+
+        self._tenants: OrderedDict[str, _Tenant] = OrderedDict()
+        self._tool_schemas: list[Tool] | None = None
+        self._tool_schemas_lock = asyncio.Lock()
+        self._closing: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    async def __aenter__(self) -> "ToolkitManager":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def get_toolkit(self, personal_api_key: str) -> PostHogAgentToolkit:
+        """
+        Get the toolkit for an API key, creating it if needed.
+
+        Args:
+            personal_api_key: PostHog API key of the tenant
+
+        Returns:
+            The tenant's toolkit, with the shared tool schemas loaded
+        """
+        if not personal_api_key:
+            raise ValueError("A personal API key is required.")
+
+        key = self._tenant_key(personal_api_key)
+        self._evict_idle()
+
+        tenant = self._tenants.get(key)
+        if tenant is None:
+            tenant = _Tenant(self._create_toolkit(personal_api_key, key))
+            self._tenants[key] = tenant
+            self._evict_overflow()
+        else:
+            self._tenants.move_to_end(key)
+        tenant.last_used_at = time.monotonic()
+
+        if self._tool_schemas is None:
+            async with self._tool_schemas_lock:
+                if self._tool_schemas is None:
+                    self._tool_schemas = await tenant.toolkit.get_tool_schemas()
+        return tenant.toolkit
+
+    async def get_tools(self, personal_api_key: str) -> list[BaseTool]:
+        """Get the LangChain tools of the toolkit for an API key."""
+        toolkit = await self.get_toolkit(personal_api_key)
+        return await toolkit.get_tools()
+
+    def set_weight(self, personal_api_key: str, weight: float) -> None:
+        """
+        Give the tenant of an API key a larger or smaller share of the scheduler than the default weight of 1.
+
+        Raises:
+            RuntimeError: If the manager has no scheduler
+        """
+        if self.scheduler is None:
+            raise RuntimeError("The manager was created without a scheduler.")
+        self.scheduler.set_weight(self._scheduler_tenant(self._tenant_key(personal_api_key)), weight)
+
+    async def evict(self, personal_api_key: str) -> None:
+        """Close and forget the toolkit for an API key, e.g. after the key is revoked."""
+        tenant = self._tenants.pop(self._tenant_key(personal_api_key), None)
+        if tenant is not None:
+            await tenant.toolkit.aclose()
+
+    async def aclose(self) -> None:
+        """Close all tenant toolkits, and the HTTP client if the manager created it."""
+        tenants = list(self._tenants.values())
+        self._tenants.clear()
+        await asyncio.gather(*(tenant.toolkit.aclose() for tenant in tenants), *self._closing)
+        if self._owns_http_client:
+            await self.http_client.aclose()
+
+    @staticmethod
+    def _tenant_key(personal_api_key: str) -> str:
+        # Avoid keeping raw API keys around as dictionary keys
+        return hashlib.sha256(personal_api_key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _scheduler_tenant(key: str) -> str:
+        # Short enough for logs, and still unique among the tenants of one manager
+        return key[:16]
+
+    def _create_toolkit(self, personal_api_key: str, key: str) -> PostHogAgentToolkit:
+        return PostHogAgentToolkit(
+            url=self.url,
+            personal_api_key=personal_api_key,
+            metrics=self.metrics,
+            hooks=self.hooks,
+            http_client=self.http_client,
+            http_options=self.http_options,
+            max_sessions=self.max_sessions_per_tenant,
+            session_idle_timeout=self.session_idle_timeout,
+            tool_schemas=self._tool_schemas,
+            schema_compaction=self.schema_compaction,
+            scheduler=self.scheduler,
+            tenant=self._scheduler_tenant(key),
+            cache=self.cache,
+        )
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for key, tenant in list(self._tenants.items()):
+            if now - tenant.last_used_at >= self.idle_timeout and not tenant.busy:
+                self._close_in_background(self._tenants.pop(key))
+
+    def _evict_overflow(self) -> None:
+        # Least recently used first, skipping tenants with calls in flight and the one just added
+        for key, tenant in list(self._tenants.items())[:-1]:
+            if len(self._tenants) <= self.max_size:
+                return
+            if not tenant.busy:
+                self._close_in_background(self._tenants.pop(key))
+
+    def _close_in_background(self, tenant: _Tenant) -> None:
+        task = asyncio.create_task(tenant.toolkit.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
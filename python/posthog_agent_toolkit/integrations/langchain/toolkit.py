@@ -1,9 +1,128 @@
 """PostHog Agent Toolkit for LangChain using MCP."""
 
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Mapping
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from types import TracebackType
 from typing import Any
 
-from langchain_core.tools import BaseTool
+import httpx
+from langchain_core.callbacks import Callbacks, adispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.sessions import McpHttpClientFactory
+from mcp import ClientSession
+from mcp.types import CallToolResult, TextContent, Tool
+
+from posthog_agent_toolkit.artifacts import (
+    AGGREGATE_TOOL,
+    ARTIFACT_TOOL_CATEGORY,
+    ARTIFACT_TOOL_SCHEMAS,
+    FILTER_TOOL,
+    PAGE_TOOL,
+    ArtifactOptions,
+    ArtifactStore,
+)
+from posthog_agent_toolkit.cache import CacheFactory
+from posthog_agent_toolkit.cache.memory import MemoryCache
+from posthog_agent_toolkit.catalog import CATALOG_TOOL, CATALOG_TOOL_SCHEMA, format_catalog, format_loaded
+from posthog_agent_toolkit.deadlines import DEFAULT_TIMEOUT, TOOL_TIMEOUTS, call_deadline, enforce
+from posthog_agent_toolkit.definitions import SEARCH_TOOL, SEARCH_TOOL_CATEGORY, SEARCH_TOOL_SCHEMA, DefinitionsIndex
+from posthog_agent_toolkit.entities import EntityCache
+from posthog_agent_toolkit.hedging import Hedger, HedgingOptions
+from posthog_agent_toolkit.http import HttpClientOptions, create_http_client, shared_client_factory
+from posthog_agent_toolkit.invalidation import ENTITY_RESULTS, Invalidation, invalidations_for
+from posthog_agent_toolkit.metrics import MetricsSink, NoopMetricsSink, encoded_size, estimate_tokens, tokens_for_size
+from posthog_agent_toolkit.offload import DEFAULT_OFFLOAD_THRESHOLD, LoopLagMonitor, Offloader
+from posthog_agent_toolkit.operations import ToolCaller
+from posthog_agent_toolkit.operations.dashboards import SNAPSHOT_TOOL, SNAPSHOT_TOOL_CATEGORY, SNAPSHOT_TOOL_SCHEMA, snapshot_dashboard
+from posthog_agent_toolkit.operations.errors import TRIAGE_TOOL, TRIAGE_TOOL_CATEGORY, TRIAGE_TOOL_SCHEMA, triage_errors, triage_tool_arguments
+from posthog_agent_toolkit.operations.experiments import RESULTS_TOOL, ExperimentPoller, ExperimentPollers, PollingOptions
+from posthog_agent_toolkit.operations.flags import update_feature_flags
+from posthog_agent_toolkit.profiling import CompositeHooks, Phase, ToolCall, ToolCallHooks
+from posthog_agent_toolkit.progress import PROGRESS_EVENT, Progress, ProgressListener, ToolCallStream, progress_callback
+from posthog_agent_toolkit.routing import ConversationRouter, ToolRouter, tokenize, tool_document
+from posthog_agent_toolkit.scheduling import Scheduler, current_lane, lane
+from posthog_agent_toolkit.schemas import SchemaCompaction, compact_schema, compact_tool
+from posthog_agent_toolkit.sessions import PooledSession, SessionClosedError, SessionPool, is_session_terminated
+from posthog_agent_toolkit.tool_definitions import UNKNOWN_CATEGORY, get_tool_category, get_tool_definitions
+
+SERVER_NAME = "posthog"
+
+DEFAULT_URL = "https://mcp.posthog.com/mcp"
+
+# Label used for metrics that are not tied to a single tool, such as the tool list cache
+TOOLKIT_CATEGORY = "Toolkit"
+
+# Tools that change the active organization or project of an MCP session, in the order they are replayed
+CONTEXT_TOOLS = ("switch-organization", "switch-project")
+
+# Tools listing the organizations and projects the API key can access, cached per active organization
+LISTING_TOOLS = ("organizations-get", "projects-get")
+
+# Seconds the tool list and the results of the listing tools are kept in the toolkit's cache
+TOOLS_TTL = 3600.0
+LISTINGS_TTL = 600.0
+
+# Key of the toolkit's cache holding the arguments of the context tools last called successfully
+CONTEXT_KEY = "context"
+# Seconds a toolkit uses its copy of the context before reading it from the cache again, so a
+# switch made by another toolkit for the same API key is picked up within this time
+CONTEXT_REFRESH_INTERVAL = 1.0
+
+# Keys of a LangChain RunnableConfig's "configurable" dict that override the context for one run
+CONFIGURABLE_ORGANIZATION_ID = "posthog_organization_id"
+CONFIGURABLE_PROJECT_ID = "posthog_project_id"
+# Seconds each tool call of a run may take, overriding the toolkit's timeouts
+CONFIGURABLE_TIMEOUT = "posthog_timeout"
+# Scheduler lane of the tool calls of a run, e.g. "batch"
+CONFIGURABLE_PRIORITY = "posthog_priority"
+
+# Categories of the tools implemented by the toolkit itself rather than the server
+LOCAL_TOOL_CATEGORIES = {
+    SEARCH_TOOL: SEARCH_TOOL_CATEGORY,
+    CATALOG_TOOL: TOOLKIT_CATEGORY,
+    TRIAGE_TOOL: TRIAGE_TOOL_CATEGORY,
+    SNAPSHOT_TOOL: SNAPSHOT_TOOL_CATEGORY,
+    PAGE_TOOL: ARTIFACT_TOOL_CATEGORY,
+    FILTER_TOOL: ARTIFACT_TOOL_CATEGORY,
+    AGGREGATE_TOOL: ARTIFACT_TOOL_CATEGORY,
+}
+
+# Attempts made for a tool call whose session turns out to be gone
+MAX_ATTEMPTS = 2
+
+# Runs a tool implemented by the toolkit with its arguments and the organization/project context of the call
+LocalToolHandler = Callable[[dict[str, Any], dict[str, dict[str, Any]]], Awaitable[str]]
+
+# Receives the cached reads made stale by each write made through the toolkit
+InvalidationListener = Callable[[Invalidation], None]
+
+logger = logging.getLogger(__name__)
+
+# Set while a LangChain tool created by the toolkit is running, to time LangChain's own overhead
+_tool_invoked_at: ContextVar[float | None] = ContextVar("posthog_tool_invoked_at", default=None)
+
+
+class PostHogTool(StructuredTool):
+    """A LangChain tool that calls a PostHog MCP tool through the toolkit."""
+
+    async def arun(self, *args: Any, **kwargs: Any) -> Any:
+        token = _tool_invoked_at.set(time.perf_counter())
+        try:
+            return await super().arun(*args, **kwargs)
+        finally:
+            _tool_invoked_at.reset(token)
 
 
 class PostHogAgentToolkit:
@@ -12,12 +131,44 @@ class PostHogAgentToolkit:
     """
 
     _tools: list[BaseTool] | None
+    _tool_schemas: list[Tool] | None
     client: MultiServerMCPClient
+    http_client: httpx.AsyncClient
+    metrics: MetricsSink
+    hooks: CompositeHooks
 
     def __init__(
         self,
-        url: str = "https://mcp.posthog.com/mcp",
+        url: str = DEFAULT_URL,
         personal_api_key: str | None = None,
+        metrics: MetricsSink | None = None,
+        hooks: Iterable[ToolCallHooks] = (),
+        http_client: httpx.AsyncClient | None = None,
+        http_options: HttpClientOptions | None = None,
+        max_sessions: int = 10,
+        session_idle_timeout: float = 300.0,
+        tool_schemas: list[Tool] | None = None,
+        organization_id: str | None = None,
+        project_id: int | None = None,
+        index_definitions: bool = False,
+        definitions_refresh_interval: float = 300.0,
+        schema_compaction: SchemaCompaction | None = None,
+        tool_catalog: bool = False,
+        composite_tools: bool = False,
+        experiment_polling: PollingOptions | None = None,
+        skip_unchanged_writes: bool = False,
+        entity_ttl: float = 60.0,
+        hedging: HedgingOptions | None = None,
+        timeouts: Mapping[str, float] | None = None,
+        default_timeout: float | None = DEFAULT_TIMEOUT,
+        scheduler: Scheduler | None = None,
+        tenant: str = "default",
+        offload_threshold: int | None = DEFAULT_OFFLOAD_THRESHOLD,
+        offload_executor: Executor | None = None,
+        loop_lag_interval: float | None = None,
+        validate_arguments: bool = False,
+        artifacts: ArtifactOptions | None = None,
+        cache: CacheFactory | None = None,
     ):
         """
         Initialize the PostHog Agent Toolkit.
@@ -25,37 +176,900 @@ class PostHogAgentToolkit:
         Args:
             url: The URL of the PostHog MCP server (default: https://mcp.posthog.com/mcp/)
             personal_api_key: PostHog API key for authentication
+            metrics: Sink that receives the toolkit's metrics (default: discard them)
+            hooks: Hooks notified of the start, phases and end of every tool call
+            http_client: Shared HTTP client used by all MCP sessions; it is not closed by the toolkit
+            http_options: Connection pool and timeout settings for the HTTP client created when
+                `http_client` is not given, and the compression asked for either way (default:
+                HTTP/2 with keep-alive, and zstd or gzip compressed responses)
+            max_sessions: Maximum number of MCP sessions kept open for concurrent tool calls
+            session_idle_timeout: Seconds after which an unused MCP session is closed
+            tool_schemas: MCP tool definitions to use instead of listing them from the server, e.g.
+                shared between toolkits for different API keys
+            organization_id: Organization every tool call runs against, instead of the API key's default
+            project_id: Project every tool call runs against, instead of the API key's default.
+                When an organization or project is pinned, the switch tools are not offered to agents.
+            index_definitions: Keep each project's event and property definitions in memory, answer
+                event-definitions-list and properties-list from them, and offer the local
+                definitions-search tool
+            definitions_refresh_interval: Seconds after which indexed definitions are refreshed in the background
+            schema_compaction: Compact the input schemas of the LangChain tools to shrink the prompt
+                sent with every agent turn (default: use the schemas as the server defines them)
+            tool_catalog: Start agents with only the posthog-catalog tool, through which they list
+                the other tools and load the ones they need into `get_tools()`
+            composite_tools: Offer tools that make several tool calls concurrently in one agent
+                step, such as error-triage and dashboard-snapshot
+            experiment_polling: Answer experiment-results-get calls that don't ask for a refresh from
+                cached results, fetched again on the schedule of these options (default: always call the server)
+            skip_unchanged_writes: Keep the entities returned by the get and update tools of dashboards,
+                insights, feature flags, surveys and experiments, send updates to them with only the
+                fields that differ, and skip updates that would change nothing
+            entity_ttl: Seconds a kept entity is compared against, after it was last read or written
+            hedging: Send a duplicate request on another session for read-only tool calls slower
+                than most recent calls of their tool, and use whichever answers first
+                (default: no hedging)
+            timeouts: Seconds calls of each tool may take, in addition to and overriding
+                `TOOL_TIMEOUTS`. Calls still running then are cancelled on the server.
+            default_timeout: Seconds calls of other tools may take, or None for no limit
+            scheduler: Admit tool calls by priority and cost before they are sent, e.g. shared
+                by the toolkits of several tenants (default: send them as sessions become free)
+            tenant: Name the scheduler shares capacity between toolkits by
+            offload_threshold: Length of a tool result above which it is decoded and measured in
+                `offload_executor` rather than on the event loop, or None to always use the loop
+            offload_executor: Executor for decoding large results (default: the event loop's
+                default thread pool)
+            loop_lag_interval: Seconds between measurements of the event loop's lag, reported
+                with `MetricsSink.observe_loop_lag` (default: don't measure)
+            validate_arguments: Check the arguments of tool calls against the tools' input schemas
+                with msgspec before sending them. Requires the `msgspec` extra.
+            artifacts: Store the results of the LangChain tools that are longer than the
+                threshold of these options in local files, give agents a handle, schema and
+                preview instead, and offer the artifact-page, artifact-filter and
+                artifact-aggregate tools to read them (default: return results whole)
+            cache: Creates the cache of the tool list, the results of the listing tools, the
+                entities of `skip_unchanged_writes` and the active organization/project, given
+                a scope derived from the URL and API key. Pass a factory of SQLite or Redis
+                caches to share them between worker processes, e.g.
+                `functools.partial(RedisCache, client=client)` (default: in memory, for this
+                toolkit only)
         """
 
         if not personal_api_key:
             raise ValueError("A personal API key is required.")
 
-        config = self._get_config(url, personal_api_key)
+        self.metrics = metrics or NoopMetricsSink()
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or create_http_client(http_options)
+
+        compression = (http_options or HttpClientOptions()).compression
+        config = self._get_config(url, personal_api_key, shared_client_factory(self.http_client, compression, self.metrics.observe_compression))
 
         self.client = MultiServerMCPClient(config)
+        self.hooks = CompositeHooks(hooks)
+        # Avoid keeping the raw API key around in cache keys
+        scope = hashlib.sha256(f"{url}\n{personal_api_key}".encode()).hexdigest()
+        self.cache = cache(scope) if cache is not None else MemoryCache(scope, shared=False)
 
+        self.schema_compaction = schema_compaction
         self._tools: list[BaseTool] | None = None
+        self._tool_schemas: list[Tool] | None = tool_schemas
+        self._router: ToolRouter | None = None
+
+        self.tool_catalog = tool_catalog
+        self._catalog_tool: BaseTool | None = None
+        # Names of the tools loaded through the catalog, in the order they were loaded
+        self._active_tools: dict[str, None] = {}
+        self._pool = SessionPool(
+            dict(self.client.connections[SERVER_NAME]),
+            max_size=max_sessions,
+            idle_timeout=session_idle_timeout,
+            on_usage_change=lambda in_use, capacity: self.metrics.set_pool_utilization(in_use, capacity),
+        )
+
+        self.organization_id = organization_id
+        self.project_id = project_id
+        # Arguments of the context tools every session should have applied, starting with the
+        # pinned context and updated by successful calls to the switch tools. Unless the context
+        # is pinned, they are shared through the cache with the toolkits for the same API key.
+        self._context_calls = self._context_arguments(organization_id, project_id)
+        # Time the context was last read from or written to the cache
+        self._context_synced_at: float | None = None
+
+        self.offloader = Offloader(offload_threshold, offload_executor)
+        self._loop_lag = LoopLagMonitor(self.metrics, loop_lag_interval) if loop_lag_interval is not None else None
+        self._argument_validator: Callable[[str, Mapping[str, Any]], None] | None = None
+        if validate_arguments:
+            from posthog_agent_toolkit.inputs import validate_arguments as validate
+
+            self._argument_validator = validate
+
+        self.definitions = DefinitionsIndex(self._call_server, definitions_refresh_interval, self.metrics, self.offloader) if index_definitions else None
+
+        # Tools answered by the toolkit itself, offered alongside the server's tools
+        self._local_tools: dict[str, tuple[Tool, LocalToolHandler]] = {}
+        if self.definitions is not None:
+            self._local_tools[SEARCH_TOOL] = (SEARCH_TOOL_SCHEMA, self._run_definitions_search)
+        if composite_tools:
+            self._local_tools[TRIAGE_TOOL] = (TRIAGE_TOOL_SCHEMA, self._run_error_triage)
+            self._local_tools[SNAPSHOT_TOOL] = (SNAPSHOT_TOOL_SCHEMA, self._run_dashboard_snapshot)
+        self.artifacts = ArtifactStore(artifacts, self.offloader) if artifacts is not None else None
+        if self.artifacts is not None:
+            for schema in ARTIFACT_TOOL_SCHEMAS:
+                self._local_tools[schema.name] = (schema, functools.partial(self._run_artifact_tool, schema.name))
+
+        self.experiment_polling = experiment_polling
+        # Pollers of experiment results, keyed by the organization/project context they run in
+        self._experiments: dict[str, ExperimentPollers] = {}
+
+        self.entities = EntityCache(entity_ttl, self.metrics, self.cache) if skip_unchanged_writes else None
+        self._invalidation_listeners: list[InvalidationListener] = []
+        self._hedger = Hedger(hedging) if hedging is not None else None
+        self.timeouts = {**TOOL_TIMEOUTS, **(timeouts or {})}
+        self.default_timeout = default_timeout
+        self.scheduler = scheduler
+        self.tenant = tenant
 
     @staticmethod
-    def _get_config(url: str, personal_api_key: str) -> dict[str, dict[str, Any]]:
-        return {
-            "posthog": {
-                "url": url,
-                "transport": "streamable_http",
-                "headers": {
-                    "Authorization": f"Bearer {personal_api_key}",
-                    "X-Client-Package": "posthog-agent-toolkit",
-                },
-            }
+    def _get_config(url: str, personal_api_key: str, httpx_client_factory: McpHttpClientFactory | None = None) -> dict[str, dict[str, Any]]:
+        config: dict[str, Any] = {
+            "url": url,
+            "transport": "streamable_http",
+            "headers": {
+                "Authorization": f"Bearer {personal_api_key}",
+                "X-Client-Package": "posthog-agent-toolkit",
+            },
         }
+        if httpx_client_factory is not None:
+            config["httpx_client_factory"] = httpx_client_factory
+        return {SERVER_NAME: config}
+
+    async def __aenter__(self) -> "PostHogAgentToolkit":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled MCP sessions, and the HTTP client if the toolkit created it."""
+        if self.definitions is not None:
+            await self.definitions.aclose()
+        experiments = list(self._experiments.values())
+        self._experiments.clear()
+        for pollers in experiments:
+            await pollers.aclose()
+        await self._pool.aclose()
+        if self.artifacts is not None:
+            self.artifacts.close()
+        if self._loop_lag is not None:
+            await self._loop_lag.aclose()
+        if self._owns_http_client:
+            await self.http_client.aclose()
+
+    @property
+    def context_pinned(self) -> bool:
+        """Whether the toolkit was created with a fixed organization or project."""
+        return self.organization_id is not None or self.project_id is not None
+
+    def add_hooks(self, hooks: ToolCallHooks) -> None:
+        """
+        Register hooks that are notified of every tool call, e.g. a `Profiler`.
+
+        Args:
+            hooks: Hooks implementing any of on_call_start, on_phase and on_call_end
+        """
+        self.hooks.add(hooks)
+
+    def add_invalidation_listener(self, listener: InvalidationListener) -> None:
+        """
+        Register a function that is told which cached reads each successful write makes stale,
+        e.g. to evict them from a cache in front of the toolkit.
+
+        Args:
+            listener: Called with each `Invalidation`; use `invalidation.covers(tool, arguments)`
+                to check a cached read
+        """
+        self._invalidation_listeners.append(listener)
 
     async def get_tools(self) -> list[BaseTool]:
         """
         Get all available PostHog tools as LangChain compatible tools.
 
+        The switch-organization and switch-project tools are left out when the context is pinned.
+        Runs can still target another organization or project by setting "posthog_organization_id"
+        or "posthog_project_id" in the `configurable` dict of their RunnableConfig.
+
+        With `tool_catalog`, only the posthog-catalog tool and the tools loaded through it so far
+        are returned, so get the tools again before each LLM call.
+
         Returns:
             List of BaseTool instances that can be used with LangChain agents
         """
+        tools = await self._get_all_tools()
+        if not self.tool_catalog:
+            return tools
+        if self._catalog_tool is None:
+            self._catalog_tool = self._to_langchain_tool(CATALOG_TOOL_SCHEMA)
+        return [self._catalog_tool, *(tool for tool in tools if tool.name in self._active_tools)]
+
+    @property
+    def active_tools(self) -> list[str]:
+        """Names of the tools loaded through the catalog."""
+        return list(self._active_tools)
+
+    async def load_tools(self, names: Iterable[str]) -> list[str]:
+        """
+        Add tools to the active set returned by `get_tools()` in `tool_catalog` mode.
+
+        Args:
+            names: Names of the tools to load
+
+        Returns:
+            The names that do not match any available tool
+        """
+        available = {tool.name for tool in await self._get_all_tools()}
+        names = list(dict.fromkeys(names))
+        self._active_tools.update(dict.fromkeys(name for name in names if name in available))
+        return [name for name in names if name not in available]
+
+    def unload_tools(self) -> None:
+        """Empty the active set, e.g. when a new conversation starts."""
+        self._active_tools.clear()
+
+    async def get_tool_schemas(self) -> list[Tool]:
+        """
+        Get the MCP definitions of all available tools, listing them from the server only once.
+
+        Returns:
+            List of MCP tools with their input schemas and annotations
+        """
+        if self._tool_schemas is None:
+            # Listed by another toolkit sharing the cache, e.g. in another worker process
+            cached = await self.cache.get("tools")
+            if cached is not None:
+                self._tool_schemas = [Tool.model_validate(tool) for tool in cached]
+        self.metrics.record_cache_access("tools/list", TOOLKIT_CATEGORY, "tools", self._tool_schemas is not None)
+        if self._tool_schemas is None:
+            async with self._pool.acquire() as pooled:
+                self._tool_schemas = await pooled.run(self._list_tools(pooled.session))
+            await self.cache.set("tools", [tool.model_dump(mode="json", exclude_none=True) for tool in self._tool_schemas], TOOLS_TTL)
+        return self._tool_schemas
+
+    async def _get_available_schemas(self) -> list[Tool]:
+        schemas = await self.get_tool_schemas()
+        if self.context_pinned:
+            schemas = [tool for tool in schemas if tool.name not in CONTEXT_TOOLS]
+        return [*schemas, *(schema for schema, _ in self._local_tools.values())]
+
+    async def _get_all_tools(self) -> list[BaseTool]:
         if self._tools is None:
-            self._tools = await self.client.get_tools()
+            self._tools = [self._to_langchain_tool(tool) for tool in await self._get_available_schemas()]
         return self._tools
+
+    async def get_router(self) -> ToolRouter:
+        """Get a BM25 router over the toolkit's tools, built from their definitions."""
+        if self._router is None:
+            definitions = get_tool_definitions()
+            self._router = ToolRouter(
+                {
+                    tool.name: tool_document(definitions[tool.name]) if tool.name in definitions else tokenize(f"{tool.name} {tool.description}")
+                    for tool in await self._get_all_tools()
+                }
+            )
+        return self._router
+
+    async def route_tools(self, message: str, k: int = 8) -> list[BaseTool]:
+        """
+        Pick the tools most relevant to a user message, to expose only those to the LLM.
+
+        Args:
+            message: User message, or a few recent messages joined together
+            k: Maximum number of tools to return
+
+        Returns:
+            Up to `k` tools, best match first
+        """
+        tools = {tool.name: tool for tool in await self._get_all_tools()}
+        router = await self.get_router()
+        return [tools[name] for name in router.route(message, k)]
+
+    async def conversation_router(self, k: int = 8, always_include: Iterable[str] = (), shift_threshold: float = 0.5) -> ConversationRouter[BaseTool]:
+        """
+        Create a router that follows one conversation and picks new tools when its topic shifts.
+
+        Args:
+            k: Number of routed tools
+            always_include: Names of tools exposed on every turn
+            shift_threshold: Share of a message's top-k tools that must already be selected for
+                the selection to be kept
+
+        Returns:
+            A router whose `update(message)` returns the tools for each turn
+        """
+        tools = {tool.name: tool for tool in await self._get_all_tools()}
+        return ConversationRouter(await self.get_router(), tools, k=k, always_include=always_include, shift_threshold=shift_threshold)
+
+    async def schema_token_counts(self) -> dict[str, int]:
+        """
+        Estimate how many prompt tokens each tool adds to every LLM call, e.g. to check the effect
+        of `schema_compaction`.
+
+        Returns:
+            Estimated tokens of each tool's name, description and parameters as sent to chat models
+        """
+        return {tool.name: estimate_tokens(json.dumps(convert_to_openai_tool(tool))) for tool in await self.get_tools()}
+
+    async def triage_errors(
+        self,
+        limit: int = 5,
+        concurrency: int = 4,
+        include_volume: bool = False,
+        organization_id: str | None = None,
+        project_id: int | None = None,
+        **list_arguments: Any,
+    ) -> dict[str, Any]:
+        """
+        Fetch the top error tracking issues and their details concurrently, merged into one result.
+
+        Args:
+            limit: Number of issues to fetch details for
+            concurrency: Maximum number of error-details calls in flight at once
+            include_volume: Keep the occurrence time series of each issue
+            organization_id: Organization to run the calls against instead of the toolkit's
+            project_id: Project to run the calls against instead of the toolkit's
+            **list_arguments: Arguments for list-errors, e.g. orderBy="users" or status="all"
+
+        Returns:
+            The issues with their details, see `posthog_agent_toolkit.operations.errors.triage_errors`
+        """
+        return await triage_errors(self._caller(self._call_context(organization_id, project_id)), limit, concurrency, include_volume, **list_arguments)
+
+    async def snapshot_dashboard(
+        self,
+        dashboard_id: int,
+        concurrency: int = 4,
+        organization_id: str | None = None,
+        project_id: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Fetch a dashboard and the results of all its insights, queried concurrently.
+
+        Args:
+            dashboard_id: ID of the dashboard
+            concurrency: Maximum number of insight-query calls in flight at once
+            organization_id: Organization to run the calls against instead of the toolkit's
+            project_id: Project to run the calls against instead of the toolkit's
+
+        Returns:
+            The dashboard and its tiles' results, see `posthog_agent_toolkit.operations.dashboards.snapshot_dashboard`
+        """
+        return await snapshot_dashboard(self._caller(self._call_context(organization_id, project_id)), dashboard_id, concurrency)
+
+    async def update_feature_flags(
+        self,
+        updates: Mapping[str, dict[str, Any]],
+        concurrency: int = 4,
+        dry_run: bool = False,
+        organization_id: str | None = None,
+        project_id: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Patch many feature flags concurrently, skipping the flags that already match their patch.
+
+        Args:
+            updates: Patch for each flag key, e.g. {"new-checkout": {"active": True}}
+            concurrency: Maximum number of flags looked up or updated at once
+            dry_run: Only report what would change, without updating any flag
+            organization_id: Organization to run the calls against instead of the toolkit's
+            project_id: Project to run the calls against instead of the toolkit's
+
+        Returns:
+            A report per flag, see `posthog_agent_toolkit.operations.flags.update_feature_flags`
+        """
+        return await update_feature_flags(self._caller(self._call_context(organization_id, project_id)), updates, concurrency, dry_run)
+
+    async def prefetch_definitions(self, organization_id: str | None = None, project_id: int | None = None) -> None:
+        """
+        Load the event definitions and person properties of a project into the definitions index.
+
+        Args:
+            organization_id: Organization of the project (default: the toolkit's)
+            project_id: Project to load (default: the toolkit's)
+
+        Raises:
+            RuntimeError: If the toolkit was created without `index_definitions`
+        """
+        if self.definitions is None:
+            raise RuntimeError("The definitions index is not enabled.")
+        await self._load_context()
+        await self.definitions.prefetch(self._call_context(organization_id, project_id))
+
+    def experiment_poller(self, experiment_id: int, organization_id: str | None = None, project_id: int | None = None) -> ExperimentPoller:
+        """
+        Get the shared poller of an experiment's results.
+
+        Args:
+            experiment_id: ID of the experiment
+            organization_id: Organization of the experiment (default: the toolkit's)
+            project_id: Project of the experiment (default: the toolkit's)
+
+        Returns:
+            The poller; `await poller.get()` for the cached results, or `async for` over
+            `poller.watch()` to be notified when they change
+        """
+        return self._experiment_pollers(self._call_context(organization_id, project_id)).get(experiment_id)
+
+    @property
+    def sessions_in_use(self) -> int:
+        """Number of MCP sessions currently serving tool calls."""
+        return self._pool.in_use
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        organization_id: str | None = None,
+        project_id: int | None = None,
+        timeout: float | None = None,
+        priority: str | None = None,
+        on_progress: ProgressListener | None = None,
+    ) -> str:
+        """
+        Call a PostHog MCP tool directly.
+
+        Args:
+            name: Name of the tool, e.g. "dashboard-get"
+            arguments: Arguments matching the tool's input schema
+            organization_id: Organization to run this call against instead of the toolkit's
+            project_id: Project to run this call against instead of the toolkit's
+            timeout: Seconds this call may take instead of the tool's timeout. The call is
+                also cancelled when the deadline of the surrounding `deadline()` passes.
+            priority: Scheduler lane of this call and the calls it makes, e.g. `Priority.BATCH`
+                (default: the lane of the surrounding `lane()`, or interactive)
+            on_progress: Receives the progress notifications the server sends while the call
+                runs, such as the progress of a long query-run scan
+
+        Returns:
+            The text returned by the tool
+
+        Raises:
+            ToolException: If the tool reports an error, or its arguments are invalid
+            TimeoutError: If the call does not finish in time, in which case it is cancelled
+            SchedulerOverloadedError: If the scheduler has too many calls waiting already
+        """
+        if self._loop_lag is not None and not self._loop_lag.running:
+            self._loop_lag.start()
+        definition = get_tool_definitions().get(name)
+        category = definition.category if definition else LOCAL_TOOL_CATEGORIES.get(name, UNKNOWN_CATEGORY)
+        call = ToolCall(tool=name, category=category, arguments=arguments or {})
+        self.hooks.on_call_start(call)
+        invoked_at = _tool_invoked_at.get()
+        if invoked_at is not None:
+            self.hooks.on_phase(call, Phase.WRAP, call.started_at - invoked_at)
+
+        # Only repeat calls that may have reached the server when doing so again is harmless
+        retry_transport_errors = definition is not None and (definition.annotations.read_only_hint or definition.annotations.idempotent_hint)
+
+        at = call_deadline(name, timeout, self.timeouts, self.default_timeout)
+        try:
+            await self._load_context()
+            context = self._call_context(organization_id, project_id)
+
+            listing_key = self._listing_key(name, context)
+            cached = await self.cache.get(listing_key) if listing_key is not None else None
+            if listing_key is not None:
+                self.metrics.record_cache_access(call.tool, call.category, "listings", cached is not None)
+
+            self._validate_arguments(call.tool, call.arguments)
+            with lane(priority):
+                async with enforce(at):
+                    text = cached
+                    if text is None and self.tool_catalog and name == CATALOG_TOOL:
+                        text = await self._run_catalog(call.arguments)
+                    local_tool = self._local_tools.get(name)
+                    if text is None and local_tool is not None:
+                        try:
+                            text = await local_tool[1](call.arguments, context)
+                        except ValueError as e:
+                            raise ToolException(str(e)) from e
+                    if text is None and self.definitions is not None:
+                        text = await self.definitions.answer(call.tool, call.arguments, context)
+                    if text is None and self.experiment_polling is not None and name == RESULTS_TOOL:
+                        text = await self._experiment_pollers(context).answer(call.arguments)
+                    if text is None and self.entities is not None:
+                        call.arguments, text = await self.entities.trim(name, call.arguments, self._context_key(context))
+                    if text is None:
+                        result = await self._call_with_retries(call, context, retry_transport_errors, on_progress)
+                        decode_started = time.perf_counter()
+                        text = self._result_text(result)
+                        self.hooks.on_phase(call, Phase.DECODE, time.perf_counter() - decode_started)
+                        if result.isError:
+                            raise ToolException(text)
+                        if listing_key is not None:
+                            await self.cache.set(listing_key, text, LISTINGS_TTL)
+                        entity = await self._decode_entity(name, text)
+                        await self._invalidate(name, call.arguments, text, context, entity)
+                        if self.entities is not None:
+                            await self.entities.store(name, call.arguments, text, self._context_key(context), entity)
+        except Exception as e:
+            call.error = e
+            self.metrics.record_error(call.tool, call.category, type(e).__name__)
+            raise
+        finally:
+            call.duration = time.perf_counter() - call.started_at
+            self.metrics.observe_latency(call.tool, call.category, call.duration)
+            self.hooks.on_call_end(call)
+
+        num_bytes = await self.offloader.run(len(text), encoded_size, text)
+        self.metrics.observe_response_size(call.tool, call.category, num_bytes)
+        self.metrics.observe_response_tokens(call.tool, call.category, tokens_for_size(num_bytes))
+        return text
+
+    def stream_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        organization_id: str | None = None,
+        project_id: int | None = None,
+        timeout: float | None = None,
+        priority: str | None = None,
+    ) -> ToolCallStream:
+        """
+        Call a PostHog MCP tool in the background and iterate over its progress notifications.
+
+        Takes the same arguments as `call_tool`. Use the stream as an async context manager, so
+        the call is cancelled when it is left early, e.g. once the progress shows a query would
+        scan too much.
+
+        Returns:
+            The stream; `async for` over it for `Progress` notifications until the call
+            completes, then `await stream.result()` for the text returned by the tool
+        """
+        return ToolCallStream(
+            lambda listener: self.call_tool(
+                name, arguments, organization_id=organization_id, project_id=project_id, timeout=timeout, priority=priority, on_progress=listener
+            )
+        )
+
+    async def call_tool_typed(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        organization_id: str | None = None,
+        project_id: int | None = None,
+        timeout: float | None = None,
+        priority: str | None = None,
+    ) -> Any:
+        """
+        Call one of the tools in `results.RESULT_TYPES` and decode its result into typed structs.
+
+        Requires the `msgspec` extra. Takes the same arguments as `call_tool`.
+
+        Returns:
+            The decoded result, e.g. a `results.Insight` for insight-get
+
+        Raises:
+            ToolException: If the tool reports an error
+            ValueError: If the tool has no result type, or its result doesn't match it
+        """
+        from posthog_agent_toolkit.results import decode_result
+
+        text = await self.call_tool(name, arguments, organization_id=organization_id, project_id=project_id, timeout=timeout, priority=priority)
+        return await self.offloader.run(len(text), decode_result, name, text)
+
+    def _validate_arguments(self, tool: str, arguments: dict[str, Any]) -> None:
+        if self._argument_validator is None:
+            return
+        try:
+            self._argument_validator(tool, arguments)
+        except ValueError as e:
+            raise ToolException(str(e)) from e
+
+    @staticmethod
+    async def _list_tools(session: ClientSession) -> list[Tool]:
+        tools: list[Tool] = []
+        cursor: str | None = None
+        while True:
+            page = await session.list_tools(cursor=cursor)
+            tools.extend(page.tools)
+            if not page.nextCursor:
+                return tools
+            cursor = page.nextCursor
+
+    async def _run_catalog(self, arguments: dict[str, Any]) -> str:
+        available = await self._get_available_schemas()
+        if not arguments.get("load"):
+            return format_catalog(available, arguments.get("category"), self._active_tools, LOCAL_TOOL_CATEGORIES)
+        unknown = await self.load_tools(arguments["load"])
+        loaded = [tool for tool in available if tool.name in arguments["load"]]
+        if self.schema_compaction:
+            loaded = [compact_tool(tool, self.schema_compaction) for tool in loaded]
+        return format_loaded(loaded, unknown)
+
+    async def _run_definitions_search(self, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> str:
+        if self.definitions is None:
+            raise RuntimeError("The definitions index is not enabled.")
+        return await self.definitions.answer(SEARCH_TOOL, arguments, context) or ""
+
+    async def _run_error_triage(self, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> str:
+        result = await triage_errors(self._caller(context), **triage_tool_arguments(arguments))
+        return json.dumps(result, separators=(",", ":"))
+
+    async def _run_dashboard_snapshot(self, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> str:
+        if "dashboardId" not in arguments:
+            raise ValueError("dashboardId is required.")
+        result = await snapshot_dashboard(self._caller(context), arguments["dashboardId"])
+        return json.dumps(result, separators=(",", ":"))
+
+    async def _run_artifact_tool(self, tool: str, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> str:
+        if self.artifacts is None:
+            raise RuntimeError("The artifact store is not enabled.")
+        return await self.artifacts.answer(tool, arguments)
+
+    def _caller(self, context: dict[str, dict[str, Any]]) -> ToolCaller:
+        """Call tools through `call_tool` within the given organization/project context."""
+        organization = context.get("switch-organization")
+        project = context.get("switch-project")
+
+        def call(name: str, arguments: dict[str, Any]) -> Awaitable[str]:
+            return self.call_tool(
+                name,
+                arguments,
+                organization_id=organization["orgId"] if organization else None,
+                project_id=project["projectId"] if project else None,
+            )
+
+        return call
+
+    async def _load_context(self) -> None:
+        """Pick up the organization/project switched to by other toolkits for the same API key, at most every `CONTEXT_REFRESH_INTERVAL` seconds."""
+        if self.context_pinned:
+            return
+        now = time.monotonic()
+        if self._context_synced_at is not None and now - self._context_synced_at < CONTEXT_REFRESH_INTERVAL:
+            return
+        self._context_calls = await self.cache.get(CONTEXT_KEY) or self._context_calls
+        self._context_synced_at = now
+
+    def _call_context(self, organization_id: str | None, project_id: int | None) -> dict[str, dict[str, Any]]:
+        if organization_id is None and project_id is None:
+            return self._context_calls
+        return {**self._context_calls, **self._context_arguments(organization_id, project_id)}
+
+    @staticmethod
+    def _context_arguments(organization_id: str | None, project_id: int | None) -> dict[str, dict[str, Any]]:
+        context: dict[str, dict[str, Any]] = {}
+        if organization_id is not None:
+            context["switch-organization"] = {"orgId": organization_id}
+        if project_id is not None:
+            context["switch-project"] = {"projectId": project_id}
+        return context
+
+    @staticmethod
+    def _listing_key(name: str, context: dict[str, dict[str, Any]]) -> str | None:
+        if name not in LISTING_TOOLS:
+            return None
+        # Projects are listed for the active organization, while organizations are the same everywhere
+        organization = context.get("switch-organization")
+        return f"listings:{name}:{organization['orgId'] if organization is not None and name == 'projects-get' else ''}"
+
+    async def _decode_entity(self, tool: str, text: str) -> Any:
+        """Decode the entity returned by a tool once for the caches that look into it, or None if they don't."""
+        if tool not in ENTITY_RESULTS and (self.entities is None or not self.entities.stores(tool)):
+            return None
+        try:
+            return await self.offloader.run(len(text), json.loads, text)
+        except ValueError:
+            return None
+
+    async def _invalidate(self, tool: str, arguments: dict[str, Any], text: str, context: dict[str, dict[str, Any]], entity: Any = None) -> None:
+        """Evict the reads made stale by a successful write from the toolkit's caches, and tell the listeners."""
+        invalidations = invalidations_for(tool, arguments, text, entity)
+        if not invalidations:
+            return
+        key = self._context_key(context)
+        organization = context.get("switch-organization")
+        project = context.get("switch-project")
+        for invalidation in invalidations:
+            if self.entities is not None:
+                await self.entities.invalidate(invalidation, key)
+            if key in self._experiments:
+                self._experiments[key].invalidate(invalidation)
+            invalidation = dataclasses.replace(
+                invalidation,
+                organization_id=organization["orgId"] if organization else None,
+                project_id=project["projectId"] if project else None,
+            )
+            for listener in self._invalidation_listeners:
+                try:
+                    listener(invalidation)
+                except Exception:
+                    logger.exception("Invalidation listener failed")
+
+    @staticmethod
+    def _context_key(context: dict[str, dict[str, Any]]) -> str:
+        return json.dumps(context, sort_keys=True)
+
+    def _experiment_pollers(self, context: dict[str, dict[str, Any]]) -> ExperimentPollers:
+        key = self._context_key(context)
+        pollers = self._experiments.get(key)
+        if pollers is None:
+            context = dict(context)
+            pollers = self._experiments[key] = ExperimentPollers(
+                lambda tool, arguments: self._call_server(tool, arguments, context), self.experiment_polling, self.metrics
+            )
+        return pollers
+
+    async def _call_server(self, tool: str, arguments: dict[str, Any], context: dict[str, dict[str, Any]]) -> str:
+        """
+        Call a tool on the server, bypassing the toolkit's caches, hooks and metrics.
+
+        Only the tool's own timeout applies, since the results are shared by the calls that wait for them.
+        """
+        call = ToolCall(tool=tool, category=get_tool_category(tool), arguments=arguments)
+        async with asyncio.timeout(self.timeouts.get(tool, self.default_timeout)):
+            result = await self._call_with_retries(call, context, retry_transport_errors=True)
+        text = self._result_text(result)
+        if result.isError:
+            raise ToolException(text)
+        return text
+
+    async def _call_with_retries(
+        self, call: ToolCall, context: dict[str, dict[str, Any]], retry_transport_errors: bool, on_progress: ProgressListener | None = None
+    ) -> CallToolResult:
+        definition = get_tool_definitions().get(call.tool)
+        hedger = self._hedger if definition is not None and definition.annotations.read_only_hint else None
+        attempt = 1
+        while True:
+            try:
+                if hedger is not None:
+                    return await self._call_hedged(call, context, hedger, on_progress)
+                return await self._call_mcp_tool(call, context, on_progress=on_progress)
+            except Exception as e:
+                # A terminated session never ran the request, so it is always safe to try again
+                retryable = is_session_terminated(e) or (retry_transport_errors and isinstance(e, SessionClosedError | httpx.TransportError))
+                if attempt >= MAX_ATTEMPTS or not retryable:
+                    raise
+            attempt += 1
+            self.metrics.record_retry(call.tool, call.category)
+
+    async def _call_hedged(
+        self, call: ToolCall, context: dict[str, dict[str, Any]], hedger: Hedger, on_progress: ProgressListener | None = None
+    ) -> CallToolResult:
+        """Call a read-only tool, sending a second request if the first is slower than the tool usually is."""
+        delay = hedger.delay(call.tool)
+        primary = asyncio.ensure_future(self._call_mcp_tool(call, context, on_progress=on_progress))
+        tasks = [primary]
+        try:
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            # Only hedge when another session is free, since waiting for one would not help
+            if done or self._pool.in_use >= self._pool.max_size or not hedger.try_spend():
+                return await primary
+
+            # The duplicate's phases and progress are not reported, so hooks and listeners see one request
+            hedge = asyncio.ensure_future(self._call_mcp_tool(call, context, ToolCallHooks()))
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    self.metrics.record_hedge(call.tool, call.category, won=winner is hedge)
+                    return winner.result()
+                if not pending:
+                    self.metrics.record_hedge(call.tool, call.category, won=False)
+                    return primary.result()
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            # Wait for the cancelled requests to be stopped on the server and their sessions
+            # returned, so no work outlives the call
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    async def _call_mcp_tool(
+        self, call: ToolCall, context: dict[str, dict[str, Any]], hooks: ToolCallHooks | None = None, on_progress: ProgressListener | None = None
+    ) -> CallToolResult:
+        hooks = hooks or self.hooks
+        callback = progress_callback(call.tool, call.started_at, on_progress) if on_progress is not None else None
+        async with self._admit(call, hooks):
+            acquire_started = time.perf_counter()
+            async with self._pool.acquire() as pooled:
+                handshake = pooled.handshake_duration
+                hooks.on_phase(call, Phase.POOL_ACQUIRE, time.perf_counter() - acquire_started - (handshake or 0.0))
+                if handshake is not None:
+                    hooks.on_phase(call, Phase.HANDSHAKE, handshake)
+
+                await self._sync_context(pooled, context)
+
+                started = time.perf_counter()
+                result = await pooled.call_tool(call.tool, call.arguments, callback)
+                elapsed = time.perf_counter() - started
+                server = min(pooled.timer.last_wait, elapsed) if pooled.timer.last_wait is not None else elapsed
+                hooks.on_phase(call, Phase.SERVER, server)
+                hooks.on_phase(call, Phase.TRANSFER, elapsed - server)
+                if pooled.timer.last_request_size is not None:
+                    self.metrics.observe_request_size(call.tool, call.category, pooled.timer.last_request_size)
+                if self._hedger is not None and not result.isError:
+                    self._hedger.latencies.observe(call.tool, elapsed)
+
+                if call.tool in CONTEXT_TOOLS and not result.isError:
+                    self._context_calls = {**self._context_calls, call.tool: call.arguments}
+                    pooled.context = {**pooled.context, call.tool: call.arguments}
+                    if not self.context_pinned:
+                        await self.cache.set(CONTEXT_KEY, self._context_calls)
+                        self._context_synced_at = time.monotonic()
+                # The server cannot go back to the API key's default context, so a session switched
+                # for a single call is closed rather than handed to calls without that switch.
+                if any(tool not in self._context_calls for tool in pooled.context):
+                    pooled.reusable = False
+        return result
+
+    @asynccontextmanager
+    async def _admit(self, call: ToolCall, hooks: ToolCallHooks) -> AsyncIterator[None]:
+        """Wait for the scheduler to admit a call to the server, if there is a scheduler."""
+        if self.scheduler is None:
+            yield
+            return
+        started = time.perf_counter()
+        # Admit no more of this toolkit's calls than it has sessions, so the scheduler rather
+        # than the session pool decides which call runs next
+        async with self.scheduler.slot(self.tenant, self.scheduler.cost(call.tool), current_lane(), self._pool.max_size):
+            hooks.on_phase(call, Phase.QUEUE, time.perf_counter() - started)
+            yield
+
+    async def _sync_context(self, pooled: PooledSession, context: dict[str, dict[str, Any]]) -> None:
+        # The server keeps the active organization and project per MCP session, so apply the
+        # switches this call needs that the session has not seen yet.
+        for tool in CONTEXT_TOOLS:
+            arguments = context.get(tool)
+            if arguments is None or pooled.context.get(tool) == arguments:
+                continue
+            result = await pooled.call_tool(tool, arguments)
+            if result.isError:
+                raise ToolException(f"Failed to switch context with {tool}: {self._result_text(result)}")
+            pooled.context = {**pooled.context, tool: arguments}
+
+    @staticmethod
+    def _result_text(result: CallToolResult) -> str:
+        return "\n".join(content.text for content in result.content if isinstance(content, TextContent))
+
+    def _to_langchain_tool(self, tool: Tool) -> BaseTool:
+        async def call(config: RunnableConfig, callbacks: Callbacks = None, **arguments: Any) -> str:
+            configurable = config.get("configurable") or {}
+
+            async def on_progress(progress: Progress) -> None:
+                # Dispatched under the tool's run, reaching the callback handlers' on_custom_event
+                # and astream_events()
+                await adispatch_custom_event(PROGRESS_EVENT, progress.to_event(), config={**config, "callbacks": callbacks})
+
+            try:
+                text = await self.call_tool(
+                    tool.name,
+                    arguments,
+                    organization_id=configurable.get(CONFIGURABLE_ORGANIZATION_ID),
+                    project_id=configurable.get(CONFIGURABLE_PROJECT_ID),
+                    timeout=configurable.get(CONFIGURABLE_TIMEOUT),
+                    priority=configurable.get(CONFIGURABLE_PRIORITY),
+                    on_progress=on_progress,
+                )
+            except TimeoutError as e:
+                # Let the agent know, so it can try a cheaper call instead
+                raise ToolException(f"{tool.name} did not finish in time and was cancelled.") from e
+            if self.artifacts is not None:
+                text = await self.artifacts.spill(tool.name, text)
+            return text
+
+        return PostHogTool(
+            name=tool.name,
+            description=tool.description or "",
+            args_schema=compact_schema(tool.inputSchema, self.schema_compaction) if self.schema_compaction else tool.inputSchema,
+            coroutine=call,
+            metadata=tool.annotations.model_dump() if tool.annotations else None,
+        )
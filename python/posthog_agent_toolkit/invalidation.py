@@ -0,0 +1,192 @@
+"""Which cached reads a write makes stale, derived from the tools' feature metadata and the entity IDs of a call."""
+
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from posthog_agent_toolkit.tool_definitions import get_tool_definitions
+
+# Arguments naming an entity of each feature, with the fields of the entity that hold the same ID.
+# An argument taking several kinds of ID, like an insight's numeric or short ID, can only be
+# matched precisely with IDs read from the entity itself.
+ENTITY_IDS: dict[str, dict[str, tuple[str, ...]]] = {
+    "dashboards": {"dashboardId": ("id",)},
+    "insights": {"insightId": ("id", "short_id")},
+    "flags": {"flagKey": ("key",), "flagId": ("id",)},
+    "surveys": {"surveyId": ("id",)},
+    "experiments": {"experimentId": ("id",)},
+}
+
+# Writes that return the entity they created or changed, whose IDs then name it as well
+ENTITY_RESULTS = frozenset(
+    {
+        "dashboard-create",
+        "dashboard-update",
+        "insight-create-from-query",
+        "insight-update",
+        "create-feature-flag",
+        "update-feature-flag",
+        "survey-create",
+        "survey-update",
+        "experiment-create",
+        "experiment-update",
+    }
+)
+
+# Reads of event data rather than of entities, which no write makes stale
+DATA_TOOLS = frozenset({"query-run", "query-generate-hogql-from-question", "survey-stats", "surveys-global-stats"})
+
+# Tools that are not read-only but only change the organization or project of a session
+CONTEXT_TOOLS = frozenset({"switch-organization", "switch-project"})
+
+
+@dataclass(frozen=True)
+class RelatedWrite:
+    """An entity changed by a write, named by one of its arguments rather than by its feature."""
+
+    feature: str
+    # Path to the argument holding the entity's ID, e.g. ("data", "dashboardId"); None when
+    # the write may change any entity of the feature
+    path: tuple[str, ...] | None = None
+    # Argument the feature's read tools take the ID as
+    id_argument: str | None = None
+    # Paths to arguments of which at least one must be set, and not false, for the write to
+    # change the entity; empty when it always does
+    when: tuple[tuple[str, ...], ...] = ()
+
+
+# Entities changed by writes beyond the ones their arguments and results name. Related writes
+# of a tool's own feature replace what would be derived for it.
+RELATED_WRITES: dict[str, tuple[RelatedWrite, ...]] = {
+    "add-insight-to-dashboard": (
+        RelatedWrite("dashboards", ("data", "dashboardId"), "dashboardId"),
+        RelatedWrite("insights", ("data", "insightId"), "insightId"),
+    ),
+    "insight-update": (RelatedWrite("dashboards", ("data", "dashboard"), "dashboardId"),),
+    # Tiles of the deleted insight disappear from dashboards we can't name
+    "insight-delete": (RelatedWrite("dashboards"),),
+    # Experiments are created with a new feature flag
+    "experiment-create": (RelatedWrite("flags"),),
+    # Launching, concluding or restarting an experiment turns its feature flag on or off
+    "experiment-update": (RelatedWrite("flags", when=(("data", "launch"), ("data", "conclude"), ("data", "restart"))),),
+    # Surveys target users with a feature flag of their own, which is created or changed along with
+    # the targeting, and turned on or off when the survey starts or stops
+    "survey-create": (RelatedWrite("flags", when=(("targeting_flag_filters",),)),),
+    "survey-update": (RelatedWrite("flags", when=(("targeting_flag_filters",), ("start_date",), ("end_date",))),),
+}
+
+
+@dataclass(frozen=True)
+class Invalidation:
+    """
+    Cached reads made stale by a write: those of one feature, limited to the entity the write
+    changed when it is known.
+    """
+
+    feature: str
+    # IDs of the changed entity by the argument read tools take them as; None when any entity
+    # of the feature may have changed
+    ids: Mapping[str, frozenset[str]] | None = None
+    # Organization and project the write ran in, when they were pinned, switched to or overridden
+    organization_id: str | None = None
+    project_id: int | None = None
+
+    def covers(self, tool: str, arguments: Mapping[str, Any]) -> bool:
+        """
+        Check whether the cached result of a read is stale.
+
+        Lists, and reads naming an entity by an ID the invalidation doesn't know, are stale
+        whenever any entity of the feature changed.
+        """
+        definition = get_tool_definitions().get(tool)
+        if definition is None or definition.feature != self.feature or tool in DATA_TOOLS or not definition.annotations.read_only_hint:
+            return False
+        if self.ids is None:
+            return True
+        named = [(argument, str(arguments[argument])) for argument in ENTITY_IDS.get(self.feature, {}) if arguments.get(argument) is not None]
+        return not named or any(argument not in self.ids or value in self.ids[argument] for argument, value in named)
+
+    def covers_entity(self, entity: Mapping[str, Any]) -> bool:
+        """Check whether a cached entity of the invalidation's feature is the one that changed."""
+        if self.ids is None:
+            return True
+        return any(
+            str(entity[field]) in self.ids.get(argument, ())
+            for argument, fields in ENTITY_IDS.get(self.feature, {}).items()
+            for field in fields
+            if entity.get(field) is not None
+        )
+
+
+def invalidations_for(tool: str, arguments: Mapping[str, Any], result: str | None = None, entity: Any = None) -> list[Invalidation]:
+    """
+    Get the cached reads made stale by a successful write.
+
+    A write makes the reads of its own feature stale, limited to the entity named by its
+    arguments or, for writes in `ENTITY_RESULTS`, by its result. `RELATED_WRITES` adds the
+    entities it changes in other features.
+
+    Args:
+        tool: Name of the tool that was called
+        arguments: Arguments of the call
+        result: Text returned by the tool
+        entity: The result decoded from JSON, if the caller has decoded it already
+
+    Returns:
+        One invalidation per feature, or none for read-only tools
+    """
+    definition = get_tool_definitions().get(tool)
+    if definition is None or definition.annotations.read_only_hint or tool in CONTEXT_TOOLS:
+        return []
+
+    related = RELATED_WRITES.get(tool, ())
+    invalidations: list[Invalidation] = []
+    if not any(write.feature == definition.feature for write in related):
+        invalidations.append(Invalidation(definition.feature, _entity_ids(definition.feature, arguments, result if tool in ENTITY_RESULTS else None, entity)))
+    for write in related:
+        if write.when and not any(_is_set(_argument(arguments, path)) for path in write.when):
+            continue
+        if write.path is None or write.id_argument is None:
+            invalidations.append(Invalidation(write.feature))
+            continue
+        value = _argument(arguments, write.path)
+        if value is None:
+            continue
+        if len(ENTITY_IDS.get(write.feature, {}).get(write.id_argument, ())) > 1:
+            invalidations.append(Invalidation(write.feature))
+        else:
+            invalidations.append(Invalidation(write.feature, {write.id_argument: frozenset({str(value)})}))
+    return invalidations
+
+
+def _argument(arguments: Mapping[str, Any], path: tuple[str, ...]) -> Any:
+    value: Any = arguments
+    for key in path:
+        value = value.get(key) if isinstance(value, Mapping) else None
+    return value
+
+
+def _is_set(value: Any) -> bool:
+    return value is not None and value is not False
+
+
+def _entity_ids(feature: str, arguments: Mapping[str, Any], result: str | None, entity: Any = None) -> dict[str, frozenset[str]] | None:
+    if result is None:
+        entity = None
+    elif entity is None:
+        try:
+            entity = json.loads(result)
+        except ValueError:
+            entity = None
+    ids: dict[str, set[str]] = {}
+    for argument, fields in ENTITY_IDS.get(feature, {}).items():
+        values: set[str] = set()
+        if isinstance(entity, dict):
+            values.update(str(entity[field]) for field in fields if entity.get(field) is not None)
+        if arguments.get(argument) is not None and (len(fields) == 1 or values):
+            values.add(str(arguments[argument]))
+        if values:
+            ids[argument] = values
+    # Without any ID, e.g. for a create whose result can't be read, any entity may have changed
+    return {argument: frozenset(values) for argument, values in ids.items()} or None
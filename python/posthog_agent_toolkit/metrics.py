@@ -0,0 +1,290 @@
+"""Metrics emitted by the PostHog Agent Toolkit, with pluggable sinks."""
+
+import math
+from typing import Any
+
+METRIC_PREFIX = "posthog_agent_toolkit"
+
+# Roughly four bytes of JSON per token for the tokenizers used by current LLMs
+BYTES_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many LLM tokens a piece of text will cost."""
+    return tokens_for_size(encoded_size(text))
+
+
+def tokens_for_size(num_bytes: int) -> int:
+    """Estimate how many LLM tokens a piece of text of the given size in bytes will cost."""
+    return math.ceil(num_bytes / BYTES_PER_TOKEN)
+
+
+def encoded_size(text: str) -> int:
+    """Size of a piece of text in bytes, encoded as UTF-8."""
+    return len(text.encode("utf-8"))
+
+
+class MetricsSink:
+    """
+    Receives the metrics recorded by the toolkit.
+
+    Every tool-level metric is labelled with the tool name and the tool category from
+    tool_definitions.json. All methods are no-ops here, so custom sinks only need to
+    override the metrics they care about.
+    """
+
+    def observe_latency(self, tool: str, category: str, seconds: float) -> None:
+        """Record the wall-clock duration of a tool call."""
+
+    def observe_request_size(self, tool: str, category: str, num_bytes: int) -> None:
+        """Record the size of the body of a tool call request sent to the server."""
+
+    def observe_response_size(self, tool: str, category: str, num_bytes: int) -> None:
+        """Record the size of the text returned by a tool."""
+
+    def observe_response_tokens(self, tool: str, category: str, tokens: int) -> None:
+        """Record the estimated number of LLM tokens in a tool response."""
+
+    def record_error(self, tool: str, category: str, error_type: str) -> None:
+        """Count a failed tool call, labelled with the error type."""
+
+    def record_cache_access(self, tool: str, category: str, cache: str, hit: bool) -> None:
+        """Count a lookup in one of the toolkit caches."""
+
+    def record_retry(self, tool: str, category: str) -> None:
+        """Count an additional attempt made for a tool call."""
+
+    def record_hedge(self, tool: str, category: str, won: bool) -> None:
+        """Count a duplicate request sent for a slow tool call, and whether it answered first."""
+
+    def set_pool_utilization(self, in_use: int, capacity: int | None) -> None:
+        """Report how many MCP sessions are in use, and the pool capacity if it is bounded."""
+
+    def observe_loop_lag(self, seconds: float) -> None:
+        """Record how much later than scheduled the event loop ran a callback."""
+
+    def observe_compression(self, encoding: str, compressed_bytes: int, decoded_bytes: int) -> None:
+        """Record the size of a compressed HTTP response on the wire and once decoded."""
+
+
+class NoopMetricsSink(MetricsSink):
+    """
+    Discards all metrics. This is the default sink.
+    """
+
+
+class OpenTelemetryMetricsSink(MetricsSink):
+    """
+    Records metrics with the OpenTelemetry metrics API.
+
+    Requires the `opentelemetry-api` package (`pip install posthog-agent-toolkit[opentelemetry]`).
+    """
+
+    def __init__(self, meter_provider: Any | None = None):
+        """
+        Initialize the sink.
+
+        Args:
+            meter_provider: OpenTelemetry MeterProvider to use (default: the global provider)
+        """
+        try:
+            from opentelemetry import metrics
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetryMetricsSink requires the `opentelemetry-api` package. Install it with `pip install posthog-agent-toolkit[opentelemetry]`."
+            ) from e
+
+        self._observation = metrics.Observation
+        meter = metrics.get_meter(METRIC_PREFIX, meter_provider=meter_provider)
+
+        self._latency = meter.create_histogram(f"{METRIC_PREFIX}.tool.duration", unit="s", description="Duration of tool calls")
+        self._request_size = meter.create_histogram(f"{METRIC_PREFIX}.tool.request.size", unit="By", description="Size of tool call requests")
+        self._response_size = meter.create_histogram(f"{METRIC_PREFIX}.tool.response.size", unit="By", description="Size of tool responses")
+        self._response_tokens = meter.create_histogram(
+            f"{METRIC_PREFIX}.tool.response.tokens", unit="{token}", description="Estimated LLM tokens in tool responses"
+        )
+        self._errors = meter.create_counter(f"{METRIC_PREFIX}.tool.errors", unit="{error}", description="Failed tool calls")
+        self._cache_requests = meter.create_counter(f"{METRIC_PREFIX}.cache.requests", unit="{request}", description="Toolkit cache lookups")
+        self._retries = meter.create_counter(f"{METRIC_PREFIX}.tool.retries", unit="{retry}", description="Additional attempts made for tool calls")
+        self._hedges = meter.create_counter(f"{METRIC_PREFIX}.tool.hedges", unit="{request}", description="Duplicate requests sent for slow tool calls")
+
+        self._loop_lag = meter.create_histogram(
+            f"{METRIC_PREFIX}.event_loop.lag", unit="s", description="Delay of event loop callbacks past their scheduled time"
+        )
+        self._compressed_size = meter.create_counter(
+            f"{METRIC_PREFIX}.http.response.compressed_size", unit="By", description="Bytes of compressed HTTP responses received"
+        )
+        self._decoded_size = meter.create_counter(
+            f"{METRIC_PREFIX}.http.response.decoded_size", unit="By", description="Bytes of compressed HTTP responses once decoded"
+        )
+        self._compression_ratio = meter.create_histogram(
+            f"{METRIC_PREFIX}.http.response.compression_ratio", unit="1", description="Decoded size of compressed HTTP responses over their compressed size"
+        )
+
+        self._pool_in_use = 0
+        self._pool_capacity: int | None = None
+        meter.create_observable_gauge(
+            f"{METRIC_PREFIX}.pool.in_use", callbacks=[self._observe_pool_in_use], unit="{session}", description="MCP sessions in use"
+        )
+        meter.create_observable_gauge(
+            f"{METRIC_PREFIX}.pool.utilization", callbacks=[self._observe_pool_utilization], unit="1", description="Fraction of the session pool in use"
+        )
+
+    def _observe_pool_in_use(self, _options: Any) -> list[Any]:
+        return [self._observation(self._pool_in_use)]
+
+    def _observe_pool_utilization(self, _options: Any) -> list[Any]:
+        if not self._pool_capacity:
+            return []
+        return [self._observation(self._pool_in_use / self._pool_capacity)]
+
+    def observe_latency(self, tool: str, category: str, seconds: float) -> None:
+        self._latency.record(seconds, {"tool": tool, "category": category})
+
+    def observe_request_size(self, tool: str, category: str, num_bytes: int) -> None:
+        self._request_size.record(num_bytes, {"tool": tool, "category": category})
+
+    def observe_response_size(self, tool: str, category: str, num_bytes: int) -> None:
+        self._response_size.record(num_bytes, {"tool": tool, "category": category})
+
+    def observe_response_tokens(self, tool: str, category: str, tokens: int) -> None:
+        self._response_tokens.record(tokens, {"tool": tool, "category": category})
+
+    def record_error(self, tool: str, category: str, error_type: str) -> None:
+        self._errors.add(1, {"tool": tool, "category": category, "error_type": error_type})
+
+    def record_cache_access(self, tool: str, category: str, cache: str, hit: bool) -> None:
+        self._cache_requests.add(1, {"tool": tool, "category": category, "cache": cache, "result": "hit" if hit else "miss"})
+
+    def record_retry(self, tool: str, category: str) -> None:
+        self._retries.add(1, {"tool": tool, "category": category})
+
+    def record_hedge(self, tool: str, category: str, won: bool) -> None:
+        self._hedges.add(1, {"tool": tool, "category": category, "result": "won" if won else "lost"})
+
+    def set_pool_utilization(self, in_use: int, capacity: int | None) -> None:
+        self._pool_in_use = in_use
+        self._pool_capacity = capacity
+
+    def observe_loop_lag(self, seconds: float) -> None:
+        self._loop_lag.record(seconds)
+
+    def observe_compression(self, encoding: str, compressed_bytes: int, decoded_bytes: int) -> None:
+        attributes = {"encoding": encoding}
+        self._compressed_size.add(compressed_bytes, attributes)
+        self._decoded_size.add(decoded_bytes, attributes)
+        self._compression_ratio.record(decoded_bytes / compressed_bytes, attributes)
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """
+    Records metrics with `prometheus_client`.
+
+    Requires the `prometheus-client` package (`pip install posthog-agent-toolkit[prometheus]`).
+    The cache hit ratio is `rate(..._cache_requests_total{result="hit"}) / rate(..._cache_requests_total)`,
+    and the overall compression ratio `rate(..._http_response_decoded_bytes_total) / rate(..._http_response_compressed_bytes_total)`.
+    """
+
+    def __init__(self, registry: Any | None = None):
+        """
+        Initialize the sink.
+
+        Args:
+            registry: Prometheus CollectorRegistry to register the metrics in (default: the global registry)
+        """
+        try:
+            import prometheus_client
+        except ImportError as e:
+            raise ImportError(
+                "PrometheusMetricsSink requires the `prometheus-client` package. Install it with `pip install posthog-agent-toolkit[prometheus]`."
+            ) from e
+
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+
+        labels = ["tool", "category"]
+        size_buckets = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+        token_buckets = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+        self._latency = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_tool_duration_seconds",
+            "Duration of tool calls",
+            labels,
+            registry=registry,
+            buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+        )
+        self._request_size = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_tool_request_bytes", "Size of tool call requests", labels, registry=registry, buckets=size_buckets
+        )
+        self._response_size = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_tool_response_bytes", "Size of tool responses", labels, registry=registry, buckets=size_buckets
+        )
+        self._response_tokens = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_tool_response_tokens", "Estimated LLM tokens in tool responses", labels, registry=registry, buckets=token_buckets
+        )
+        self._errors = prometheus_client.Counter(f"{METRIC_PREFIX}_tool_errors", "Failed tool calls", [*labels, "error_type"], registry=registry)
+        self._cache_requests = prometheus_client.Counter(
+            f"{METRIC_PREFIX}_cache_requests", "Toolkit cache lookups", [*labels, "cache", "result"], registry=registry
+        )
+        self._retries = prometheus_client.Counter(f"{METRIC_PREFIX}_tool_retries", "Additional attempts made for tool calls", labels, registry=registry)
+        self._hedges = prometheus_client.Counter(
+            f"{METRIC_PREFIX}_tool_hedges", "Duplicate requests sent for slow tool calls", [*labels, "result"], registry=registry
+        )
+        self._pool_in_use = prometheus_client.Gauge(f"{METRIC_PREFIX}_pool_in_use", "MCP sessions in use", registry=registry)
+        self._pool_utilization = prometheus_client.Gauge(f"{METRIC_PREFIX}_pool_utilization", "Fraction of the session pool in use", registry=registry)
+        self._loop_lag = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_event_loop_lag_seconds",
+            "Delay of event loop callbacks past their scheduled time",
+            registry=registry,
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+        )
+        self._compressed_size = prometheus_client.Counter(
+            f"{METRIC_PREFIX}_http_response_compressed_bytes", "Bytes of compressed HTTP responses received", ["encoding"], registry=registry
+        )
+        self._decoded_size = prometheus_client.Counter(
+            f"{METRIC_PREFIX}_http_response_decoded_bytes", "Bytes of compressed HTTP responses once decoded", ["encoding"], registry=registry
+        )
+        self._compression_ratio = prometheus_client.Histogram(
+            f"{METRIC_PREFIX}_http_response_compression_ratio",
+            "Decoded size of compressed HTTP responses over their compressed size",
+            ["encoding"],
+            registry=registry,
+            buckets=(1, 1.5, 2, 3, 5, 8, 13, 20, 50),
+        )
+
+    def observe_latency(self, tool: str, category: str, seconds: float) -> None:
+        self._latency.labels(tool, category).observe(seconds)
+
+    def observe_request_size(self, tool: str, category: str, num_bytes: int) -> None:
+        self._request_size.labels(tool, category).observe(num_bytes)
+
+    def observe_response_size(self, tool: str, category: str, num_bytes: int) -> None:
+        self._response_size.labels(tool, category).observe(num_bytes)
+
+    def observe_response_tokens(self, tool: str, category: str, tokens: int) -> None:
+        self._response_tokens.labels(tool, category).observe(tokens)
+
+    def record_error(self, tool: str, category: str, error_type: str) -> None:
+        self._errors.labels(tool, category, error_type).inc()
+
+    def record_cache_access(self, tool: str, category: str, cache: str, hit: bool) -> None:
+        self._cache_requests.labels(tool, category, cache, "hit" if hit else "miss").inc()
+
+    def record_retry(self, tool: str, category: str) -> None:
+        self._retries.labels(tool, category).inc()
+
+    def record_hedge(self, tool: str, category: str, won: bool) -> None:
+        self._hedges.labels(tool, category, "won" if won else "lost").inc()
+
+    def set_pool_utilization(self, in_use: int, capacity: int | None) -> None:
+        self._pool_in_use.set(in_use)
+        if capacity:
+            self._pool_utilization.set(in_use / capacity)
+
+    def observe_loop_lag(self, seconds: float) -> None:
+        self._loop_lag.observe(seconds)
+
+    def observe_compression(self, encoding: str, compressed_bytes: int, decoded_bytes: int) -> None:
+        self._compressed_size.labels(encoding).inc(compressed_bytes)
+        self._decoded_size.labels(encoding).inc(decoded_bytes)
+        self._compression_ratio.labels(encoding).observe(decoded_bytes / compressed_bytes)
@@ -0,0 +1,106 @@
+"""Decoding of large tool results in an executor, and a monitor of how long the event loop is held up."""
+
+import asyncio
+import functools
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import Any, TypeVar
+
+from posthog_agent_toolkit.metrics import MetricsSink
+
+T = TypeVar("T")
+
+# Characters of text above which decoding it moves off the event loop. Below it, handing the
+# work to a thread costs about as much as it saves.
+DEFAULT_OFFLOAD_THRESHOLD = 1_000_000
+
+
+class Offloader:
+    """
+    Runs CPU-bound work on large payloads, such as decoding JSON, in an executor so the event loop
+    keeps serving other tool calls in the meantime.
+
+    The default thread pool keeps the loop responsive, though decoding still holds the GIL while
+    it runs. A process pool decodes in parallel, but then the function, its arguments and its
+    result must be picklable, and are copied between processes.
+    """
+
+    def __init__(self, threshold: int | None = DEFAULT_OFFLOAD_THRESHOLD, executor: Executor | None = None):
+        """
+        Initialize the offloader.
+
+        Args:
+            threshold: Size of a payload above which work on it runs in the executor, or None to
+                always run it on the event loop
+            executor: Executor to run the work in (default: the event loop's default thread pool)
+        """
+        self.threshold = threshold
+        self.executor = executor
+
+    def offloads(self, size: int) -> bool:
+        """Whether work on a payload of the given size runs in the executor."""
+        return self.threshold is not None and size >= self.threshold
+
+    async def run(self, size: int, function: Callable[..., T], *args: Any) -> T:
+        """
+        Call a function on a payload, in the executor if the payload is large.
+
+        Args:
+            size: Size of the payload, e.g. the length of the text to decode
+            function: Function to call
+            args: Arguments to call it with
+        """
+        if not self.offloads(size):
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(function, *args))
+
+
+class LoopLagMonitor:
+    """
+    Measures how much later than scheduled the event loop wakes up a sleeping task, which is how
+    long other work held the loop, and reports it with `MetricsSink.observe_loop_lag`.
+
+    Usage:
+        monitor = LoopLagMonitor(metrics)
+        monitor.start()
+        ...
+        await monitor.aclose()
+    """
+
+    def __init__(self, metrics: MetricsSink, interval: float = 0.5):
+        """
+        Initialize the monitor.
+
+        Args:
+            metrics: Sink that receives the measured lag
+            interval: Seconds between measurements
+        """
+        self.metrics = metrics
+        self.interval = interval
+        # Largest lag measured so far, in seconds
+        self.max_lag = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start measuring on the running event loop, unless the monitor is running already."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled)
+            self.max_lag = max(self.max_lag, lag)
+            self.metrics.observe_loop_lag(lag)
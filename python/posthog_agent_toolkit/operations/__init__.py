@@ -0,0 +1,75 @@
+"""Operations composed of several tool calls, run concurrently instead of one agent turn at a time."""
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+# Calls a tool by name with the given arguments and returns its text result, e.g. `toolkit.call_tool`
+ToolCaller = Callable[[str, dict[str, Any]], Awaitable[str]]
+
+
+def compact(value: Any, drop_keys: frozenset[str] = frozenset()) -> Any:
+    """
+    Remove empty values from JSON data to keep results small.
+
+    Args:
+        value: Decoded JSON
+        drop_keys: Keys to remove from objects at any depth
+
+    Returns:
+        The data without None, empty strings, lists and objects, or the dropped keys
+    """
+    if isinstance(value, dict):
+        items = ((key, compact(item, drop_keys)) for key, item in value.items() if key not in drop_keys)
+        return {key: item for key, item in items if item is not None and item != "" and item != [] and item != {}}
+    if isinstance(value, list):
+        return [compact(item, drop_keys) for item in value]
+    return value
+
+
+def matches(current: Any, desired: Any) -> bool:
+    """
+    Check whether an entity already has the values an update would set.
+
+    Objects match when each key of `desired` matches the same key of `current`, so fields the
+    server adds on its own (IDs, timestamps, defaults) are ignored; a missing key counts as None.
+    Lists match item by item and must have the same length. Use `equals` for fields the server
+    replaces as a whole, where a key left out of `desired` would be removed.
+
+    Args:
+        current: Decoded JSON of the entity's current state
+        desired: Decoded JSON of the values to set
+
+    Returns:
+        Whether applying `desired` would leave `current` unchanged
+    """
+    if isinstance(desired, dict):
+        return isinstance(current, dict) and all(matches(current.get(key), value) for key, value in desired.items())
+    if isinstance(desired, list):
+        return isinstance(current, list) and len(current) == len(desired) and all(map(matches, current, desired))
+    # True == 1 in Python, but not in JSON
+    if isinstance(current, bool) != isinstance(desired, bool):
+        return False
+    return current == desired
+
+
+def equals(current: Any, desired: Any) -> bool:
+    """
+    Check whether two decoded JSON values are the same.
+
+    Unlike `matches`, objects must have the same keys, so this suits fields an update replaces as a
+    whole, such as a flag's filters.
+
+    Args:
+        current: Decoded JSON of the field's current value
+        desired: Decoded JSON of the value to set
+
+    Returns:
+        Whether setting `desired` would leave `current` unchanged
+    """
+    if isinstance(desired, dict):
+        return isinstance(current, dict) and current.keys() == desired.keys() and all(equals(current[key], value) for key, value in desired.items())
+    if isinstance(desired, list):
+        return isinstance(current, list) and len(current) == len(desired) and all(map(equals, current, desired))
+    if isinstance(current, bool) != isinstance(desired, bool):
+        return False
+    return current == desired
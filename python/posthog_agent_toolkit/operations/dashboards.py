@@ -0,0 +1,98 @@
+"""Dashboard snapshots: a dashboard and the results of all its insights, queried concurrently."""
+
+import asyncio
+import json
+import time
+from typing import Any
+
+from mcp.types import Tool, ToolAnnotations
+
+from posthog_agent_toolkit.operations import ToolCaller, compact
+
+SNAPSHOT_TOOL = "dashboard-snapshot"
+SNAPSHOT_TOOL_CATEGORY = "Dashboards"
+
+SNAPSHOT_TOOL_SCHEMA = Tool(
+    name=SNAPSHOT_TOOL,
+    title="Snapshot dashboard",
+    description=(
+        "Get a dashboard together with the current results of every insight on it, in one call. "
+        "Use it instead of dashboard-get followed by insight-query for every tile."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {"dashboardId": {"type": "integer", "exclusiveMinimum": 0}},
+        "required": ["dashboardId"],
+        "additionalProperties": False,
+    },
+    annotations=ToolAnnotations(readOnlyHint=True, destructiveHint=False, idempotentHint=True, openWorldHint=True),
+)
+
+
+async def snapshot_dashboard(call_tool: ToolCaller, dashboard_id: int, concurrency: int = 4) -> dict[str, Any]:
+    """
+    Fetch a dashboard and query all of its insights, with bounded parallelism.
+
+    Tiles whose insights have the same query share a single insight-query call.
+
+    Args:
+        call_tool: Calls a PostHog tool, e.g. `toolkit.call_tool`
+        dashboard_id: ID of the dashboard
+        concurrency: Maximum number of insight-query calls in flight at once
+
+    Returns:
+        {"dashboard": {...}, "tiles": [...], "queries": n, "duration_ms": n}, with one entry per
+        insight tile in dashboard order holding the insight's short ID, name, results and the
+        duration of its query. A tile with the same query as an earlier tile names that tile
+        under "same_query_as" instead of repeating its results, and a tile whose query failed
+        has an "error" instead of results.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+
+    started = time.perf_counter()
+    dashboard = json.loads(await call_tool("dashboard-get", {"dashboardId": dashboard_id}))
+    tiles = sorted((tile for tile in dashboard.get("tiles") or () if tile and tile.get("insight")), key=lambda tile: tile.get("order", 0))
+
+    # Short ID of the first tile with each query, which is queried on behalf of all of them
+    queried: dict[str, str] = {}
+    for tile in tiles:
+        insight = tile["insight"]
+        queried.setdefault(json.dumps(insight.get("query"), sort_keys=True), insight["short_id"])
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def query(short_id: str) -> tuple[Any, float]:
+        async with semaphore:
+            query_started = time.perf_counter()
+            text = await call_tool("insight-query", {"insightId": short_id})
+            return json.loads(text).get("results"), time.perf_counter() - query_started
+
+    short_ids = list(queried.values())
+    outcomes = await asyncio.gather(*(query(short_id) for short_id in short_ids), return_exceptions=True)
+    results = dict(zip(short_ids, outcomes, strict=True))
+
+    entries: list[dict[str, Any]] = []
+    for tile in tiles:
+        insight = tile["insight"]
+        source = queried[json.dumps(insight.get("query"), sort_keys=True)]
+        entry: dict[str, Any] = compact({"short_id": insight["short_id"], "name": insight.get("name") or insight.get("derived_name")})
+        if source != insight["short_id"]:
+            entry["same_query_as"] = source
+            entries.append(entry)
+            continue
+        outcome = results[source]
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            entry["error"] = str(outcome) or type(outcome).__name__
+        else:
+            entry["results"], duration = outcome
+            entry["duration_ms"] = round(duration * 1000)
+        entries.append(entry)
+
+    return {
+        "dashboard": compact({key: dashboard.get(key) for key in ("id", "name", "description")}),
+        "tiles": entries,
+        "queries": len(short_ids),
+        "duration_ms": round((time.perf_counter() - started) * 1000),
+    }
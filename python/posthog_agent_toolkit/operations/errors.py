@@ -0,0 +1,111 @@
+"""Error tracking triage: the top issues and their details, fetched concurrently."""
+
+import asyncio
+import json
+from typing import Any
+
+from mcp.types import Tool, ToolAnnotations
+
+from posthog_agent_toolkit.operations import ToolCaller, compact
+
+TRIAGE_TOOL = "error-triage"
+TRIAGE_TOOL_CATEGORY = "Error tracking"
+
+# Time series that make up most of an issue's size and are rarely needed to triage it
+VOLUME_KEYS = frozenset({"volumeDay", "volumeRange", "volume_buckets"})
+
+TRIAGE_TOOL_SCHEMA = Tool(
+    name=TRIAGE_TOOL,
+    title="Triage errors",
+    description=(
+        "List the top error tracking issues together with the details of each, in one call. "
+        "Use it instead of list-errors followed by error-details for every issue."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "limit": {"type": "integer", "minimum": 1, "maximum": 25, "description": "Number of issues to fetch details for (default: 5)"},
+            "orderBy": {"type": "string", "enum": ["occurrences", "first_seen", "last_seen", "users", "sessions"]},
+            "orderDirection": {"type": "string", "enum": ["ASC", "DESC"]},
+            "status": {"type": "string", "enum": ["active", "resolved", "all", "suppressed"]},
+            "dateFrom": {"type": "string", "format": "date-time"},
+            "dateTo": {"type": "string", "format": "date-time"},
+            "filterTestAccounts": {"type": "boolean"},
+        },
+        "additionalProperties": False,
+    },
+    annotations=ToolAnnotations(readOnlyHint=True, destructiveHint=False, idempotentHint=True, openWorldHint=True),
+)
+
+_LIST_ARGUMENTS = ("orderBy", "orderDirection", "status", "dateFrom", "dateTo", "filterTestAccounts")
+
+
+async def triage_errors(
+    call_tool: ToolCaller,
+    limit: int = 5,
+    concurrency: int = 4,
+    include_volume: bool = False,
+    **list_arguments: Any,
+) -> dict[str, Any]:
+    """
+    Fetch the top error tracking issues and the details of each, with bounded parallelism.
+
+    Args:
+        call_tool: Calls a PostHog tool, e.g. `toolkit.call_tool`
+        limit: Number of issues to fetch details for
+        concurrency: Maximum number of error-details calls in flight at once
+        include_volume: Keep the occurrence time series of each issue
+        **list_arguments: Arguments for list-errors, e.g. orderBy="users" or status="all"
+
+    Returns:
+        {"issues": [...]} with each issue's list entry, its aggregations flattened and the fields
+        only error-details returned under "details", plus {"failed": {issue_id: message}} for the
+        issues whose details could not be fetched
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+
+    drop_keys = frozenset() if include_volume else VOLUME_KEYS
+    issues = json.loads(await call_tool("list-errors", list_arguments))[:limit]
+    date_range = {key: list_arguments[key] for key in ("dateFrom", "dateTo") if key in list_arguments}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get_details(issue_id: str) -> Any:
+        async with semaphore:
+            return json.loads(await call_tool("error-details", {"issueId": issue_id, **date_range}))
+
+    details = await asyncio.gather(*(get_details(issue["id"]) for issue in issues), return_exceptions=True)
+
+    merged: list[dict[str, Any]] = []
+    failed: dict[str, str] = {}
+    for issue, issue_details in zip(issues, details, strict=True):
+        entry = _flatten(compact(issue, drop_keys))
+        if isinstance(issue_details, BaseException):
+            if not isinstance(issue_details, Exception):
+                raise issue_details
+            failed[issue["id"]] = str(issue_details) or type(issue_details).__name__
+        else:
+            if isinstance(issue_details, list):
+                issue_details = issue_details[0] if issue_details else {}
+            extra = {key: value for key, value in _flatten(compact(issue_details, drop_keys)).items() if entry.get(key) != value}
+            if extra:
+                entry["details"] = extra
+        merged.append(entry)
+
+    result: dict[str, Any] = {"issues": merged}
+    if failed:
+        result["failed"] = failed
+    return result
+
+
+def triage_tool_arguments(arguments: dict[str, Any]) -> dict[str, Any]:
+    """Split the arguments of the error-triage tool into keyword arguments for `triage_errors`."""
+    list_arguments = {key: arguments[key] for key in _LIST_ARGUMENTS if key in arguments}
+    return {"limit": arguments.get("limit", 5), **list_arguments}
+
+
+def _flatten(issue: Any) -> Any:
+    # Lift the aggregations (occurrences, users, sessions) next to the issue's other fields
+    if not isinstance(issue, dict) or not isinstance(issue.get("aggregations"), dict):
+        return issue
+    return {**{key: value for key, value in issue.items() if key != "aggregations"}, **issue["aggregations"]}
@@ -0,0 +1,246 @@
+"""Cached, change-aware polling of experiment results, shared by all subscribers of an experiment."""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+from posthog_agent_toolkit.invalidation import Invalidation
+from posthog_agent_toolkit.metrics import MetricsSink, NoopMetricsSink
+from posthog_agent_toolkit.operations import ToolCaller
+from posthog_agent_toolkit.tool_definitions import get_tool_category
+
+logger = logging.getLogger(__name__)
+
+RESULTS_TOOL = "experiment-results-get"
+
+
+@dataclass(frozen=True)
+class PollingOptions:
+    """How often experiment results are fetched again."""
+
+    # Seconds between fetches right after exposure counts moved
+    min_interval: float = 30.0
+    # Upper bound for the interval while results stay the same, and the interval for completed experiments
+    max_interval: float = 900.0
+    # Factor the interval grows by after each fetch that returned unchanged results
+    backoff: float = 2.0
+    # Ask the server to recalculate the results instead of returning its own cached values
+    refresh: bool = False
+
+
+@dataclass(frozen=True)
+class ExperimentSnapshot:
+    """Results of an experiment as returned by experiment-results-get at one point in time."""
+
+    experiment_id: int
+    text: str
+    results: dict[str, Any]
+    # Wall clock time of the fetch, in seconds since the epoch
+    fetched_at: float
+    # Whether the results differ from the previous fetch
+    changed: bool
+    # Whether the exposure counts differ from the previous fetch
+    exposures_changed: bool
+
+    @property
+    def total_exposures(self) -> dict[str, float]:
+        """Exposures per variant."""
+        return (self.results.get("exposures") or {}).get("total_exposures") or {}
+
+    @property
+    def completed(self) -> bool:
+        return (self.results.get("experiment") or {}).get("status") == "completed"
+
+
+class ExperimentPoller:
+    """
+    Keeps the latest results of one experiment and fetches them again only when new data is likely.
+
+    The interval between fetches grows by `backoff` while results stay the same and drops back to
+    `min_interval` when the exposure counts move. Any number of subscribers can `watch()` the
+    experiment; a single background task polls for all of them while at least one is watching.
+    """
+
+    def __init__(self, call_tool: ToolCaller, experiment_id: int, options: PollingOptions | None = None):
+        """
+        Initialize the poller.
+
+        Args:
+            call_tool: Calls a PostHog tool without going through the poller's cache
+            experiment_id: ID of the experiment
+            options: Polling intervals (default: PollingOptions())
+        """
+        self.experiment_id = experiment_id
+        self.options = options or PollingOptions()
+        self.interval = self.options.min_interval
+        self.latest: ExperimentSnapshot | None = None
+        self._call_tool = call_tool
+        self._fetched_at = 0.0
+        self._fetching: asyncio.Task[ExperimentSnapshot] | None = None
+        self._subscribers: set[asyncio.Queue[ExperimentSnapshot]] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def is_fresh(self, max_age: float | None = None) -> bool:
+        """Whether cached results exist and are younger than `max_age` (default: the current polling interval)."""
+        max_age = self.interval if max_age is None else max_age
+        return self.latest is not None and time.monotonic() - self._fetched_at < max_age
+
+    async def get(self, max_age: float | None = None) -> ExperimentSnapshot:
+        """
+        Get the experiment's results, fetching them only if the cached ones are too old.
+
+        Args:
+            max_age: Seconds after which cached results are fetched again (default: the current
+                polling interval)
+
+        Returns:
+            The latest results
+        """
+        if self.latest is not None and self.is_fresh(max_age):
+            return self.latest
+        return await self._fetch()
+
+    async def watch(self) -> AsyncIterator[ExperimentSnapshot]:
+        """
+        Yield the experiment's results now and again each time they change.
+
+        A slow subscriber skips intermediate results and always gets the latest ones.
+        """
+        queue: asyncio.Queue[ExperimentSnapshot] = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            if self.latest is not None:
+                yield self.latest
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    def expire(self) -> None:
+        """Fetch the results again on the next `get()` or poll, e.g. after the experiment was changed."""
+        self._fetched_at = float("-inf")
+        self.interval = self.options.min_interval
+
+    async def aclose(self) -> None:
+        """Stop polling. Subscribers stop receiving updates."""
+        tasks = [task for task in (self._task, self._fetching) if task is not None]
+        self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _fetch(self) -> ExperimentSnapshot:
+        # Concurrent callers share one request, which carries on if one of them is cancelled
+        if self._fetching is None or self._fetching.done():
+            self._fetching = asyncio.create_task(self._fetch_once())
+        return await asyncio.shield(self._fetching)
+
+    async def _fetch_once(self) -> ExperimentSnapshot:
+        text = await self._call_tool(RESULTS_TOOL, {"experimentId": self.experiment_id, "refresh": self.options.refresh})
+        results = json.loads(text)
+        previous = self.latest
+        snapshot = ExperimentSnapshot(
+            experiment_id=self.experiment_id,
+            text=text,
+            results=results,
+            fetched_at=time.time(),
+            changed=previous is None or previous.results != results,
+            exposures_changed=previous is not None and previous.total_exposures != (results.get("exposures") or {}).get("total_exposures", {}),
+        )
+        self._update_interval(snapshot)
+        self.latest = snapshot
+        self._fetched_at = time.monotonic()
+        if snapshot.changed:
+            self._publish(snapshot)
+        return snapshot
+
+    def _update_interval(self, snapshot: ExperimentSnapshot) -> None:
+        options = self.options
+        if snapshot.completed:
+            self.interval = options.max_interval
+        elif snapshot.exposures_changed:
+            self.interval = options.min_interval
+        elif not snapshot.changed:
+            self.interval = min(self.interval * options.backoff, options.max_interval)
+
+    def _publish(self, snapshot: ExperimentSnapshot) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+
+    async def _run(self) -> None:
+        while True:
+            wait = self.interval - (time.monotonic() - self._fetched_at) if self.latest is not None else 0.0
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                await self._fetch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Failed to poll results of experiment %s", self.experiment_id, exc_info=True)
+                self.interval = min(self.interval * self.options.backoff, self.options.max_interval)
+                self._fetched_at = time.monotonic()
+
+
+class ExperimentPollers:
+    """One shared `ExperimentPoller` per experiment."""
+
+    def __init__(self, call_tool: ToolCaller, options: PollingOptions | None = None, metrics: MetricsSink | None = None):
+        """
+        Initialize the pollers.
+
+        Args:
+            call_tool: Calls a PostHog tool without going through the pollers' cache
+            options: Polling intervals shared by all experiments (default: PollingOptions())
+            metrics: Sink that receives cache hits and misses
+        """
+        self.options = options or PollingOptions()
+        self.metrics = metrics or NoopMetricsSink()
+        self._call_tool = call_tool
+        self._pollers: dict[int, ExperimentPoller] = {}
+
+    def get(self, experiment_id: int) -> ExperimentPoller:
+        poller = self._pollers.get(experiment_id)
+        if poller is None:
+            poller = self._pollers[experiment_id] = ExperimentPoller(self._call_tool, experiment_id, self.options)
+        return poller
+
+    def invalidate(self, invalidation: Invalidation) -> None:
+        """Expire the cached results of the experiments changed by a write."""
+        for experiment_id, poller in self._pollers.items():
+            if invalidation.covers(RESULTS_TOOL, {"experimentId": experiment_id}):
+                poller.expire()
+
+    async def answer(self, arguments: dict[str, Any]) -> str | None:
+        """
+        Answer an experiment-results-get call from the cache.
+
+        Returns:
+            The results' text, or None for calls that ask the server to refresh the results
+        """
+        if arguments.get("refresh") or "experimentId" not in arguments:
+            return None
+        poller = self.get(int(arguments["experimentId"]))
+        self.metrics.record_cache_access(RESULTS_TOOL, get_tool_category(RESULTS_TOOL), "experiments", poller.is_fresh())
+        snapshot = await poller.get()
+        return snapshot.text
+
+    async def aclose(self) -> None:
+        pollers = list(self._pollers.values())
+        self._pollers.clear()
+        await asyncio.gather(*(poller.aclose() for poller in pollers))
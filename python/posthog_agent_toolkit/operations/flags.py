@@ -0,0 +1,79 @@
+"""Bulk feature flag updates: many flags patched concurrently, skipping the ones already up to date."""
+
+import asyncio
+import json
+from collections import Counter
+from collections.abc import Mapping
+from typing import Any
+
+from posthog_agent_toolkit.operations import ToolCaller, equals, matches
+
+# Fields of a flag returned by feature-flag-get-all; patches touching only these need no further lookup
+LISTED_FIELDS = frozenset({"name", "active"})
+
+# Fields update-feature-flag replaces as a whole, so a patch leaving out part of them is a change
+REPLACED_FIELDS = frozenset({"filters", "tags"})
+
+
+async def update_feature_flags(
+    call_tool: ToolCaller,
+    updates: Mapping[str, dict[str, Any]],
+    concurrency: int = 4,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """
+    Apply a patch to each of several feature flags, with bounded parallelism.
+
+    Flags are looked up once with feature-flag-get-all, and the full definition of a flag is only
+    fetched when its patch changes more than its name or active state. Each flag is updated with
+    just the fields that differ from its current definition, and flags that already match their
+    patch are not updated at all. Filters and tags are replaced as a whole, so they only count as
+    unchanged when they are exactly the same.
+
+    Args:
+        call_tool: Calls a PostHog tool, e.g. `toolkit.call_tool`
+        updates: Patch for each flag key, with the fields of update-feature-flag's `data`
+            (name, description, filters, active, tags)
+        concurrency: Maximum number of flags looked up or updated at once
+        dry_run: Only report what would change, without updating any flag
+
+    Returns:
+        {"flags": {key: {"status": ..., "changes": {field: {"from": ..., "to": ...}}}}, "counts": {status: n}}
+        where the status is "updated", "unchanged", "would_update" (dry run), "not_found" or
+        "failed", and failed flags have an "error" instead of changes
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+
+    listed = {flag["key"]: flag for flag in json.loads(await call_tool("feature-flag-get-all", {}))}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def update(key: str, patch: dict[str, Any]) -> dict[str, Any]:
+        flag = listed.get(key)
+        if flag is None:
+            return {"status": "not_found"}
+        async with semaphore:
+            if not set(patch) <= LISTED_FIELDS:
+                flag = json.loads(await call_tool("feature-flag-get-definition", {"flagId": flag["id"]}))
+            changes = {field: {"from": flag.get(field), "to": value} for field, value in patch.items() if not _unchanged(field, flag.get(field), value)}
+            if not changes:
+                return {"status": "unchanged"}
+            if dry_run:
+                return {"status": "would_update", "changes": changes}
+            await call_tool("update-feature-flag", {"flagKey": key, "data": {field: patch[field] for field in changes}})
+            return {"status": "updated", "changes": changes}
+
+    outcomes = await asyncio.gather(*(update(key, patch) for key, patch in updates.items()), return_exceptions=True)
+
+    report: dict[str, dict[str, Any]] = {}
+    for key, outcome in zip(updates, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            outcome = {"status": "failed", "error": str(outcome) or type(outcome).__name__}
+        report[key] = outcome
+    return {"flags": report, "counts": dict(Counter(entry["status"] for entry in report.values()))}
+
+
+def _unchanged(field: str, current: Any, desired: Any) -> bool:
+    return equals(current, desired) if field in REPLACED_FIELDS else matches(current, desired)
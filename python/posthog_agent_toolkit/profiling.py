@@ -0,0 +1,188 @@
+"""Hooks for observing the phases of each tool call, and a profiler built on them."""
+
+import logging
+import sys
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any, TextIO
+
+logger = logging.getLogger(__name__)
+
+
+class Phase:
+    """Names of the phases reported to `ToolCallHooks.on_phase`."""
+
+    # Waiting for the scheduler to admit the call
+    QUEUE = "queue"
+    # Waiting for an MCP session to become available and opening its transport
+    POOL_ACQUIRE = "pool_acquire"
+    # The MCP initialize handshake on a new session
+    HANDSHAKE = "handshake"
+    # From sending the tools/call request until the server starts responding
+    SERVER = "server"
+    # Receiving the response body and parsing the JSON-RPC message
+    TRANSFER = "transfer"
+    # Extracting and decoding the tool output
+    DECODE = "decode"
+    # LangChain input parsing and callbacks before the tool runs
+    WRAP = "wrap"
+
+
+@dataclass
+class ToolCall:
+    """A tool call as seen by hooks. `phases` and `duration` are filled in as the call progresses."""
+
+    tool: str
+    category: str
+    arguments: dict[str, Any]
+    started_at: float = field(default_factory=time.perf_counter)
+    phases: dict[str, float] = field(default_factory=dict)
+    duration: float | None = None
+    error: BaseException | None = None
+
+
+class ToolCallHooks:
+    """
+    Receives timing information for every tool call made through the toolkit.
+
+    Hooks run inline with the tool call, so they should be cheap. All methods are no-ops
+    here; override the ones you need.
+    """
+
+    def on_call_start(self, call: ToolCall) -> None:
+        """Called before a tool call is sent."""
+
+    def on_phase(self, call: ToolCall, phase: str, seconds: float) -> None:
+        """Called when a phase of a tool call completes."""
+
+    def on_call_end(self, call: ToolCall) -> None:
+        """Called once a tool call has finished, successfully or not (see `call.error`)."""
+
+
+class CompositeHooks(ToolCallHooks):
+    """Forwards every event to a list of hooks, logging and ignoring hook failures."""
+
+    def __init__(self, hooks: Iterable[ToolCallHooks] = ()):
+        self.hooks = list(hooks)
+
+    def add(self, hooks: ToolCallHooks) -> None:
+        self.hooks.append(hooks)
+
+    def on_call_start(self, call: ToolCall) -> None:
+        for hooks in self.hooks:
+            try:
+                hooks.on_call_start(call)
+            except Exception:
+                logger.exception("Tool call hook on_call_start failed")
+
+    def on_phase(self, call: ToolCall, phase: str, seconds: float) -> None:
+        call.phases[phase] = call.phases.get(phase, 0.0) + seconds
+        for hooks in self.hooks:
+            try:
+                hooks.on_phase(call, phase, seconds)
+            except Exception:
+                logger.exception("Tool call hook on_phase failed")
+
+    def on_call_end(self, call: ToolCall) -> None:
+        for hooks in self.hooks:
+            try:
+                hooks.on_call_end(call)
+            except Exception:
+                logger.exception("Tool call hook on_call_end failed")
+
+
+@dataclass
+class PhaseStats:
+    """Aggregated timings of one phase of one tool."""
+
+    tool: str
+    phase: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+class Profiler(ToolCallHooks):
+    """
+    Aggregates phase timings across a run and reports where the time went.
+
+    Usage:
+        profiler = Profiler()
+        toolkit.add_hooks(profiler)
+        ...  # run the agent
+        profiler.print_report()
+    """
+
+    TOTAL = "total"
+
+    def __init__(self):
+        self._stats: dict[tuple[str, str], PhaseStats] = {}
+        self._errors: dict[str, int] = {}
+
+    def on_phase(self, call: ToolCall, phase: str, seconds: float) -> None:
+        self._get(call.tool, phase).add(seconds)
+
+    def on_call_end(self, call: ToolCall) -> None:
+        if call.duration is not None:
+            self._get(call.tool, self.TOTAL).add(call.duration)
+        if call.error is not None:
+            self._errors[call.tool] = self._errors.get(call.tool, 0) + 1
+
+    def _get(self, tool: str, phase: str) -> PhaseStats:
+        stats = self._stats.get((tool, phase))
+        if stats is None:
+            stats = self._stats[(tool, phase)] = PhaseStats(tool=tool, phase=phase)
+        return stats
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self._errors.clear()
+
+    def stats(self) -> list[PhaseStats]:
+        """All collected phase statistics, including per-tool totals under the "total" phase."""
+        return list(self._stats.values())
+
+    def top(self, limit: int = 10) -> list[PhaseStats]:
+        """
+        Get the phases that took the most time in total.
+
+        Args:
+            limit: Maximum number of entries to return
+
+        Returns:
+            Phase statistics sorted by total time, slowest first
+        """
+        phases = [stats for stats in self._stats.values() if stats.phase != self.TOTAL]
+        return sorted(phases, key=lambda stats: stats.total, reverse=True)[:limit]
+
+    def report(self, limit: int = 10) -> str:
+        """Format the top offenders and the per-tool totals as a text table."""
+        lines = [f"{'tool':<36} {'phase':<14} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+        for stats in self.top(limit):
+            lines.append(self._format(stats))
+
+        totals = sorted((s for s in self._stats.values() if s.phase == self.TOTAL), key=lambda stats: stats.total, reverse=True)
+        if totals:
+            lines.append("")
+            lines.append(f"{'tool':<36} {'errors':<14} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}")
+            for stats in totals[:limit]:
+                lines.append(self._format(stats, label=str(self._errors.get(stats.tool, 0))))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format(stats: PhaseStats, label: str | None = None) -> str:
+        return f"{stats.tool:<36} {label if label is not None else stats.phase:<14} {stats.count:>6} {stats.total * 1000:>10.1f} {stats.mean * 1000:>9.1f} {stats.max * 1000:>9.1f}"
+
+    def print_report(self, limit: int = 10, file: TextIO | None = None) -> None:
+        """Print `report()` to stdout or the given file."""
+        print(self.report(limit), file=file or sys.stdout)
@@ -0,0 +1,157 @@
+"""Progress notifications of long-running tool calls, delivered to listeners or as an async iterator."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+# Name of the LangChain custom event dispatched for each progress notification of a toolkit tool
+PROGRESS_EVENT = "posthog_tool_progress"
+
+
+@dataclass(frozen=True)
+class Progress:
+    """
+    A progress notification sent by the server while a tool call runs.
+    """
+
+    tool: str
+    # Amount of work done so far, increasing with every notification of a call
+    progress: float
+    # Amount of work in total, if the server knows it
+    total: float | None
+    # Status text or partial result sent with the notification, e.g. the rows scanned so far
+    message: str | None
+    # Seconds since the call started
+    elapsed: float
+
+    @property
+    def fraction(self) -> float | None:
+        """Share of the work done, between 0 and 1, or None if the total is unknown."""
+        if not self.total:
+            return None
+        return min(self.progress / self.total, 1.0)
+
+    def to_event(self) -> dict[str, object]:
+        """The notification as the data of a LangChain custom event."""
+        return {
+            "tool": self.tool,
+            "progress": self.progress,
+            "total": self.total,
+            "fraction": self.fraction,
+            "message": self.message,
+            "elapsed": self.elapsed,
+        }
+
+
+# Receives the progress notifications of a tool call
+ProgressListener = Callable[[Progress], Awaitable[None]]
+
+# Progress callback of an MCP request, given the progress, total and message of each notification
+McpProgressCallback = Callable[[float, float | None, str | None], Awaitable[None]]
+
+
+def progress_callback(tool: str, started_at: float, listener: ProgressListener) -> McpProgressCallback:
+    """
+    Adapt a listener to the progress callback of an MCP request.
+
+    Errors raised by the listener are logged rather than failing the call.
+
+    Args:
+        tool: Name of the tool being called
+        started_at: `time.perf_counter()` when the call started
+        listener: Listener to notify
+    """
+
+    async def callback(progress: float, total: float | None, message: str | None) -> None:
+        try:
+            await listener(Progress(tool, progress, total, message, time.perf_counter() - started_at))
+        except Exception:
+            logger.exception("Progress listener failed")
+
+    return callback
+
+
+class ToolCallStream:
+    """
+    A tool call running in the background, whose progress notifications can be iterated over
+    until it completes.
+
+    Leaving the `async with` block before the call has completed cancels it, on the server too:
+
+        async with toolkit.stream_tool("query-run", arguments) as stream:
+            async for progress in stream:
+                if progress.elapsed > 30 and (progress.fraction or 0) < 0.1:
+                    break
+            else:
+                text = await stream.result()
+    """
+
+    def __init__(self, start: Callable[[ProgressListener], Awaitable[str]]):
+        """
+        Initialize the stream.
+
+        Args:
+            start: Starts the call, given the listener its progress notifications go to
+        """
+        self._start = start
+        self._queue: asyncio.Queue[Progress | None] = asyncio.Queue()
+        self._task: asyncio.Task[str] | None = None
+
+    async def __aenter__(self) -> "ToolCallStream":
+        self._started()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def __aiter__(self) -> AsyncIterator[Progress]:
+        """Yield the progress notifications of the call until it completes, successfully or not."""
+        self._started()
+        while True:
+            progress = await self._queue.get()
+            if progress is None:
+                # Let later iterations end as well
+                self._queue.put_nowait(None)
+                return
+            yield progress
+
+    @property
+    def done(self) -> bool:
+        """Whether the call has completed, successfully or not."""
+        return self._task is not None and self._task.done()
+
+    async def result(self) -> str:
+        """
+        Wait for the call to complete and get the text returned by the tool.
+
+        Raises:
+            The errors of `call_tool`, or asyncio.CancelledError if the stream was closed first
+        """
+        return await asyncio.shield(self._started())
+
+    async def aclose(self) -> None:
+        """Cancel the call if it has not completed yet."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        # Also retrieves the error of a failed call whose result nobody asked for
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def _started(self) -> asyncio.Task[str]:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._start(self._on_progress))
+            self._task.add_done_callback(lambda _: self._queue.put_nowait(None))
+        return self._task
+
+    async def _on_progress(self, progress: Progress) -> None:
+        self._queue.put_nowait(progress)
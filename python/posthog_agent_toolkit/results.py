@@ -0,0 +1,210 @@
+"""
+Typed results of the main read tools, decoded from a tool's JSON text in one pass.
+
+Decoding goes straight into compact structs, without building the intermediate dicts of
+`json.loads` and validating them again. Fields the server adds that are not declared here are
+skipped while decoding.
+
+Requires the `msgspec` package (`pip install posthog-agent-toolkit[msgspec]`).
+"""
+
+from typing import Any
+
+try:
+    import msgspec
+except ImportError as e:
+    raise ImportError("posthog_agent_toolkit.results requires the `msgspec` package. Install it with `pip install posthog-agent-toolkit[msgspec]`.") from e
+
+
+# Results are trees without reference cycles, so their structs don't need to be tracked by the
+# garbage collector, which makes them smaller and cheaper to create
+class Result(msgspec.Struct, kw_only=True, gc=False):
+    """Base class of the result structs."""
+
+
+class User(Result):
+    id: int | None = None
+    uuid: str | None = None
+    distinct_id: str | None = None
+    first_name: str | None = None
+    email: str | None = None
+
+
+class Insight(Result):
+    """An insight, as returned by insight-get."""
+
+    id: int
+    short_id: str
+    name: str | None = None
+    description: str | None = None
+    filters: dict[str, Any] | None = None
+    query: Any = None
+    result: Any = None
+    created_at: str | None = None
+    updated_at: str | None = None
+    created_by: User | None = None
+    favorited: bool | None = None
+    deleted: bool | None = None
+    dashboard: int | None = None
+    last_refresh: str | None = None
+    tags: list[str] | None = None
+    # Link to the insight in PostHog
+    url: str | None = None
+
+
+class TileInsight(Result):
+    """The insight shown on a dashboard tile."""
+
+    short_id: str
+    name: str | None = None
+    derived_name: str | None = None
+    description: str | None = None
+    query: Any = None
+    created_at: str | None = None
+    updated_at: str | None = None
+    favorited: bool | None = None
+    tags: list[str] | None = None
+
+
+class DashboardTile(Result):
+    # None for tiles that hold text rather than an insight
+    insight: TileInsight | None = None
+    order: int = 0
+    color: str | None = None
+    layouts: dict[str, Any] | None = None
+    last_refresh: str | None = None
+    is_cached: bool | None = None
+
+
+class Dashboard(Result):
+    """A dashboard and its tiles, as returned by dashboard-get."""
+
+    id: int
+    name: str | None = None
+    description: str | None = None
+    pinned: bool | None = None
+    created_at: str | None = None
+    tags: list[str] | None = None
+    tiles: list[DashboardTile | None] | None = None
+
+
+class FeatureFlagSummary(Result):
+    """A feature flag as listed by feature-flag-get-all."""
+
+    id: int
+    key: str
+    name: str = ""
+    active: bool = False
+
+
+class Series(Result):
+    """
+    One series of an insight query, as returned by query-run.
+
+    Trends have their values by day in `data` and `days`, and funnel steps their conversions in
+    `count` and `order`. Other insight kinds fill in the fields they share with these. Days are
+    dates, or for stickiness the number of days users were active.
+    """
+
+    label: str | None = None
+    name: str | None = None
+    count: float | None = None
+    aggregated_value: float | None = None
+    data: list[float] | None = None
+    days: list[str | int] | None = None
+    labels: list[str] | None = None
+    breakdown_value: Any = None
+    order: int | None = None
+    action: dict[str, Any] | None = None
+
+
+class IssueAggregations(Result):
+    occurrences: int = 0
+    sessions: int = 0
+    users: int = 0
+    volume_range: list[int] | None = msgspec.field(default=None, name="volumeRange")
+
+
+class ErrorIssue(Result):
+    """An error tracking issue, as listed by list-errors."""
+
+    id: str
+    name: str | None = None
+    description: str | None = None
+    status: str | None = None
+    first_seen: str | None = None
+    last_seen: str | None = None
+    library: str | None = None
+    assignee: dict[str, Any] | None = None
+    aggregations: IssueAggregations | None = None
+
+
+class SurveyEventStats(Result):
+    total_count: int | None = None
+    total_count_only_seen: int | None = None
+    unique_persons: int | None = None
+    unique_persons_only_seen: int | None = None
+    first_seen: str | None = None
+    last_seen: str | None = None
+
+
+class SurveyStatsByEvent(Result):
+    shown: SurveyEventStats | None = msgspec.field(default=None, name="survey shown")
+    dismissed: SurveyEventStats | None = msgspec.field(default=None, name="survey dismissed")
+    sent: SurveyEventStats | None = msgspec.field(default=None, name="survey sent")
+
+
+class SurveyRates(Result):
+    response_rate: float | None = None
+    dismissal_rate: float | None = None
+    unique_users_response_rate: float | None = None
+    unique_users_dismissal_rate: float | None = None
+
+
+class SurveyStats(Result):
+    """Response statistics of a survey, as returned by survey-stats."""
+
+    survey_id: str | None = None
+    start_date: str | None = None
+    end_date: str | None = None
+    stats: SurveyStatsByEvent | None = None
+    rates: SurveyRates | None = None
+
+
+# Type each tool's text decodes into. Rows of SQL queries run with query-run decode as lists, and
+# results that are a single object, such as a funnel's time to convert, as dicts.
+RESULT_TYPES: dict[str, Any] = {
+    "insight-get": Insight,
+    "dashboard-get": Dashboard,
+    "feature-flag-get-all": list[FeatureFlagSummary],
+    "query-run": list[Series | list[Any]] | dict[str, Any],
+    "list-errors": list[ErrorIssue],
+    "survey-stats": SurveyStats,
+}
+
+_DECODERS = {tool: msgspec.json.Decoder(result_type) for tool, result_type in RESULT_TYPES.items()}
+
+
+def decode_result(tool: str, text: str | bytes) -> Any:
+    """
+    Decode the text returned by a tool into its result type.
+
+    Args:
+        tool: Name of the tool, one of `RESULT_TYPES`
+        text: JSON text returned by the tool
+
+    Returns:
+        The decoded result, e.g. an `Insight` for insight-get
+
+    Raises:
+        ValueError: If the tool has no result type, or the text doesn't match it
+    """
+    decoder = _DECODERS.get(tool)
+    if decoder is None:
+        raise ValueError(f"{tool} has no result type, expected one of {', '.join(RESULT_TYPES)}.")
+    return decoder.decode(text)
+
+
+def to_builtins(result: Any) -> Any:
+    """Convert a decoded result back into dicts and lists, e.g. to serialize it with `json`."""
+    return msgspec.to_builtins(result)
@@ -0,0 +1,199 @@
+"""Lexical routing of user messages to the few tools relevant to them, without model calls."""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from typing import Generic, TypeVar
+
+from posthog_agent_toolkit.tool_definitions import ToolDefinition, get_tool_definitions
+
+T = TypeVar("T")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOP_WORDS = frozenset(
+    "a about all an and any are as at be by can do does for from get give has have how i if in into is it its me my "
+    "no not of on or our please show so some that the their them then there these this to up us use using was we what "
+    "when where which who why will with you your".split()
+)
+
+# Words users say for things the tool definitions name differently, added to the terms of a message
+SYNONYMS = {
+    "ab": "experiment",
+    "test": "experiment",
+    "variant": "experiment",
+    "rollout": "flag",
+    "toggle": "flag",
+    "chart": "insight",
+    "graph": "insight",
+    "trend": "insight",
+    "funnel": "insight",
+    "retention": "insight",
+    "pageview": "event",
+    "click": "event",
+    "count": "query",
+    "many": "query",
+    "sql": "query",
+    "hogql": "query",
+    "bug": "error",
+    "exception": "error",
+    "crash": "error",
+    "feedback": "survey",
+    "nps": "survey",
+    "spend": "cost",
+}
+
+# How many times each field of a tool definition counts towards the terms of its document
+FIELD_WEIGHTS = {"name": 3, "title": 3, "summary": 2, "category": 2, "description": 1}
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case terms, dropping stop words and plural endings."""
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOP_WORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+def tool_document(definition: ToolDefinition) -> list[str]:
+    """The weighted terms a tool is found by: its name, title, summary, category and description."""
+    fields = {
+        "name": definition.name,
+        "title": definition.title,
+        "summary": definition.summary,
+        "category": definition.category,
+        "description": definition.description,
+    }
+    return [term for field, text in fields.items() for term in tokenize(text) * FIELD_WEIGHTS[field]]
+
+
+class ToolRouter:
+    """
+    Ranks tools against a message with Okapi BM25 over their definitions.
+
+    Scoring is deterministic, with ties broken by tool name, and takes a few microseconds per
+    query term for the toolkit's few dozen tools.
+    """
+
+    def __init__(self, documents: Mapping[str, Iterable[str]], k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the router.
+
+        Args:
+            documents: Terms of each tool by tool name, e.g. from `tool_document`
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.names = sorted(documents)
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        lengths = []
+        for position, name in enumerate(self.names):
+            terms = Counter(documents[name])
+            lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, []).append((position, frequency))
+        average = sum(lengths) / len(lengths) if lengths else 0.0
+        self._norms = [k1 * (1 - b + b * length / average) if average else k1 for length in lengths]
+        count = len(self.names)
+        self._idf = {term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) for term, postings in self._postings.items()}
+
+    @classmethod
+    def from_definitions(cls, names: Iterable[str] | None = None) -> "ToolRouter":
+        """Build a router over the bundled tool definitions, optionally limited to some tools."""
+        definitions = get_tool_definitions()
+        selected = definitions if names is None else {name: definitions[name] for name in names if name in definitions}
+        return cls({name: tool_document(definition) for name, definition in selected.items()})
+
+    def scores(self, text: str) -> dict[str, float]:
+        """BM25 score of every tool that shares at least one term with `text`."""
+        scores: dict[int, float] = {}
+        terms = tokenize(text)
+        terms.extend(SYNONYMS[term] for term in terms if term in SYNONYMS)
+        for term in set(terms):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for position, frequency in self._postings[term]:
+                scores[position] = scores.get(position, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self._norms[position])
+        return {self.names[position]: score for position, score in scores.items()}
+
+    def route(self, text: str, k: int = 8) -> list[str]:
+        """
+        Pick the tools most relevant to a message.
+
+        Args:
+            text: User message, or a few recent messages joined together
+            k: Maximum number of tools to return
+
+        Returns:
+            Names of up to `k` tools, best match first; empty if no tool matches any term
+        """
+        ranked = sorted(self.scores(text).items(), key=lambda item: (-item[1], item[0]))
+        return [name for name, _ in ranked[:k]]
+
+
+class ConversationRouter(Generic[T]):
+    """
+    Keeps the tools routed for a conversation, and routes again only when the topic shifts.
+
+    Keeping the selection stable across turns also keeps the prompt prefix stable, which is what
+    LLM providers cache.
+    """
+
+    def __init__(
+        self,
+        router: ToolRouter,
+        items: Mapping[str, T],
+        k: int = 8,
+        always_include: Iterable[str] = (),
+        shift_threshold: float = 0.5,
+    ):
+        """
+        Initialize the conversation router.
+
+        Args:
+            router: Router used to rank tools
+            items: What to return for each tool name, e.g. LangChain tools
+            k: Number of routed tools
+            always_include: Names of tools returned on every turn in addition to the routed ones
+            shift_threshold: Share of a message's top-k tools that must already be selected for
+                the selection to be kept
+        """
+        self.router = router
+        self.items = items
+        self.k = k
+        self.always_include = [name for name in always_include if name in items]
+        self.shift_threshold = shift_threshold
+        self.selected: list[str] = []
+        # Number of times the selection changed
+        self.shifts = 0
+
+    def update(self, message: str) -> list[T]:
+        """
+        Route a new user message.
+
+        Messages that match no tool, such as "thanks", keep the current selection.
+
+        Returns:
+            The tools to expose for this turn
+        """
+        ranked = [name for name in self.router.route(message, self.k) if name in self.items]
+        if ranked:
+            overlap = len(set(ranked) & set(self.selected)) / len(ranked)
+            if not self.selected or overlap < self.shift_threshold:
+                self.selected = ranked
+                self.shifts += 1
+        return [self.items[name] for name in dict.fromkeys([*self.always_include, *self.selected])]
+
+    def reset(self) -> None:
+        """Forget the selection, e.g. when a new conversation starts."""
+        self.selected = []
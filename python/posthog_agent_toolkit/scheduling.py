@@ -0,0 +1,257 @@
+"""A scheduler that admits tool calls by priority lane and shares capacity fairly between tenants."""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+class Priority:
+    """Lanes of the scheduler, served in the order of `LANES`."""
+
+    # Calls someone is waiting for, e.g. from a chat agent
+    INTERACTIVE = "interactive"
+    # Background jobs, which only get the capacity interactive calls leave
+    BATCH = "batch"
+
+
+LANES = (Priority.INTERACTIVE, Priority.BATCH)
+
+# Relative cost of a call of each tool on the server, for tools that cost more than DEFAULT_COST.
+# Queries of event data keep the server busy far longer than reads of entities.
+TOOL_COSTS: dict[str, float] = {
+    "query-run": 8.0,
+    "query-generate-hogql-from-question": 5.0,
+    "experiment-results-get": 5.0,
+    "insight-query": 4.0,
+    "survey-stats": 2.0,
+    "surveys-global-stats": 2.0,
+}
+
+# Cost of a call of any other tool
+DEFAULT_COST = 1.0
+
+# Lane of the calls made in the current context
+_lane: ContextVar[str] = ContextVar("posthog_priority", default=Priority.INTERACTIVE)
+
+
+class SchedulerOverloadedError(RuntimeError):
+    """Raised when a tool call is rejected because too many calls are already waiting."""
+
+
+@contextmanager
+def lane(priority: str | None) -> Iterator[None]:
+    """
+    Run the tool calls made within the context, e.g. by a batch job, in the given lane.
+
+    Args:
+        priority: One of `LANES`, or None to keep the current lane
+    """
+    if priority is None:
+        yield
+        return
+    if priority not in LANES:
+        raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(LANES)}.")
+    token = _lane.set(priority)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> str:
+    """The lane of the calls made in the current context."""
+    return _lane.get()
+
+
+@dataclass
+class _Waiter:
+    tenant: "_Tenant"
+    lane: str
+    cost: float
+    # Virtual time at which the call's turn starts, under start-time fair queuing
+    start: float
+    admitted: asyncio.Future[None]
+
+
+@dataclass
+class _Tenant:
+    name: str
+    in_flight: int = 0
+    max_in_flight: int | None = None
+    # Virtual time at which the tenant's last call ends
+    finish: float = 0.0
+    queues: dict[str, deque[_Waiter]] = field(default_factory=lambda: {priority: deque() for priority in LANES})
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and not any(self.queues.values())
+
+
+class Scheduler:
+    """
+    Admits tool calls while their total cost stays within `capacity`, queuing the rest.
+
+    Queued calls are admitted lane by lane, so interactive calls never wait behind batch calls,
+    and batch calls can use at most `batch_share` of the capacity. Within a lane, tenants take
+    turns by weighted fair queuing: each tenant gets a share of the capacity proportional to its
+    weight, however many calls it queues. Share one scheduler between toolkits to schedule their
+    calls together.
+    """
+
+    def __init__(
+        self,
+        capacity: float = 32.0,
+        max_queue: int = 256,
+        batch_share: float = 0.75,
+        costs: Mapping[str, float] | None = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            capacity: Total cost of the calls that may run at the same time
+            max_queue: Maximum number of calls waiting to be admitted; further calls are rejected
+            batch_share: Fraction of the capacity batch calls may use
+            costs: Cost of the calls of each tool, in addition to and overriding `TOOL_COSTS`
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        if not 0 < batch_share <= 1:
+            raise ValueError("batch_share must be in (0, 1].")
+
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.limits = {Priority.INTERACTIVE: capacity, Priority.BATCH: capacity * batch_share}
+        self.costs = {**TOOL_COSTS, **(costs or {})}
+        self.queued = 0
+        self.running = 0
+        self._in_flight = dict.fromkeys(LANES, 0.0)
+        self._weights: dict[str, float] = {}
+        self._tenants: dict[str, _Tenant] = {}
+        # Start of the most recently admitted call, which new calls can't start before
+        self._virtual_time = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def in_flight(self) -> float:
+        """Total cost of the calls currently admitted."""
+        return sum(self._in_flight.values())
+
+    def cost(self, tool: str) -> float:
+        return self.costs.get(tool, DEFAULT_COST)
+
+    def set_weight(self, tenant: str, weight: float) -> None:
+        """Give a tenant a larger or smaller share of the capacity than the default weight of 1."""
+        if weight <= 0:
+            raise ValueError("weight must be positive.")
+        self._weights[tenant] = weight
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, cost: float, priority: str | None = None, max_in_flight: int | None = None) -> AsyncIterator[None]:
+        """
+        Wait until a call is admitted, and hold its share of the capacity for the duration of the context.
+
+        Args:
+            tenant: Name of the tenant making the call
+            cost: Cost of the call, e.g. `scheduler.cost(tool)`
+            priority: Lane of the call (default: the lane of the current context)
+            max_in_flight: Maximum number of the tenant's calls admitted at the same time, e.g.
+                the number of sessions it can use
+
+        Raises:
+            SchedulerOverloadedError: If `max_queue` calls are already waiting
+        """
+        priority = priority or current_lane()
+        if priority not in LANES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(LANES)}.")
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Waiters are bound to the event loop they were created on, so start over on a new loop
+            self._loop = loop
+            self.queued = 0
+            self.running = 0
+            self._in_flight = dict.fromkeys(LANES, 0.0)
+            self._tenants = {}
+
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = _Tenant(tenant)
+        state.max_in_flight = max_in_flight
+        if self.queued >= self.max_queue:
+            self._forget_if_idle(state)
+            raise SchedulerOverloadedError(f"{self.queued} tool calls are already waiting to run.")
+
+        # A call costing more than its lane may use runs once it has the lane to itself
+        cost = min(cost, self.limits[priority])
+        start = max(self._virtual_time, state.finish)
+        state.finish = start + cost / self._weights.get(tenant, 1.0)
+        waiter = _Waiter(state, priority, cost, start, loop.create_future())
+        state.queues[priority].append(waiter)
+        self.queued += 1
+        self._dispatch()
+
+        try:
+            await waiter.admitted
+        except asyncio.CancelledError:
+            if not waiter.admitted.cancelled():
+                # Admitted just before the cancellation arrived
+                self._release(waiter)
+                raise
+            if waiter in state.queues[priority]:
+                state.queues[priority].remove(waiter)
+                self.queued -= 1
+            self._forget_if_idle(state)
+            self._dispatch()
+            raise
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    def _dispatch(self) -> None:
+        while (waiter := self._next()) is not None:
+            waiter.tenant.queues[waiter.lane].popleft()
+            self.queued -= 1
+            if waiter.admitted.cancelled():
+                continue
+            self.running += 1
+            waiter.tenant.in_flight += 1
+            self._in_flight[waiter.lane] += waiter.cost
+            self._virtual_time = max(self._virtual_time, waiter.start)
+            waiter.admitted.set_result(None)
+
+    def _next(self) -> _Waiter | None:
+        for priority in LANES:
+            heads = [
+                tenant.queues[priority][0]
+                for tenant in self._tenants.values()
+                if tenant.queues[priority] and (tenant.max_in_flight is None or tenant.in_flight < tenant.max_in_flight)
+            ]
+            if not heads:
+                continue
+            waiter = min(heads, key=lambda head: head.start)
+            in_flight = self.in_flight
+            # Calls that don't fit yet hold back the lanes after theirs, which would only take
+            # the capacity they are waiting for
+            if self.running and (in_flight + waiter.cost > self.capacity or self._in_flight[priority] + waiter.cost > self.limits[priority]):
+                return None
+            return waiter
+        return None
+
+    def _release(self, waiter: _Waiter) -> None:
+        self.running -= 1
+        waiter.tenant.in_flight -= 1
+        self._in_flight[waiter.lane] -= waiter.cost
+        if not self.running:
+            # Don't let rounding errors add up
+            self._in_flight = dict.fromkeys(LANES, 0.0)
+        self._forget_if_idle(waiter.tenant)
+        self._dispatch()
+
+    def _forget_if_idle(self, tenant: _Tenant) -> None:
+        if tenant.idle and self._tenants.get(tenant.name) is tenant:
+            del self._tenants[tenant.name]
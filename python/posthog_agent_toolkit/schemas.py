@@ -0,0 +1,228 @@
+"""Compaction of tool input schemas, to keep the tool definitions sent with every LLM turn small."""
+
+import copy
+import json
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from mcp.types import Tool
+
+# Keys whose value is a subschema, and keys whose value is a list of subschemas
+_SCHEMA_KEYS = ("items", "additionalProperties", "not", "propertyNames", "contains", "if", "then", "else")
+_SCHEMA_LIST_KEYS = ("anyOf", "oneOf", "allOf", "prefixItems")
+
+_REF_PREFIXES = ("#/$defs/", "#/definitions/")
+
+# Values of `default` that tell the model nothing it would not assume for an omitted argument.
+# They are compared by type as well as value, since `0 == False` and a default of 0 does matter.
+_EMPTY_DEFAULTS: tuple[Any, ...] = (None, False, "", [], {})
+
+
+@dataclass(frozen=True)
+class SchemaCompaction:
+    """
+    Options for `compact_schema`.
+
+    Apart from `strip_additional_properties`, compaction keeps the set of accepted arguments the same.
+    """
+
+    # Property descriptions longer than this are cut at a word boundary; None keeps them whole
+    max_description_length: int | None = 200
+    # Move subschemas repeated within a tool's schema to `$defs` and reference them
+    share_definitions: bool = True
+    # Minimum size in bytes of the JSON of a repeated subschema before it is shared
+    min_shared_size: int = 120
+    # Shared definitions that are enums with at most this many values are inlined at each use
+    max_inline_enum_size: int = 8
+    # Drop defaults that are empty or false, and defaults of required properties
+    strip_defaults: bool = True
+    # Drop `"additionalProperties": false`; the server still rejects unknown arguments
+    strip_additional_properties: bool = True
+
+
+def compact_schema(schema: dict[str, Any], options: SchemaCompaction | None = None) -> dict[str, Any]:
+    """
+    Shrink a JSON Schema while keeping what it tells the model about the arguments.
+
+    Unions of constants are turned into enums, redundant defaults, `"additionalProperties": false`
+    and the `$schema` keyword are dropped, long descriptions are shortened, small enum definitions are inlined and identical
+    definitions merged, and large repeated subschemas are moved to shared `$defs`.
+
+    Args:
+        schema: A tool's input schema; it is not modified
+        options: What to compact (default: SchemaCompaction())
+
+    Returns:
+        The compacted schema
+    """
+    options = options or SchemaCompaction()
+    schema = copy.deepcopy(schema)
+    schema.pop("$schema", None)
+
+    definitions = _merge_definitions(schema, options)
+    schema = _transform(schema, lambda node: _compact_node(node, options))
+    if definitions:
+        schema["$defs"] = {name: _transform(definition, lambda node: _compact_node(node, options)) for name, definition in definitions.items()}
+    if options.share_definitions:
+        _share_repeated(schema, options)
+    return schema
+
+
+def compact_tool(tool: Tool, options: SchemaCompaction | None = None) -> Tool:
+    """Get a copy of an MCP tool with its input schema compacted."""
+    return tool.model_copy(update={"inputSchema": compact_schema(tool.inputSchema, options)})
+
+
+def _walk(node: dict[str, Any], label: str = "") -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yield every subschema of `node` except definitions, labelled with the closest property name."""
+    children: list[tuple[str, Any]] = [(label, node.get(key)) for key in _SCHEMA_KEYS]
+    children.extend((label, value) for key in _SCHEMA_LIST_KEYS for value in node.get(key) or ())
+    children.extend(item for key in ("properties", "patternProperties") for item in (node.get(key) or {}).items())
+    for child_label, child in children:
+        if isinstance(child, dict):
+            yield child_label, child
+            yield from _walk(child, child_label)
+
+
+def _transform(node: dict[str, Any], function: Callable[[dict[str, Any]], dict[str, Any]]) -> dict[str, Any]:
+    """Apply `function` to every subschema of `node`, innermost first, and then to `node` itself."""
+    for key in _SCHEMA_KEYS:
+        if isinstance(node.get(key), dict):
+            node[key] = _transform(node[key], function)
+    for key in _SCHEMA_LIST_KEYS:
+        if isinstance(node.get(key), list):
+            node[key] = [_transform(value, function) if isinstance(value, dict) else value for value in node[key]]
+    for key in ("properties", "patternProperties"):
+        if isinstance(node.get(key), dict):
+            node[key] = {name: _transform(value, function) if isinstance(value, dict) else value for name, value in node[key].items()}
+    return function(node)
+
+
+def _compact_node(node: dict[str, Any], options: SchemaCompaction) -> dict[str, Any]:
+    for key in ("anyOf", "oneOf"):
+        variants = node.get(key)
+        if isinstance(variants, list) and len(variants) > 1 and all(_is_const(variant) for variant in variants):
+            types = {variant.get("type") for variant in variants}
+            if len(types) == 1:
+                node = {k: v for k, v in node.items() if k != key}
+                if None not in types:
+                    node["type"] = types.pop()
+                node["enum"] = [variant["const"] for variant in variants]
+
+    description = node.get("description")
+    if options.max_description_length is not None and isinstance(description, str):
+        node["description"] = _truncate(description, options.max_description_length)
+
+    if options.strip_additional_properties and node.get("additionalProperties") is False:
+        del node["additionalProperties"]
+
+    if options.strip_defaults:
+        if "default" in node and _is_empty_default(node["default"]):
+            del node["default"]
+        properties = node.get("properties")
+        if isinstance(properties, dict):
+            for name in node.get("required") or ():
+                if isinstance(properties.get(name), dict):
+                    properties[name].pop("default", None)
+    return node
+
+
+def _is_empty_default(value: Any) -> bool:
+    return any(type(value) is type(empty) and value == empty for empty in _EMPTY_DEFAULTS)
+
+
+def _is_const(node: dict[str, Any]) -> bool:
+    return "const" in node and set(node) <= {"const", "type"}
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[: limit - 1]
+    if " " in cut:
+        cut = cut[: cut.rindex(" ")]
+    return cut.rstrip(" ,;:.") + "…"
+
+
+def _canonical(node: Any) -> str:
+    return json.dumps(node, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _merge_definitions(schema: dict[str, Any], options: SchemaCompaction) -> dict[str, dict[str, Any]]:
+    """Take the existing definitions out of `schema`, inlining small enums and merging duplicates."""
+    definitions: dict[str, dict[str, Any]] = {}
+    for key in ("$defs", "definitions"):
+        for name, definition in (schema.pop(key, None) or {}).items():
+            definitions[f"{key}/{name}"] = definition
+    if not definitions:
+        return {}
+
+    inline: dict[str, dict[str, Any]] = {}
+    kept: dict[str, str] = {}
+    by_content: dict[str, str] = {}
+    for path, definition in definitions.items():
+        enum = definition.get("enum")
+        if isinstance(enum, list) and len(enum) <= options.max_inline_enum_size:
+            inline[path] = definition
+            continue
+        content = _canonical(definition)
+        name = by_content.setdefault(content, path.split("/", 1)[1])
+        kept[path] = name
+
+    def rewrite(node: dict[str, Any]) -> dict[str, Any]:
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith(_REF_PREFIXES):
+            path = ref[2:]
+            if path in inline:
+                return {**copy.deepcopy(inline[path]), **{k: v for k, v in node.items() if k != "$ref"}}
+            if path in kept:
+                node["$ref"] = f"#/$defs/{kept[path]}"
+        return node
+
+    _transform(schema, rewrite)
+    merged = {name: definitions[path] for path, name in kept.items() if path.split("/", 1)[1] == name}
+    for definition in merged.values():
+        _transform(definition, rewrite)
+    return merged
+
+
+def _share_repeated(schema: dict[str, Any], options: SchemaCompaction) -> None:
+    """Move the largest subschema that appears more than once to `$defs`, until none is left."""
+    definitions: dict[str, dict[str, Any]] = schema.setdefault("$defs", {})
+    while True:
+        counts: Counter[str] = Counter()
+        labels: dict[str, str] = {}
+        for root in (schema, *definitions.values()):
+            for label, node in _walk(root):
+                content = _canonical(node)
+                counts[content] += 1
+                labels.setdefault(content, label)
+
+        repeated = [content for content, count in counts.items() if count > 1 and len(content) >= options.min_shared_size]
+        if not repeated:
+            break
+        content = max(repeated, key=len)
+        name = _definition_name(labels[content], definitions)
+        definitions[name] = json.loads(content)
+        reference = {"$ref": f"#/$defs/{name}"}
+
+        def replace(node: dict[str, Any], content: str = content, reference: dict[str, str] = reference) -> dict[str, Any]:
+            return dict(reference) if _canonical(node) == content else node
+
+        _transform(schema, replace)
+        for key in list(definitions):
+            if key != name:
+                definitions[key] = _transform(definitions[key], replace)
+    if not definitions:
+        del schema["$defs"]
+
+
+def _definition_name(label: str, definitions: dict[str, Any]) -> str:
+    base = "".join(part[:1].upper() + part[1:] for part in re.split(r"[^0-9A-Za-z]+", label) if part) or "Shared"
+    name, suffix = base, 2
+    while name in definitions:
+        name, suffix = f"{base}{suffix}", suffix + 1
+    return name
@@ -0,0 +1,308 @@
+"""A pool of initialized MCP sessions that are reused across tool calls."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+import httpx
+from anyio.abc import ObjectSendStream
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.shared.message import SessionMessage
+from mcp.types import CallToolResult, CancelledNotification, CancelledNotificationParams, ClientNotification, JSONRPCRequest, RequestId
+
+from posthog_agent_toolkit.http import ResponseTimer
+from posthog_agent_toolkit.progress import McpProgressCallback
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds to wait for a cancellation to be sent to the server before giving up on the session
+CANCEL_TIMEOUT = 5.0
+
+# Timeouts of the HTTP clients of sessions opened without a client factory, as in the MCP client
+DEFAULT_HTTP_TIMEOUT = httpx.Timeout(30.0, read=300.0)
+
+# Keys of a streamable_http connection config passed on to the MCP client's transport
+TRANSPORT_OPTIONS = ("headers", "timeout", "sse_read_timeout", "terminate_on_close", "httpx_client_factory", "auth")
+
+
+class SessionClosedError(ConnectionError):
+    """Raised when an MCP session shuts down while a request is in flight."""
+
+
+def is_session_terminated(error: BaseException) -> bool:
+    """Whether an error means the server no longer knows the session, e.g. after it expired."""
+    return isinstance(error, McpError) and error.error.message == "Session terminated"
+
+
+class _CallTracker(ObjectSendStream[SessionMessage]):
+    """
+    Passes the messages a session writes on to its transport, noting the ID of the last tool call.
+
+    ClientSession numbers its requests without exposing their IDs, which the server needs to
+    cancel a call.
+    """
+
+    def __init__(self, stream: ObjectSendStream[SessionMessage]):
+        self._stream = stream
+        self.last_call_id: RequestId | None = None
+
+    async def send(self, item: SessionMessage) -> None:
+        message = item.message.root
+        if isinstance(message, JSONRPCRequest) and message.method == "tools/call":
+            self.last_call_id = message.id
+        await self._stream.send(item)
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class PooledSession:
+    """An initialized MCP session, kept open by a background task until it is closed."""
+
+    session: ClientSession
+
+    def __init__(self):
+        self.timer = ResponseTimer()
+        # Duration of the initialize handshake; None once the session has been reused
+        self.handshake_duration: float | None = None
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        # Arguments of the context tools (switch-organization, switch-project) applied to this session
+        self.context: dict[str, dict[str, Any]] = {}
+        # Cleared when the session is left in a state that later calls must not inherit
+        self.reusable = True
+        # Set when the last tool call was cancelled and the server was told to stop it, which
+        # leaves the session usable
+        self.call_cancelled = False
+        self.error: BaseException | None = None
+        self._calls: _CallTracker | None = None
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """
+        Await a request on this session, failing fast if the session dies in the meantime.
+
+        Raises:
+            SessionClosedError: If the session's transport shuts down before the request completes
+        """
+        if self._task is None:
+            raise SessionClosedError("MCP session is not open")
+        request = asyncio.ensure_future(awaitable)
+        try:
+            await asyncio.wait({request, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            request.cancel()
+            raise
+        if request.done():
+            return request.result()
+        request.cancel()
+        raise SessionClosedError("MCP session closed while a request was in flight") from self.error
+
+    async def call_tool(self, name: str, arguments: dict[str, Any], progress_callback: McpProgressCallback | None = None) -> CallToolResult:
+        """
+        Call a tool on this session, and tell the server to stop it if the call is cancelled.
+
+        A call cancelled this way, e.g. because its deadline passed, leaves the session usable.
+        With a `progress_callback`, the server is asked to send progress notifications, which the
+        callback receives until the call completes.
+
+        Raises:
+            SessionClosedError: If the session's transport shuts down before the call completes
+        """
+        self.call_cancelled = False
+        if self._calls is not None:
+            self._calls.last_call_id = None
+        # The session writes the tools/call request before anything else, so it is the next one sent
+        self.timer.expect_call()
+        try:
+            return await self.run(self.session.call_tool(name, arguments, progress_callback=progress_callback))
+        except asyncio.CancelledError:
+            # The pool hands out one call per session at a time, so the last tool call the session
+            # sent is this one. A call cancelled before it was sent leaves nothing to stop, but
+            # the session is closed rather than reused all the same.
+            request_id = self._calls.last_call_id if self._calls is not None else None
+            if self.alive and request_id is not None:
+                await self._cancel_on_server(request_id)
+            raise
+
+    async def _cancel_on_server(self, request_id: RequestId) -> None:
+        notification = CancelledNotification(
+            method="notifications/cancelled",
+            params=CancelledNotificationParams(requestId=request_id, reason="The client cancelled the request"),
+        )
+        try:
+            async with asyncio.timeout(CANCEL_TIMEOUT):
+                await self.session.send_notification(ClientNotification(notification))
+        except Exception:
+            logger.debug("Failed to cancel MCP request %s", request_id, exc_info=True)
+            return
+        self.call_cancelled = True
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class SessionPool:
+    """
+    Keeps up to `max_size` initialized MCP sessions open and hands them out one call at a time.
+
+    Sessions are opened lazily, reused while idle for less than `idle_timeout` seconds, and closed
+    instead of being returned when a call fails with a transport error, or is cancelled without
+    the server being told to stop it.
+    """
+
+    def __init__(
+        self,
+        connection: dict[str, Any],
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        on_usage_change: Callable[[int, int], None] | None = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            connection: langchain-mcp-adapters connection config used to open sessions, with the
+                streamable_http transport
+            max_size: Maximum number of sessions open at the same time
+            idle_timeout: Seconds after which an unused session is closed instead of reused
+            on_usage_change: Called with (in_use, max_size) whenever a session is acquired or released
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        if connection.get("transport") != "streamable_http":
+            raise ValueError("The session pool only supports the streamable_http transport.")
+
+        self.connection = connection
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.in_use = 0
+        self._on_usage_change = on_usage_change
+        self._idle: list[PooledSession] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return self.in_use + len(self._idle)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[PooledSession]:
+        """Borrow a session for the duration of the context."""
+        if self._closed:
+            raise RuntimeError("The session pool is closed.")
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Sessions are bound to the event loop that opened them, so start over on a new loop
+            self._loop = loop
+            self._idle = []
+            self._semaphore = asyncio.Semaphore(self.max_size)
+
+        async with self._semaphore:
+            pooled = await self._take_idle()
+            if pooled is None:
+                pooled = await self._open()
+            else:
+                pooled.handshake_duration = None
+            pooled.call_cancelled = False
+
+            self._set_in_use(self.in_use + 1)
+            reusable = False
+            try:
+                yield pooled
+                reusable = True
+            except McpError as e:
+                # Errors returned by the server leave the session usable, unless it has expired
+                reusable = not is_session_terminated(e)
+                raise
+            except asyncio.CancelledError:
+                # A tool call cancelled on the server as well no longer holds the session
+                reusable = pooled.call_cancelled
+                raise
+            finally:
+                self._set_in_use(self.in_use - 1)
+                if reusable and pooled.reusable and pooled.alive and not self._closed:
+                    pooled.last_used_at = time.monotonic()
+                    self._idle.append(pooled)
+                else:
+                    await pooled.aclose()
+
+    async def aclose(self) -> None:
+        """Close all idle sessions. Sessions in use are closed when they are released."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(pooled.aclose() for pooled in idle))
+
+    def _set_in_use(self, in_use: int) -> None:
+        self.in_use = in_use
+        if self._on_usage_change is not None:
+            self._on_usage_change(in_use, self.max_size)
+
+    async def _take_idle(self) -> PooledSession | None:
+        now = time.monotonic()
+        while self._idle:
+            # Most recently used first, so rarely used sessions expire
+            pooled = self._idle.pop()
+            if pooled.alive and now - pooled.last_used_at < self.idle_timeout:
+                return pooled
+            await pooled.aclose()
+        return None
+
+    async def _open(self) -> PooledSession:
+        pooled = PooledSession()
+        connection = dict(self.connection)
+        connection["httpx_client_factory"] = pooled.timer.wrap(connection.get("httpx_client_factory") or _create_http_client)
+
+        ready: asyncio.Future[ClientSession] = asyncio.get_running_loop().create_future()
+        pooled._task = asyncio.create_task(self._run(pooled, connection, ready))
+        pooled._task.add_done_callback(lambda _task: ready.cancel())
+        try:
+            pooled.session = await ready
+        except asyncio.CancelledError:
+            # The session is never handed out, so stop it rather than wait for the handshake
+            pooled._task.cancel()
+            await asyncio.gather(pooled._task, return_exceptions=True)
+            raise
+        return pooled
+
+    @staticmethod
+    async def _run(pooled: PooledSession, connection: dict[str, Any], ready: asyncio.Future[ClientSession]) -> None:
+        # The MCP transports use anyio task groups, which must be entered and exited by the same
+        # task, so each session lives in its own task until it is asked to stop.
+        options = {key: value for key, value in connection.items() if key in TRANSPORT_OPTIONS}
+        try:
+            async with streamablehttp_client(connection["url"], **options) as (read, write, _):
+                pooled._calls = _CallTracker(write)
+                async with ClientSession(read, pooled._calls, **(connection.get("session_kwargs") or {})) as session:  # type: ignore[arg-type]
+                    started = time.perf_counter()
+                    await session.initialize()
+                    pooled.handshake_duration = time.perf_counter() - started
+                    ready.set_result(session)
+                    await pooled._stop.wait()
+        except Exception as e:
+            pooled.error = e
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.debug("MCP session closed with an error", exc_info=True)
+
+
+def _create_http_client(headers: dict[str, str] | None = None, timeout: httpx.Timeout | None = None, auth: httpx.Auth | None = None) -> httpx.AsyncClient:
+    """Create the HTTP client of a session opened without a client factory."""
+    return httpx.AsyncClient(headers=headers, timeout=timeout or DEFAULT_HTTP_TIMEOUT, auth=auth, follow_redirects=True)
@@ -0,0 +1,66 @@
+"""Tool metadata for the PostHog MCP tools, read from the bundled tool_definitions.json."""
+
+import json
+from functools import cache
+from importlib import resources
+
+from pydantic import BaseModel, ConfigDict, Field
+
+UNKNOWN_CATEGORY = "Unknown"
+
+
+class ToolAnnotations(BaseModel):
+    """MCP tool annotations describing the side effects of a tool."""
+
+    model_config = ConfigDict(frozen=True, populate_by_name=True)
+
+    destructive_hint: bool = Field(alias="destructiveHint")
+    idempotent_hint: bool = Field(alias="idempotentHint")
+    open_world_hint: bool = Field(alias="openWorldHint")
+    read_only_hint: bool = Field(alias="readOnlyHint")
+
+
+class ToolDefinition(BaseModel):
+    """Static description of a PostHog MCP tool."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    description: str
+    category: str
+    feature: str
+    summary: str
+    title: str
+    required_scopes: tuple[str, ...]
+    annotations: ToolAnnotations
+
+
+@cache
+def get_tool_definitions() -> dict[str, ToolDefinition]:
+    """
+    Load the definitions of all PostHog MCP tools.
+
+    Returns:
+        Mapping of tool name to its definition
+    """
+    raw = json.loads(resources.files(__package__).joinpath("tool_definitions.json").read_text(encoding="utf-8"))
+    return {name: ToolDefinition(name=name, **definition) for name, definition in raw.items()}
+
+
+def get_tool_definition(tool_name: str) -> ToolDefinition:
+    """
+    Get the definition of a single tool.
+
+    Raises:
+        KeyError: If no definition exists for the tool
+    """
+    definition = get_tool_definitions().get(tool_name)
+    if definition is None:
+        raise KeyError(f"Tool definition not found for: {tool_name}")
+    return definition
+
+
+def get_tool_category(tool_name: str) -> str:
+    """Get the category of a tool, or `UNKNOWN_CATEGORY` for tools without a definition."""
+    definition = get_tool_definitions().get(tool_name)
+    return definition.category if definition else UNKNOWN_CATEGORY
@@ -0,0 +1,1951 @@
+# mypy: disable-error-code="assignment"
+
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum, IntEnum, StrEnum
+from typing import Annotated, Any, Literal
+
+from msgspec import Meta, Struct
+
+ToolInputs = Any
+
+
+class Data(Struct, kw_only=True, forbid_unknown_fields=True):
+    insightId: str
+    dashboardId: Annotated[int, Meta(gt=0)]
+
+
+class DashboardAddInsightSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    data: Data
+
+
+class Data1(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: Annotated[str, Meta(min_length=1)]
+    description: str | None = None
+    pinned: bool | None = None
+    tags: list[str] | None = None
+
+
+class DashboardCreateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    data: Data1
+
+
+class DashboardDeleteSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    dashboardId: float
+
+
+class Data2(Struct, kw_only=True, forbid_unknown_fields=True):
+    limit: Annotated[int, Meta(gt=0)] | None = None
+    offset: Annotated[int, Meta(ge=0)] | None = None
+    search: str | None = None
+    pinned: bool | None = None
+
+
+class DashboardGetAllSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    data: Data2 | None = None
+
+
+class DashboardGetSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    dashboardId: float
+
+
+class Data3(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: str | None = None
+    description: str | None = None
+    pinned: bool | None = None
+    tags: list[str] | None = None
+
+
+class DashboardUpdateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    dashboardId: float
+    data: Data3
+
+
+class DocumentationSearchSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    query: str
+
+
+class ErrorTrackingDetailsSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    issueId: str
+    dateFrom: datetime | None = None
+    dateTo: datetime | None = None
+
+
+class OrderBy(StrEnum):
+    OCCURRENCES = "occurrences"
+    FIRST_SEEN = "first_seen"
+    LAST_SEEN = "last_seen"
+    USERS = "users"
+    SESSIONS = "sessions"
+
+
+class OrderDirection(StrEnum):
+    ASC = "ASC"
+    DESC = "DESC"
+
+
+class Status(StrEnum):
+    ACTIVE = "active"
+    RESOLVED = "resolved"
+    ALL = "all"
+    SUPPRESSED = "suppressed"
+
+
+class ErrorTrackingListSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    orderBy: OrderBy | None = None
+    dateFrom: datetime | None = None
+    dateTo: datetime | None = None
+    orderDirection: OrderDirection | None = None
+    filterTestAccounts: bool | None = None
+    status: Status | None = None
+
+
+class Type(StrEnum):
+    """
+    Experiment type: 'product' for backend/API changes, 'web' for frontend UI changes
+    """
+
+    PRODUCT = "product"
+    WEB = "web"
+
+
+class MetricType(StrEnum):
+    """
+    Metric type: 'mean' for average values (revenue, time spent), 'funnel' for conversion flows, 'ratio' for comparing two metrics
+    """
+
+    MEAN = "mean"
+    FUNNEL = "funnel"
+    RATIO = "ratio"
+
+
+class PrimaryMetric(Struct, kw_only=True, forbid_unknown_fields=True):
+    metric_type: Annotated[
+        MetricType,
+        Meta(description=("Metric type: 'mean' for average values (revenue, time spent), 'funnel' for conversion flows, 'ratio' for comparing two metrics")),
+    ]
+    """
+    Metric type: 'mean' for average values (revenue, time spent), 'funnel' for conversion flows, 'ratio' for comparing two metrics
+    """
+    event_name: Annotated[
+        str,
+        Meta(
+            description=(
+                "REQUIRED for metrics to work: PostHog event name (e.g., '$pageview',"
+                " 'add_to_cart', 'purchase'). For funnels, this is the first step. Use"
+                " '$pageview' if unsure. Search project-property-definitions tool for"
+                " available events."
+            )
+        ),
+    ]
+    """
+    REQUIRED for metrics to work: PostHog event name (e.g., '$pageview', 'add_to_cart', 'purchase'). For funnels, this is the first step. Use '$pageview' if unsure. Search project-property-definitions tool for available events.
+    """
+    name: Annotated[str, Meta(description="Human-readable metric name")] | None = None
+    """
+    Human-readable metric name
+    """
+    funnel_steps: Annotated[list[str], Meta(description="For funnel metrics only: Array of event names for each funnel step (e.g., ['product_view', 'add_to_cart', 'checkout', 'purchase'])")] | None = None
+    """
+    For funnel metrics only: Array of event names for each funnel step (e.g., ['product_view', 'add_to_cart', 'checkout', 'purchase'])
+    """
+    properties: Annotated[dict[str, Any], Meta(description="Event properties to filter on")] | None = None
+    """
+    Event properties to filter on
+    """
+    description: Annotated[str, Meta(description="What this metric measures and why it's important for the experiment")] | None = None
+    """
+    What this metric measures and why it's important for the experiment
+    """
+
+
+class MetricType1(StrEnum):
+    """
+    Metric type: 'mean' for average values, 'funnel' for conversion flows, 'ratio' for comparing two metrics
+    """
+
+    MEAN = "mean"
+    FUNNEL = "funnel"
+    RATIO = "ratio"
+
+
+class SecondaryMetric(Struct, kw_only=True, forbid_unknown_fields=True):
+    metric_type: Annotated[
+        MetricType1,
+        Meta(description=("Metric type: 'mean' for average values, 'funnel' for conversion flows, 'ratio' for comparing two metrics")),
+    ]
+    """
+    Metric type: 'mean' for average values, 'funnel' for conversion flows, 'ratio' for comparing two metrics
+    """
+    event_name: Annotated[
+        str,
+        Meta(description="REQUIRED: PostHog event name. Use '$pageview' if unsure."),
+    ]
+    """
+    REQUIRED: PostHog event name. Use '$pageview' if unsure.
+    """
+    name: Annotated[str, Meta(description="Human-readable metric name")] | None = None
+    """
+    Human-readable metric name
+    """
+    funnel_steps: Annotated[list[str], Meta(description="For funnel metrics only: Array of event names for each funnel step")] | None = None
+    """
+    For funnel metrics only: Array of event names for each funnel step
+    """
+    properties: Annotated[dict[str, Any], Meta(description="Event properties to filter on")] | None = None
+    """
+    Event properties to filter on
+    """
+    description: Annotated[str, Meta(description="What this secondary metric measures")] | None = None
+    """
+    What this secondary metric measures
+    """
+
+
+class Variant(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: Annotated[
+        str,
+        Meta(description="Variant key (e.g., 'control', 'variant_a', 'new_design')"),
+    ]
+    """
+    Variant key (e.g., 'control', 'variant_a', 'new_design')
+    """
+    rollout_percentage: Annotated[
+        float,
+        Meta(description="Percentage of users to show this variant", ge=0.0, le=100.0),
+    ]
+    """
+    Percentage of users to show this variant
+    """
+    name: Annotated[str, Meta(description="Human-readable variant name")] | None = None
+    """
+    Human-readable variant name
+    """
+
+
+class ExperimentCreateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: Annotated[
+        str,
+        Meta(
+            description=("Experiment name - should clearly describe what is being tested"),
+            min_length=1,
+        ),
+    ]
+    """
+    Experiment name - should clearly describe what is being tested
+    """
+    feature_flag_key: Annotated[
+        str,
+        Meta(
+            description=(
+                "Feature flag key (letters, numbers, hyphens, underscores only)."
+                " IMPORTANT: First search for existing feature flags that might be"
+                " suitable using the feature-flags-get-all tool, then suggest reusing"
+                " existing ones or creating a new key based on the experiment name"
+            )
+        ),
+    ]
+    """
+    Feature flag key (letters, numbers, hyphens, underscores only). IMPORTANT: First search for existing feature flags that might be suitable using the feature-flags-get-all tool, then suggest reusing existing ones or creating a new key based on the experiment name
+    """
+    description: Annotated[str, Meta(description="Detailed description of the experiment hypothesis, what changes are being tested, and expected outcomes")] | None = None
+    """
+    Detailed description of the experiment hypothesis, what changes are being tested, and expected outcomes
+    """
+    type: Annotated[Type, Meta(description="Experiment type: 'product' for backend/API changes, 'web' for frontend UI changes")] | None = Type.PRODUCT
+    """
+    Experiment type: 'product' for backend/API changes, 'web' for frontend UI changes
+    """
+    primary_metrics: Annotated[list[PrimaryMetric], Meta(description="Primary metrics to measure experiment success. IMPORTANT: Each" " metric needs event_name to track data. For funnels, provide" " funnel_steps array with event names for each step. Ask user what" " events they track, or use project-property-definitions to find" " available events.")] | None = None
+    """
+    Primary metrics to measure experiment success. IMPORTANT: Each metric needs event_name to track data. For funnels, provide funnel_steps array with event names for each step. Ask user what events they track, or use project-property-definitions to find available events.
+    """
+    secondary_metrics: Annotated[list[SecondaryMetric], Meta(description="Secondary metrics to monitor for potential side effects or additional insights. Each metric needs event_name.")] | None = None
+    """
+    Secondary metrics to monitor for potential side effects or additional insights. Each metric needs event_name.
+    """
+    variants: Annotated[list[Variant], Meta(description="Experiment variants. If not specified, defaults to 50/50 control/test split. Ask user how many variants they need and what each tests")] | None = None
+    """
+    Experiment variants. If not specified, defaults to 50/50 control/test split. Ask user how many variants they need and what each tests
+    """
+    minimum_detectable_effect: Annotated[float, Meta(description="Minimum detectable effect in percentage. Lower values require more users but detect smaller changes. Suggest 20-30% for most experiments")] | None = 30
+    """
+    Minimum detectable effect in percentage. Lower values require more users but detect smaller changes. Suggest 20-30% for most experiments
+    """
+    filter_test_accounts: Annotated[bool, Meta(description="Whether to filter out internal test accounts")] | None = True
+    """
+    Whether to filter out internal test accounts
+    """
+    target_properties: Annotated[dict[str, Any], Meta(description="Properties to target specific user segments (e.g., country, subscription type)")] | None = None
+    """
+    Properties to target specific user segments (e.g., country, subscription type)
+    """
+    draft: Annotated[bool, Meta(description="Create as draft (true) or launch immediately (false). Recommend draft for review first")] | None = True
+    """
+    Create as draft (true) or launch immediately (false). Recommend draft for review first
+    """
+    holdout_id: Annotated[float, Meta(description="Holdout group ID if this experiment should exclude users from other experiments")] | None = None
+    """
+    Holdout group ID if this experiment should exclude users from other experiments
+    """
+
+
+class ExperimentDeleteSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    experimentId: Annotated[float, Meta(description="The ID of the experiment to delete")]
+    """
+    The ID of the experiment to delete
+    """
+
+
+class ExperimentGetAllSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    pass
+
+
+class ExperimentGetSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    experimentId: Annotated[float, Meta(description="The ID of the experiment to retrieve")]
+    """
+    The ID of the experiment to retrieve
+    """
+
+
+class ExperimentResultsGetSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    experimentId: Annotated[
+        float,
+        Meta(description="The ID of the experiment to get comprehensive results for"),
+    ]
+    """
+    The ID of the experiment to get comprehensive results for
+    """
+    refresh: Annotated[
+        bool,
+        Meta(description="Force refresh of results instead of using cached values"),
+    ]
+    """
+    Force refresh of results instead of using cached values
+    """
+
+
+class PrimaryMetric1(Struct, kw_only=True, forbid_unknown_fields=True):
+    metric_type: Annotated[
+        MetricType1,
+        Meta(description=("Metric type: 'mean' for average values, 'funnel' for conversion flows, 'ratio' for comparing two metrics")),
+    ]
+    """
+    Metric type: 'mean' for average values, 'funnel' for conversion flows, 'ratio' for comparing two metrics
+    """
+    event_name: Annotated[
+        str,
+        Meta(description=("PostHog event name (e.g., '$pageview', 'add_to_cart', 'purchase')")),
+    ]
+    """
+    PostHog event name (e.g., '$pageview', 'add_to_cart', 'purchase')
+    """
+    name: Annotated[str, Meta(description="Human-readable metric name")] | None = None
+    """
+    Human-readable metric name
+    """
+    funnel_steps: Annotated[list[str], Meta(description="For funnel metrics only: Array of event names for each funnel step")] | None = None
+    """
+    For funnel metrics only: Array of event names for each funnel step
+    """
+    properties: Annotated[dict[str, Any], Meta(description="Event properties to filter on")] | None = None
+    """
+    Event properties to filter on
+    """
+    description: Annotated[str, Meta(description="What this metric measures")] | None = None
+    """
+    What this metric measures
+    """
+
+
+class MetricType3(StrEnum):
+    """
+    Metric type
+    """
+
+    MEAN = "mean"
+    FUNNEL = "funnel"
+    RATIO = "ratio"
+
+
+class SecondaryMetric1(Struct, kw_only=True, forbid_unknown_fields=True):
+    metric_type: Annotated[MetricType3, Meta(description="Metric type")]
+    """
+    Metric type
+    """
+    event_name: Annotated[str, Meta(description="PostHog event name")]
+    """
+    PostHog event name
+    """
+    name: Annotated[str, Meta(description="Human-readable metric name")] | None = None
+    """
+    Human-readable metric name
+    """
+    funnel_steps: Annotated[list[str], Meta(description="For funnel metrics only: Array of event names")] | None = None
+    """
+    For funnel metrics only: Array of event names
+    """
+    properties: Annotated[dict[str, Any], Meta(description="Event properties to filter on")] | None = None
+    """
+    Event properties to filter on
+    """
+    description: Annotated[str, Meta(description="What this metric measures")] | None = None
+    """
+    What this metric measures
+    """
+
+
+class Conclude(StrEnum):
+    """
+    Conclude experiment with result
+    """
+
+    WON = "won"
+    LOST = "lost"
+    INCONCLUSIVE = "inconclusive"
+    STOPPED_EARLY = "stopped_early"
+    INVALID = "invalid"
+
+
+class ExperimentUpdateInputSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: Annotated[str, Meta(description="Update experiment name")] | None = None
+    """
+    Update experiment name
+    """
+    description: Annotated[str, Meta(description="Update experiment description")] | None = None
+    """
+    Update experiment description
+    """
+    primary_metrics: Annotated[list[PrimaryMetric1], Meta(description="Update primary metrics")] | None = None
+    """
+    Update primary metrics
+    """
+    secondary_metrics: Annotated[list[SecondaryMetric1], Meta(description="Update secondary metrics")] | None = None
+    """
+    Update secondary metrics
+    """
+    minimum_detectable_effect: Annotated[float, Meta(description="Update minimum detectable effect in percentage")] | None = None
+    """
+    Update minimum detectable effect in percentage
+    """
+    launch: Annotated[bool, Meta(description="Launch experiment (set start_date) or keep as draft")] | None = None
+    """
+    Launch experiment (set start_date) or keep as draft
+    """
+    conclude: Annotated[Conclude, Meta(description="Conclude experiment with result")] | None = None
+    """
+    Conclude experiment with result
+    """
+    conclusion_comment: Annotated[str, Meta(description="Comment about experiment conclusion")] | None = None
+    """
+    Comment about experiment conclusion
+    """
+    restart: Annotated[bool, Meta(description="Restart concluded experiment (clears end_date and conclusion)")] | None = None
+    """
+    Restart concluded experiment (clears end_date and conclusion)
+    """
+    archive: Annotated[bool, Meta(description="Archive or unarchive experiment")] | None = None
+    """
+    Archive or unarchive experiment
+    """
+
+
+class MetricType4(StrEnum):
+    """
+    Metric type: 'mean' for average values, 'funnel' for conversion flows, 'ratio' for comparing two metrics
+    """
+
+    MEAN = "mean"
+    FUNNEL = "funnel"
+    RATIO = "ratio"
+
+
+class PrimaryMetric2(Struct, kw_only=True, forbid_unknown_fields=True):
+    metric_type: Annotated[
+        MetricType4,
+        Meta(description=("Metric type: 'mean' for average values, 'funnel' for conversion flows, 'ratio' for comparing two metrics")),
+    ]
+    """
+    Metric type: 'mean' for average values, 'funnel' for conversion flows, 'ratio' for comparing two metrics
+    """
+    event_name: Annotated[
+        str,
+        Meta(description=("PostHog event name (e.g., '$pageview', 'add_to_cart', 'purchase')")),
+    ]
+    """
+    PostHog event name (e.g., '$pageview', 'add_to_cart', 'purchase')
+    """
+    name: Annotated[str, Meta(description="Human-readable metric name")] | None = None
+    """
+    Human-readable metric name
+    """
+    funnel_steps: Annotated[list[str], Meta(description="For funnel metrics only: Array of event names for each funnel step")] | None = None
+    """
+    For funnel metrics only: Array of event names for each funnel step
+    """
+    properties: Annotated[dict[str, Any], Meta(description="Event properties to filter on")] | None = None
+    """
+    Event properties to filter on
+    """
+    description: Annotated[str, Meta(description="What this metric measures")] | None = None
+    """
+    What this metric measures
+    """
+
+
+class MetricType5(StrEnum):
+    """
+    Metric type
+    """
+
+    MEAN = "mean"
+    FUNNEL = "funnel"
+    RATIO = "ratio"
+
+
+class SecondaryMetric2(Struct, kw_only=True, forbid_unknown_fields=True):
+    metric_type: Annotated[MetricType5, Meta(description="Metric type")]
+    """
+    Metric type
+    """
+    event_name: Annotated[str, Meta(description="PostHog event name")]
+    """
+    PostHog event name
+    """
+    name: Annotated[str, Meta(description="Human-readable metric name")] | None = None
+    """
+    Human-readable metric name
+    """
+    funnel_steps: Annotated[list[str], Meta(description="For funnel metrics only: Array of event names")] | None = None
+    """
+    For funnel metrics only: Array of event names
+    """
+    properties: Annotated[dict[str, Any], Meta(description="Event properties to filter on")] | None = None
+    """
+    Event properties to filter on
+    """
+    description: Annotated[str, Meta(description="What this metric measures")] | None = None
+    """
+    What this metric measures
+    """
+
+
+class Data4(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    The experiment data to update using user-friendly format
+    """
+
+    name: Annotated[str, Meta(description="Update experiment name")] | None = None
+    """
+    Update experiment name
+    """
+    description: Annotated[str, Meta(description="Update experiment description")] | None = None
+    """
+    Update experiment description
+    """
+    primary_metrics: Annotated[list[PrimaryMetric2], Meta(description="Update primary metrics")] | None = None
+    """
+    Update primary metrics
+    """
+    secondary_metrics: Annotated[list[SecondaryMetric2], Meta(description="Update secondary metrics")] | None = None
+    """
+    Update secondary metrics
+    """
+    minimum_detectable_effect: Annotated[float, Meta(description="Update minimum detectable effect in percentage")] | None = None
+    """
+    Update minimum detectable effect in percentage
+    """
+    launch: Annotated[bool, Meta(description="Launch experiment (set start_date) or keep as draft")] | None = None
+    """
+    Launch experiment (set start_date) or keep as draft
+    """
+    conclude: Annotated[Conclude, Meta(description="Conclude experiment with result")] | None = None
+    """
+    Conclude experiment with result
+    """
+    conclusion_comment: Annotated[str, Meta(description="Comment about experiment conclusion")] | None = None
+    """
+    Comment about experiment conclusion
+    """
+    restart: Annotated[bool, Meta(description="Restart concluded experiment (clears end_date and conclusion)")] | None = None
+    """
+    Restart concluded experiment (clears end_date and conclusion)
+    """
+    archive: Annotated[bool, Meta(description="Archive or unarchive experiment")] | None = None
+    """
+    Archive or unarchive experiment
+    """
+
+
+class ExperimentUpdateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    experimentId: Annotated[float, Meta(description="The ID of the experiment to update")]
+    """
+    The ID of the experiment to update
+    """
+    data: Annotated[
+        Data4,
+        Meta(description="The experiment data to update using user-friendly format"),
+    ]
+    """
+    The experiment data to update using user-friendly format
+    """
+
+
+class Operator(StrEnum):
+    EXACT = "exact"
+    IS_NOT = "is_not"
+    IS_SET = "is_set"
+    IS_NOT_SET = "is_not_set"
+    ICONTAINS = "icontains"
+    NOT_ICONTAINS = "not_icontains"
+    REGEX = "regex"
+    NOT_REGEX = "not_regex"
+    IS_CLEANED_PATH_EXACT = "is_cleaned_path_exact"
+    exact_1 = "exact"
+    is_not_1 = "is_not"
+    is_set_1 = "is_set"
+    is_not_set_1 = "is_not_set"
+    GT = "gt"
+    GTE = "gte"
+    LT = "lt"
+    LTE = "lte"
+    MIN = "min"
+    MAX = "max"
+    exact_2 = "exact"
+    is_not_2 = "is_not"
+    is_set_2 = "is_set"
+    is_not_set_2 = "is_not_set"
+    IN_ = "in"
+    NOT_IN = "not_in"
+
+
+class Property(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | bool | list[str | float]
+    operator: Operator | None = None
+
+
+class Group(Struct, kw_only=True, forbid_unknown_fields=True):
+    properties: list[Property]
+    rollout_percentage: float
+
+
+class Filters(Struct, kw_only=True, forbid_unknown_fields=True):
+    groups: list[Group]
+
+
+class FeatureFlagCreateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: str
+    key: str
+    description: str
+    filters: Filters
+    active: bool
+    tags: list[str] | None = None
+
+
+class FeatureFlagDeleteSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    flagKey: str
+
+
+class FeatureFlagGetAllSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    pass
+
+
+class FeatureFlagGetDefinitionSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    flagId: Annotated[int, Meta(gt=0)] | None = None
+    flagKey: str | None = None
+
+
+class Property1(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | bool | list[str | float]
+    operator: Operator | None = None
+
+
+class Group1(Struct, kw_only=True, forbid_unknown_fields=True):
+    properties: list[Property1]
+    rollout_percentage: float
+
+
+class Filters1(Struct, kw_only=True, forbid_unknown_fields=True):
+    groups: list[Group1]
+
+
+class Data5(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: str | None = None
+    description: str | None = None
+    filters: Filters1 | None = None
+    active: bool | None = None
+    tags: list[str] | None = None
+
+
+class FeatureFlagUpdateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    flagKey: str
+    data: Data5
+
+
+class Kind(StrEnum):
+    INSIGHT_VIZ_NODE = "InsightVizNode"
+    DATA_VISUALIZATION_NODE = "DataVisualizationNode"
+
+
+class Query(Struct, kw_only=True, forbid_unknown_fields=True):
+    kind: Kind
+    source: Annotated[Any, Meta(description="For new insights, use the query from your successful query-run tool call. For updates, the existing query can optionally be reused.")] | None = None
+    """
+    For new insights, use the query from your successful query-run tool call. For updates, the existing query can optionally be reused.
+    """
+
+
+class Data6(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: str
+    query: Query
+    favorited: bool
+    description: str | None = None
+    tags: list[str] | None = None
+
+
+class InsightCreateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    data: Data6
+
+
+class InsightDeleteSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    insightId: str
+
+
+class InsightGenerateHogQLFromQuestionSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: Annotated[
+        str,
+        Meta(
+            description=("Your natural language query describing the SQL insight (max 1000 characters)."),
+            max_length=1000,
+        ),
+    ]
+    """
+    Your natural language query describing the SQL insight (max 1000 characters).
+    """
+
+
+class Data7(Struct, kw_only=True, forbid_unknown_fields=True):
+    limit: float | None = None
+    offset: float | None = None
+    favorited: bool | None = None
+    search: str | None = None
+
+
+class InsightGetAllSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    data: Data7 | None = None
+
+
+class InsightGetSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    insightId: str
+
+
+class InsightQueryInputSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    insightId: str
+
+
+class Query1(Struct, kw_only=True, forbid_unknown_fields=True):
+    kind: Kind
+    source: Annotated[Any, Meta(description="For new insights, use the query from your successful query-run tool call. For updates, the existing query can optionally be reused")] | None = None
+    """
+    For new insights, use the query from your successful query-run tool call. For updates, the existing query can optionally be reused
+    """
+
+
+class Data8(Struct, kw_only=True, forbid_unknown_fields=True):
+    query: Query1
+    name: str | None = None
+    description: str | None = None
+    filters: dict[str, Any] | None = None
+    favorited: bool | None = None
+    dashboard: float | None = None
+    tags: list[str] | None = None
+
+
+class InsightUpdateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    insightId: str
+    data: Data8
+
+
+class LLMAnalyticsGetCostsSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    projectId: Annotated[int, Meta(gt=0)]
+    days: float | None = None
+
+
+class OrganizationGetAllSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    pass
+
+
+class OrganizationGetDetailsSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    pass
+
+
+class OrganizationSetActiveSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    orgId: str
+
+
+class ProjectEventDefinitionsSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    q: Annotated[str, Meta(description="Search query to filter event names. Only use if there are lots of events.")] | None = None
+    """
+    Search query to filter event names. Only use if there are lots of events.
+    """
+
+
+class ProjectGetAllSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    pass
+
+
+class Type1(StrEnum):
+    """
+    Type of properties to get
+    """
+
+    EVENT = "event"
+    PERSON = "person"
+
+
+class ProjectPropertyDefinitionsInputSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Annotated[Type1, Meta(description="Type of properties to get")]
+    """
+    Type of properties to get
+    """
+    eventName: Annotated[str, Meta(description="Event name to filter properties by, required for event type")] | None = None
+    """
+    Event name to filter properties by, required for event type
+    """
+    includePredefinedProperties: Annotated[bool, Meta(description="Whether to include predefined properties")] | None = None
+    """
+    Whether to include predefined properties
+    """
+
+
+class ProjectSetActiveSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    projectId: Annotated[int, Meta(gt=0)]
+
+
+class DateRange(Struct, kw_only=True, forbid_unknown_fields=True):
+    date_from: str | None = None
+    date_to: str | None = None
+    explicitDate: bool | None = None
+
+
+class Properties(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | list[str | float] | None = None
+    operator: str | None = None
+    type: str | None = None
+
+
+class Type2(StrEnum):
+    AND_ = "AND"
+    OR_ = "OR"
+
+
+class Value(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | list[str | float] | None = None
+    operator: str | None = None
+    type: str | None = None
+
+
+class Properties1(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Properties2(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Interval(StrEnum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class Math(StrEnum):
+    TOTAL = "total"
+    DAU = "dau"
+    WEEKLY_ACTIVE = "weekly_active"
+    MONTHLY_ACTIVE = "monthly_active"
+    UNIQUE_SESSION = "unique_session"
+    FIRST_TIME_FOR_USER = "first_time_for_user"
+    FIRST_MATCHING_EVENT_FOR_USER = "first_matching_event_for_user"
+    AVG = "avg"
+    SUM = "sum"
+    MIN = "min"
+    MAX = "max"
+    MEDIAN = "median"
+    P75 = "p75"
+    P90 = "p90"
+    P95 = "p95"
+    P99 = "p99"
+
+
+class Properties3(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | list[str | float] | None = None
+    operator: str | None = None
+    type: str | None = None
+
+
+class Properties4(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Properties5(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Series(Struct, kw_only=True, forbid_unknown_fields=True):
+    custom_name: Annotated[str, Meta(description="A display name")]
+    """
+    A display name
+    """
+    kind: Literal["EventsNode"] = "EventsNode"
+    math: Math | None = None
+    math_property: str | None = None
+    properties: list[Properties3 | Properties4] | Properties5 | None = None
+    event: str | None = None
+    limit: float | None = None
+
+
+class Display(StrEnum):
+    ACTIONS_LINE_GRAPH = "ActionsLineGraph"
+    ACTIONS_TABLE = "ActionsTable"
+    ACTIONS_PIE = "ActionsPie"
+    ACTIONS_BAR = "ActionsBar"
+    ACTIONS_BAR_VALUE = "ActionsBarValue"
+    WORLD_MAP = "WorldMap"
+    BOLD_NUMBER = "BoldNumber"
+
+
+class TrendsFilter(Struct, kw_only=True, forbid_unknown_fields=True):
+    display: Display | None = Display.ACTIONS_LINE_GRAPH
+    showLegend: bool | None = False
+
+
+class BreakdownType(StrEnum):
+    PERSON = "person"
+    EVENT = "event"
+
+
+class BreakdownFilter(Struct, kw_only=True, forbid_unknown_fields=True):
+    breakdown_type: BreakdownType | None = BreakdownType.EVENT
+    breakdown_limit: float | None = None
+    breakdown: str | float | list[str | float] | None = None
+
+
+class CompareFilter(Struct, kw_only=True, forbid_unknown_fields=True):
+    compare: bool | None = False
+    compare_to: str | None = None
+
+
+class Source(Struct, kw_only=True, forbid_unknown_fields=True):
+    kind: Literal["TrendsQuery"] = "TrendsQuery"
+    series: list[Series]
+    dateRange: DateRange | None = None
+    filterTestAccounts: bool | None = False
+    properties: list[Properties | Properties1] | Properties2 | None = []
+    interval: Interval | None = Interval.DAY
+    trendsFilter: TrendsFilter | None = None
+    breakdownFilter: BreakdownFilter | None = None
+    compareFilter: CompareFilter | None = None
+    conversionGoal: Any = None
+
+
+class Properties6(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | list[str | float] | None = None
+    operator: str | None = None
+    type: str | None = None
+
+
+class Properties7(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Properties8(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Properties9(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | list[str | float] | None = None
+    operator: str | None = None
+    type: str | None = None
+
+
+class Properties10(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Properties11(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Series1(Struct, kw_only=True, forbid_unknown_fields=True):
+    custom_name: Annotated[str, Meta(description="A display name")]
+    """
+    A display name
+    """
+    kind: Literal["EventsNode"] = "EventsNode"
+    math: Math | None = None
+    math_property: str | None = None
+    properties: list[Properties9 | Properties10] | Properties11 | None = None
+    event: str | None = None
+    limit: float | None = None
+
+
+class Layout(StrEnum):
+    HORIZONTAL = "horizontal"
+    VERTICAL = "vertical"
+
+
+class BreakdownAttributionType(StrEnum):
+    FIRST_TOUCH = "first_touch"
+    LAST_TOUCH = "last_touch"
+    ALL_EVENTS = "all_events"
+
+
+class FunnelOrderType(StrEnum):
+    ORDERED = "ordered"
+    UNORDERED = "unordered"
+    STRICT = "strict"
+
+
+class FunnelVizType(StrEnum):
+    STEPS = "steps"
+    TIME_TO_CONVERT = "time_to_convert"
+    TRENDS = "trends"
+
+
+class FunnelWindowIntervalUnit(StrEnum):
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class FunnelStepReference(StrEnum):
+    TOTAL = "total"
+    PREVIOUS = "previous"
+
+
+class FunnelsFilter(Struct, kw_only=True, forbid_unknown_fields=True):
+    layout: Layout | None = None
+    breakdownAttributionType: BreakdownAttributionType | None = None
+    breakdownAttributionValue: float | None = None
+    funnelToStep: float | None = None
+    funnelFromStep: float | None = None
+    funnelOrderType: FunnelOrderType | None = None
+    funnelVizType: FunnelVizType | None = None
+    funnelWindowInterval: float | None = 14
+    funnelWindowIntervalUnit: FunnelWindowIntervalUnit | None = FunnelWindowIntervalUnit.DAY
+    funnelStepReference: FunnelStepReference | None = None
+
+
+class BreakdownFilter1(Struct, kw_only=True, forbid_unknown_fields=True):
+    breakdown_type: BreakdownType | None = BreakdownType.EVENT
+    breakdown_limit: float | None = None
+    breakdown: str | float | list[str | float] | None = None
+
+
+class Source1(Struct, kw_only=True, forbid_unknown_fields=True):
+    kind: Literal["FunnelsQuery"] = "FunnelsQuery"
+    series: list[Series1]
+    dateRange: DateRange | None = None
+    filterTestAccounts: bool | None = False
+    properties: list[Properties6 | Properties7] | Properties8 | None = []
+    interval: Interval | None = Interval.DAY
+    funnelsFilter: FunnelsFilter | None = None
+    breakdownFilter: BreakdownFilter1 | None = None
+
+
+class Query2(Struct, kw_only=True, forbid_unknown_fields=True):
+    kind: Literal["InsightVizNode"] = "InsightVizNode"
+    source: Source | Source1
+
+
+class Properties12(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | list[str | float] | None = None
+    operator: str | None = None
+    type: str | None = None
+
+
+class Properties13(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Type2
+    values: list[Value]
+
+
+class Filters2(Struct, kw_only=True, forbid_unknown_fields=True):
+    properties: list[Properties12 | Properties13] | None = None
+    dateRange: DateRange | None = None
+    filterTestAccounts: bool | None = None
+
+
+class Source2(Struct, kw_only=True, forbid_unknown_fields=True):
+    kind: Literal["HogQLQuery"] = "HogQLQuery"
+    query: str
+    filters: Filters2 | None = None
+
+
+class Query3(Struct, kw_only=True, forbid_unknown_fields=True):
+    kind: Literal["DataVisualizationNode"] = "DataVisualizationNode"
+    source: Source2
+
+
+class QueryRunInputSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    query: Query2 | Query3
+
+
+class Type11(StrEnum):
+    POPOVER = "popover"
+    API = "api"
+    WIDGET = "widget"
+    EXTERNAL_SURVEY = "external_survey"
+
+
+class DescriptionContentType(StrEnum):
+    HTML = "html"
+    TEXT = "text"
+
+
+class Questions(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["open"] = "open"
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+
+
+class Questions1(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["link"] = "link"
+    link: str
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+
+
+class Display1(StrEnum):
+    """
+    Display format: 'number' shows numeric scale, 'emoji' shows emoji scale
+    """
+
+    NUMBER = "number"
+    EMOJI = "emoji"
+
+
+class Scale(IntEnum):
+    """
+    Rating scale can be one of 3, 5, or 7
+    """
+
+    NUMBER_3 = 3
+    NUMBER_5 = 5
+    NUMBER_7 = 7
+
+
+class Branching(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["next_question"] = "next_question"
+
+
+class Branching1(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["end"] = "end"
+
+
+class Branching2(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    For rating questions: use sentiment keys based on scale thirds - negative (lower third), neutral (middle third), positive (upper third)
+    """
+
+    type: Literal["response_based"] = "response_based"
+    responseValues: Annotated[
+        dict[str, float | str],
+        Meta(
+            description=(
+                "Only include keys for responses that should branch to a specific"
+                " question or 'end'. Omit keys for responses that should proceed to the"
+                " next question (default behavior)."
+            )
+        ),
+    ]
+    """
+    Only include keys for responses that should branch to a specific question or 'end'. Omit keys for responses that should proceed to the next question (default behavior).
+    """
+
+
+class Branching3(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["specific_question"] = "specific_question"
+    index: float
+
+
+class Questions2(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["rating"] = "rating"
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+    display: Annotated[Display1, Meta(description="Display format: 'number' shows numeric scale, 'emoji' shows emoji scale")] | None = None
+    """
+    Display format: 'number' shows numeric scale, 'emoji' shows emoji scale
+    """
+    scale: Annotated[Scale, Meta(description="Rating scale can be one of 3, 5, or 7")] | None = None
+    """
+    Rating scale can be one of 3, 5, or 7
+    """
+    lowerBoundLabel: Annotated[str, Meta(description="Label for the lowest rating (e.g., 'Very Poor')")] | None = None
+    """
+    Label for the lowest rating (e.g., 'Very Poor')
+    """
+    upperBoundLabel: Annotated[str, Meta(description="Label for the highest rating (e.g., 'Excellent')")] | None = None
+    """
+    Label for the highest rating (e.g., 'Excellent')
+    """
+    branching: Branching | Branching1 | Branching2 | Branching3 | None = None
+
+
+class Branching4(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["next_question"] = "next_question"
+
+
+class Branching5(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["end"] = "end"
+
+
+class Branching6(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    For NPS rating questions: use sentiment keys based on score ranges - detractors (0-6), passives (7-8), promoters (9-10)
+    """
+
+    type: Literal["response_based"] = "response_based"
+    responseValues: Annotated[
+        dict[str, float | str],
+        Meta(
+            description=(
+                "Only include keys for responses that should branch to a specific"
+                " question or 'end'. Omit keys for responses that should proceed to the"
+                " next question (default behavior)."
+            )
+        ),
+    ]
+    """
+    Only include keys for responses that should branch to a specific question or 'end'. Omit keys for responses that should proceed to the next question (default behavior).
+    """
+
+
+class Branching7(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["specific_question"] = "specific_question"
+    index: float
+
+
+class Questions3(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["rating"] = "rating"
+    display: Annotated[Literal["number"], Meta(description="NPS questions always use numeric scale")] | None = "number"
+    """
+    NPS questions always use numeric scale
+    """
+    scale: Annotated[float, Meta(description="NPS questions always use 0-10 scale")]
+    """
+    NPS questions always use 0-10 scale
+    """
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+    lowerBoundLabel: Annotated[str, Meta(description="Label for 0 rating (typically 'Not at all likely')")] | None = None
+    """
+    Label for 0 rating (typically 'Not at all likely')
+    """
+    upperBoundLabel: Annotated[str, Meta(description="Label for 10 rating (typically 'Extremely likely')")] | None = None
+    """
+    Label for 10 rating (typically 'Extremely likely')
+    """
+    branching: Branching4 | Branching5 | Branching6 | Branching7 | None = None
+
+
+Choice = Annotated[str, Meta(min_length=1)]
+
+
+class Branching8(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["next_question"] = "next_question"
+
+
+class Branching9(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["end"] = "end"
+
+
+class Branching10(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    For single choice questions: use choice indices as string keys ("0", "1", "2", etc.)
+    """
+
+    type: Literal["response_based"] = "response_based"
+    responseValues: Annotated[
+        dict[str, float | str],
+        Meta(
+            description=(
+                "Only include keys for responses that should branch to a specific"
+                " question or 'end'. Omit keys for responses that should proceed to the"
+                " next question (default behavior)."
+            )
+        ),
+    ]
+    """
+    Only include keys for responses that should branch to a specific question or 'end'. Omit keys for responses that should proceed to the next question (default behavior).
+    """
+
+
+class Branching11(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["specific_question"] = "specific_question"
+    index: float
+
+
+class Questions4(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["single_choice"] = "single_choice"
+    choices: Annotated[
+        list[Choice],
+        Meta(description=("Array of choice options. Choice indices (0, 1, 2, etc.) are used for branching logic")),
+    ]
+    """
+    Array of choice options. Choice indices (0, 1, 2, etc.) are used for branching logic
+    """
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+    shuffleOptions: Annotated[bool, Meta(description="Whether to randomize the order of choices for each respondent")] | None = None
+    """
+    Whether to randomize the order of choices for each respondent
+    """
+    hasOpenChoice: Annotated[bool, Meta(description="Whether the last choice (typically 'Other', is an open text input question")] | None = None
+    """
+    Whether the last choice (typically 'Other', is an open text input question
+    """
+    branching: Branching8 | Branching9 | Branching10 | Branching11 | None = None
+
+
+class Questions5(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["multiple_choice"] = "multiple_choice"
+    choices: Annotated[
+        list[Choice],
+        Meta(description=("Array of choice options. Multiple selections allowed. No branching logic supported.")),
+    ]
+    """
+    Array of choice options. Multiple selections allowed. No branching logic supported.
+    """
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+    shuffleOptions: Annotated[bool, Meta(description="Whether to randomize the order of choices for each respondent")] | None = None
+    """
+    Whether to randomize the order of choices for each respondent
+    """
+    hasOpenChoice: Annotated[bool, Meta(description="Whether the last choice (typically 'Other', is an open text input question")] | None = None
+    """
+    Whether the last choice (typically 'Other', is an open text input question
+    """
+
+
+class ThankYouMessageDescriptionContentType(StrEnum):
+    HTML = "html"
+    TEXT = "text"
+
+
+class WidgetType(StrEnum):
+    BUTTON = "button"
+    TAB = "tab"
+    SELECTOR = "selector"
+
+
+class Appearance(Struct, kw_only=True, forbid_unknown_fields=True):
+    backgroundColor: str | None = None
+    submitButtonColor: str | None = None
+    textColor: str | None = None
+    submitButtonText: str | None = None
+    submitButtonTextColor: str | None = None
+    descriptionTextColor: str | None = None
+    ratingButtonColor: str | None = None
+    ratingButtonActiveColor: str | None = None
+    ratingButtonHoverColor: str | None = None
+    whiteLabel: bool | None = None
+    autoDisappear: bool | None = None
+    displayThankYouMessage: bool | None = None
+    thankYouMessageHeader: str | None = None
+    thankYouMessageDescription: str | None = None
+    thankYouMessageDescriptionContentType: ThankYouMessageDescriptionContentType | None = None
+    thankYouMessageCloseButtonText: str | None = None
+    borderColor: str | None = None
+    placeholder: str | None = None
+    shuffleQuestions: bool | None = None
+    surveyPopupDelaySeconds: float | None = None
+    widgetType: WidgetType | None = None
+    widgetSelector: str | None = None
+    widgetLabel: str | None = None
+    widgetColor: str | None = None
+    fontFamily: str | None = None
+    maxWidth: str | None = None
+    zIndex: str | None = None
+    disabledButtonOpacity: str | None = None
+    boxPadding: str | None = None
+
+
+ResponsesLimit = Annotated[
+    float,
+    Meta(
+        description=("The maximum number of responses before automatically stopping the survey."),
+        gt=0.0,
+    ),
+]
+
+
+IterationCount = Annotated[
+    float,
+    Meta(
+        description=(
+            "For a recurring schedule, this field specifies the number of times the"
+            " survey should be shown to the user. Use 1 for 'once every X days', higher"
+            " numbers for multiple repetitions. Works together with"
+            " iteration_frequency_days to determine the overall survey schedule."
+        ),
+        gt=0.0,
+    ),
+]
+
+
+IterationFrequencyDays = Annotated[
+    float,
+    Meta(
+        description=(
+            "For a recurring schedule, this field specifies the interval in days"
+            " between each survey instance shown to the user, used alongside"
+            " iteration_count for precise scheduling."
+        ),
+        gt=0.0,
+        le=365.0,
+    ),
+]
+
+
+class Property2(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | bool | list[str | float]
+    operator: Operator | None = None
+
+
+class Group2(Struct, kw_only=True, forbid_unknown_fields=True):
+    properties: list[Property2]
+    rollout_percentage: float
+
+
+class TargetingFlagFilters(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    Target specific users based on their properties. Example: {groups: [{properties: [{key: 'email', value: ['@company.com'], operator: 'icontains'}], rollout_percentage: 100}]}
+    """
+
+    groups: list[Group2]
+
+
+class SurveyCreateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: Annotated[str, Meta(min_length=1)]
+    questions: list[Questions | Questions1 | Questions2 | Questions3 | Questions4 | Questions5]
+    description: str | None = None
+    type: Type11 | None = None
+    appearance: Appearance | None = None
+    start_date: Annotated[datetime | None, Meta(description="Setting this will launch the survey immediately. Don't add a start_date unless explicitly requested to do so.")] | None = None
+    """
+    Setting this will launch the survey immediately. Don't add a start_date unless explicitly requested to do so.
+    """
+    responses_limit: Annotated[ResponsesLimit | None, Meta(description="The maximum number of responses before automatically stopping the survey.")] | None = None
+    """
+    The maximum number of responses before automatically stopping the survey.
+    """
+    iteration_count: Annotated[IterationCount | None, Meta(description="For a recurring schedule, this field specifies the number of times" " the survey should be shown to the user. Use 1 for 'once every X" " days', higher numbers for multiple repetitions. Works together" " with iteration_frequency_days to determine the overall survey" " schedule.")] | None = None
+    """
+    For a recurring schedule, this field specifies the number of times the survey should be shown to the user. Use 1 for 'once every X days', higher numbers for multiple repetitions. Works together with iteration_frequency_days to determine the overall survey schedule.
+    """
+    iteration_frequency_days: Annotated[IterationFrequencyDays | None, Meta(description="For a recurring schedule, this field specifies the interval in" " days between each survey instance shown to the user, used" " alongside iteration_count for precise scheduling.")] | None = None
+    """
+    For a recurring schedule, this field specifies the interval in days between each survey instance shown to the user, used alongside iteration_count for precise scheduling.
+    """
+    enable_partial_responses: Annotated[bool, Meta(description="When at least one question is answered, the response is stored (true). The response is stored when all questions are answered (false).")] | None = None
+    """
+    When at least one question is answered, the response is stored (true). The response is stored when all questions are answered (false).
+    """
+    linked_flag_id: Annotated[float | None, Meta(description="The feature flag linked to this survey")] | None = None
+    """
+    The feature flag linked to this survey
+    """
+    targeting_flag_filters: Annotated[TargetingFlagFilters, Meta(description="Target specific users based on their properties. Example: {groups:" " [{properties: [{key: 'email', value: ['@company.com'], operator:" " 'icontains'}], rollout_percentage: 100}]}")] | None = None
+    """
+    Target specific users based on their properties. Example: {groups: [{properties: [{key: 'email', value: ['@company.com'], operator: 'icontains'}], rollout_percentage: 100}]}
+    """
+
+
+class SurveyDeleteSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    surveyId: str
+
+
+class SurveyGetAllSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    limit: float | None = None
+    offset: float | None = None
+    search: str | None = None
+
+
+class SurveyGetSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    surveyId: str
+
+
+class SurveyGlobalStatsSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    date_from: Annotated[datetime, Meta(description="Optional ISO timestamp for start date (e.g. 2024-01-01T00:00:00Z)")] | None = None
+    """
+    Optional ISO timestamp for start date (e.g. 2024-01-01T00:00:00Z)
+    """
+    date_to: Annotated[datetime, Meta(description="Optional ISO timestamp for end date (e.g. 2024-01-31T23:59:59Z)")] | None = None
+    """
+    Optional ISO timestamp for end date (e.g. 2024-01-31T23:59:59Z)
+    """
+
+
+class SurveyResponseCountsSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    pass
+
+
+class SurveyStatsSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    survey_id: str
+    date_from: Annotated[datetime, Meta(description="Optional ISO timestamp for start date (e.g. 2024-01-01T00:00:00Z)")] | None = None
+    """
+    Optional ISO timestamp for start date (e.g. 2024-01-01T00:00:00Z)
+    """
+    date_to: Annotated[datetime, Meta(description="Optional ISO timestamp for end date (e.g. 2024-01-31T23:59:59Z)")] | None = None
+    """
+    Optional ISO timestamp for end date (e.g. 2024-01-31T23:59:59Z)
+    """
+
+
+class Questions6(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["open"] = "open"
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+
+
+class Questions7(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["link"] = "link"
+    link: str
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+
+
+class Branching12(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["next_question"] = "next_question"
+
+
+class Branching13(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["end"] = "end"
+
+
+class Branching14(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    For rating questions: use sentiment keys based on scale thirds - negative (lower third), neutral (middle third), positive (upper third)
+    """
+
+    type: Literal["response_based"] = "response_based"
+    responseValues: Annotated[
+        dict[str, float | str],
+        Meta(
+            description=(
+                "Only include keys for responses that should branch to a specific"
+                " question or 'end'. Omit keys for responses that should proceed to the"
+                " next question (default behavior)."
+            )
+        ),
+    ]
+    """
+    Only include keys for responses that should branch to a specific question or 'end'. Omit keys for responses that should proceed to the next question (default behavior).
+    """
+
+
+class Branching15(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["specific_question"] = "specific_question"
+    index: float
+
+
+class Questions8(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["rating"] = "rating"
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+    display: Annotated[Display1, Meta(description="Display format: 'number' shows numeric scale, 'emoji' shows emoji scale")] | None = None
+    """
+    Display format: 'number' shows numeric scale, 'emoji' shows emoji scale
+    """
+    scale: Annotated[Scale, Meta(description="Rating scale can be one of 3, 5, or 7")] | None = None
+    """
+    Rating scale can be one of 3, 5, or 7
+    """
+    lowerBoundLabel: Annotated[str, Meta(description="Label for the lowest rating (e.g., 'Very Poor')")] | None = None
+    """
+    Label for the lowest rating (e.g., 'Very Poor')
+    """
+    upperBoundLabel: Annotated[str, Meta(description="Label for the highest rating (e.g., 'Excellent')")] | None = None
+    """
+    Label for the highest rating (e.g., 'Excellent')
+    """
+    branching: Branching12 | Branching13 | Branching14 | Branching15 | None = None
+
+
+class Branching16(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["next_question"] = "next_question"
+
+
+class Branching17(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["end"] = "end"
+
+
+class Branching18(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    For NPS rating questions: use sentiment keys based on score ranges - detractors (0-6), passives (7-8), promoters (9-10)
+    """
+
+    type: Literal["response_based"] = "response_based"
+    responseValues: Annotated[
+        dict[str, float | str],
+        Meta(
+            description=(
+                "Only include keys for responses that should branch to a specific"
+                " question or 'end'. Omit keys for responses that should proceed to the"
+                " next question (default behavior)."
+            )
+        ),
+    ]
+    """
+    Only include keys for responses that should branch to a specific question or 'end'. Omit keys for responses that should proceed to the next question (default behavior).
+    """
+
+
+class Branching19(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["specific_question"] = "specific_question"
+    index: float
+
+
+class Questions9(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["rating"] = "rating"
+    display: Annotated[Literal["number"], Meta(description="NPS questions always use numeric scale")] | None = "number"
+    """
+    NPS questions always use numeric scale
+    """
+    scale: Annotated[float, Meta(description="NPS questions always use 0-10 scale")]
+    """
+    NPS questions always use 0-10 scale
+    """
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+    lowerBoundLabel: Annotated[str, Meta(description="Label for 0 rating (typically 'Not at all likely')")] | None = None
+    """
+    Label for 0 rating (typically 'Not at all likely')
+    """
+    upperBoundLabel: Annotated[str, Meta(description="Label for 10 rating (typically 'Extremely likely')")] | None = None
+    """
+    Label for 10 rating (typically 'Extremely likely')
+    """
+    branching: Branching16 | Branching17 | Branching18 | Branching19 | None = None
+
+
+class Branching20(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["next_question"] = "next_question"
+
+
+class Branching21(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["end"] = "end"
+
+
+class Branching22(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    For single choice questions: use choice indices as string keys ("0", "1", "2", etc.)
+    """
+
+    type: Literal["response_based"] = "response_based"
+    responseValues: Annotated[
+        dict[str, float | str],
+        Meta(
+            description=(
+                "Only include keys for responses that should branch to a specific"
+                " question or 'end'. Omit keys for responses that should proceed to the"
+                " next question (default behavior)."
+            )
+        ),
+    ]
+    """
+    Only include keys for responses that should branch to a specific question or 'end'. Omit keys for responses that should proceed to the next question (default behavior).
+    """
+
+
+class Branching23(Struct, kw_only=True, forbid_unknown_fields=True):
+    type: Literal["specific_question"] = "specific_question"
+    index: float
+
+
+class Questions10(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["single_choice"] = "single_choice"
+    choices: Annotated[
+        list[Choice],
+        Meta(description=("Array of choice options. Choice indices (0, 1, 2, etc.) are used for branching logic")),
+    ]
+    """
+    Array of choice options. Choice indices (0, 1, 2, etc.) are used for branching logic
+    """
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+    shuffleOptions: Annotated[bool, Meta(description="Whether to randomize the order of choices for each respondent")] | None = None
+    """
+    Whether to randomize the order of choices for each respondent
+    """
+    hasOpenChoice: Annotated[bool, Meta(description="Whether the last choice (typically 'Other', is an open text input question")] | None = None
+    """
+    Whether the last choice (typically 'Other', is an open text input question
+    """
+    branching: Branching20 | Branching21 | Branching22 | Branching23 | None = None
+
+
+class Questions11(Struct, kw_only=True, forbid_unknown_fields=True):
+    question: str
+    type: Literal["multiple_choice"] = "multiple_choice"
+    choices: Annotated[
+        list[Choice],
+        Meta(description=("Array of choice options. Multiple selections allowed. No branching logic supported.")),
+    ]
+    """
+    Array of choice options. Multiple selections allowed. No branching logic supported.
+    """
+    description: str | None = None
+    descriptionContentType: DescriptionContentType | None = None
+    optional: bool | None = None
+    buttonText: str | None = None
+    shuffleOptions: Annotated[bool, Meta(description="Whether to randomize the order of choices for each respondent")] | None = None
+    """
+    Whether to randomize the order of choices for each respondent
+    """
+    hasOpenChoice: Annotated[bool, Meta(description="Whether the last choice (typically 'Other', is an open text input question")] | None = None
+    """
+    Whether the last choice (typically 'Other', is an open text input question
+    """
+
+
+class UrlMatchType(StrEnum):
+    """
+    URL/device matching types: 'regex' (matches regex pattern), 'not_regex' (does not match regex pattern), 'exact' (exact string match), 'is_not' (not exact match), 'icontains' (case-insensitive contains), 'not_icontains' (case-insensitive does not contain)
+    """
+
+    REGEX = "regex"
+    NOT_REGEX = "not_regex"
+    EXACT = "exact"
+    IS_NOT = "is_not"
+    ICONTAINS = "icontains"
+    NOT_ICONTAINS = "not_icontains"
+
+
+class Value9(Struct, kw_only=True, forbid_unknown_fields=True):
+    name: str
+
+
+class Events(Struct, kw_only=True, forbid_unknown_fields=True):
+    repeatedActivation: Annotated[bool, Meta(description="Whether to show the survey every time one of the events is triggered (true), or just once (false)")] | None = None
+    """
+    Whether to show the survey every time one of the events is triggered (true), or just once (false)
+    """
+    values: Annotated[list[Value9], Meta(description="Array of event names that trigger the survey")] | None = None
+    """
+    Array of event names that trigger the survey
+    """
+
+
+class DeviceType(StrEnum):
+    DESKTOP = "Desktop"
+    MOBILE = "Mobile"
+    TABLET = "Tablet"
+
+
+class DeviceTypesMatchType(StrEnum):
+    """
+    URL/device matching types: 'regex' (matches regex pattern), 'not_regex' (does not match regex pattern), 'exact' (exact string match), 'is_not' (not exact match), 'icontains' (case-insensitive contains), 'not_icontains' (case-insensitive does not contain)
+    """
+
+    REGEX = "regex"
+    NOT_REGEX = "not_regex"
+    EXACT = "exact"
+    IS_NOT = "is_not"
+    ICONTAINS = "icontains"
+    NOT_ICONTAINS = "not_icontains"
+
+
+class Conditions(Struct, kw_only=True, forbid_unknown_fields=True):
+    url: str | None = None
+    selector: str | None = None
+    seenSurveyWaitPeriodInDays: Annotated[float, Meta(description="Don't show this survey to users who saw any survey in the last x days.")] | None = None
+    """
+    Don't show this survey to users who saw any survey in the last x days.
+    """
+    urlMatchType: Annotated[UrlMatchType, Meta(description="URL/device matching types: 'regex' (matches regex pattern)," " 'not_regex' (does not match regex pattern), 'exact' (exact string" " match), 'is_not' (not exact match), 'icontains' (case-insensitive" " contains), 'not_icontains' (case-insensitive does not contain)")] | None = None
+    """
+    URL/device matching types: 'regex' (matches regex pattern), 'not_regex' (does not match regex pattern), 'exact' (exact string match), 'is_not' (not exact match), 'icontains' (case-insensitive contains), 'not_icontains' (case-insensitive does not contain)
+    """
+    events: Events | None = None
+    deviceTypes: list[DeviceType] | None = None
+    deviceTypesMatchType: Annotated[DeviceTypesMatchType, Meta(description="URL/device matching types: 'regex' (matches regex pattern)," " 'not_regex' (does not match regex pattern), 'exact' (exact string" " match), 'is_not' (not exact match), 'icontains' (case-insensitive" " contains), 'not_icontains' (case-insensitive does not contain)")] | None = None
+    """
+    URL/device matching types: 'regex' (matches regex pattern), 'not_regex' (does not match regex pattern), 'exact' (exact string match), 'is_not' (not exact match), 'icontains' (case-insensitive contains), 'not_icontains' (case-insensitive does not contain)
+    """
+    linkedFlagVariant: Annotated[str, Meta(description="The variant of the feature flag linked to this survey")] | None = None
+    """
+    The variant of the feature flag linked to this survey
+    """
+
+
+class Appearance1(Struct, kw_only=True, forbid_unknown_fields=True):
+    backgroundColor: str | None = None
+    submitButtonColor: str | None = None
+    textColor: str | None = None
+    submitButtonText: str | None = None
+    submitButtonTextColor: str | None = None
+    descriptionTextColor: str | None = None
+    ratingButtonColor: str | None = None
+    ratingButtonActiveColor: str | None = None
+    ratingButtonHoverColor: str | None = None
+    whiteLabel: bool | None = None
+    autoDisappear: bool | None = None
+    displayThankYouMessage: bool | None = None
+    thankYouMessageHeader: str | None = None
+    thankYouMessageDescription: str | None = None
+    thankYouMessageDescriptionContentType: ThankYouMessageDescriptionContentType | None = None
+    thankYouMessageCloseButtonText: str | None = None
+    borderColor: str | None = None
+    placeholder: str | None = None
+    shuffleQuestions: bool | None = None
+    surveyPopupDelaySeconds: float | None = None
+    widgetType: WidgetType | None = None
+    widgetSelector: str | None = None
+    widgetLabel: str | None = None
+    widgetColor: str | None = None
+    fontFamily: str | None = None
+    maxWidth: str | None = None
+    zIndex: str | None = None
+    disabledButtonOpacity: str | None = None
+    boxPadding: str | None = None
+
+
+class Schedule(StrEnum):
+    """
+    Survey scheduling behavior: 'once' = show once per user (default), 'recurring' = repeat based on iteration_count and iteration_frequency_days settings, 'always' = show every time conditions are met (mainly for widget surveys)
+    """
+
+    ONCE = "once"
+    RECURRING = "recurring"
+    ALWAYS = "always"
+
+
+class Property3(Struct, kw_only=True, forbid_unknown_fields=True):
+    key: str
+    value: str | float | bool | list[str | float]
+    operator: Operator | None = None
+
+
+class Group3(Struct, kw_only=True, forbid_unknown_fields=True):
+    properties: list[Property3]
+    rollout_percentage: float
+
+
+class TargetingFlagFilters1(Struct, kw_only=True, forbid_unknown_fields=True):
+    """
+    Target specific users based on their properties. Example: {groups: [{properties: [{key: 'email', value: ['@company.com'], operator: 'icontains'}], rollout_percentage: 50}]}
+    """
+
+    groups: list[Group3]
+
+
+class SurveyUpdateSchema(Struct, kw_only=True, forbid_unknown_fields=True):
+    surveyId: str
+    name: Annotated[str, Meta(min_length=1)] | None = None
+    description: str | None = None
+    type: Type11 | None = None
+    questions: list[Questions6 | Questions7 | Questions8 | Questions9 | Questions10 | Questions11] | None = None
+    conditions: Conditions | None = None
+    appearance: Appearance1 | None = None
+    schedule: Annotated[Schedule, Meta(description="Survey scheduling behavior: 'once' = show once per user (default)," " 'recurring' = repeat based on iteration_count and" " iteration_frequency_days settings, 'always' = show every time" " conditions are met (mainly for widget surveys)")] | None = None
+    """
+    Survey scheduling behavior: 'once' = show once per user (default), 'recurring' = repeat based on iteration_count and iteration_frequency_days settings, 'always' = show every time conditions are met (mainly for widget surveys)
+    """
+    start_date: Annotated[datetime, Meta(description="When the survey should start being shown to users. Setting this will launch the survey")] | None = None
+    """
+    When the survey should start being shown to users. Setting this will launch the survey
+    """
+    end_date: Annotated[datetime, Meta(description="When the survey stopped being shown to users. Setting this will complete the survey.")] | None = None
+    """
+    When the survey stopped being shown to users. Setting this will complete the survey.
+    """
+    archived: bool | None = None
+    responses_limit: Annotated[ResponsesLimit | None, Meta(description="The maximum number of responses before automatically stopping the survey.")] | None = None
+    """
+    The maximum number of responses before automatically stopping the survey.
+    """
+    iteration_count: Annotated[IterationCount | None, Meta(description="For a recurring schedule, this field specifies the number of times" " the survey should be shown to the user. Use 1 for 'once every X" " days', higher numbers for multiple repetitions. Works together" " with iteration_frequency_days to determine the overall survey" " schedule.")] | None = None
+    """
+    For a recurring schedule, this field specifies the number of times the survey should be shown to the user. Use 1 for 'once every X days', higher numbers for multiple repetitions. Works together with iteration_frequency_days to determine the overall survey schedule.
+    """
+    iteration_frequency_days: Annotated[IterationFrequencyDays | None, Meta(description="For a recurring schedule, this field specifies the interval in" " days between each survey instance shown to the user, used" " alongside iteration_count for precise scheduling.")] | None = None
+    """
+    For a recurring schedule, this field specifies the interval in days between each survey instance shown to the user, used alongside iteration_count for precise scheduling.
+    """
+    enable_partial_responses: Annotated[bool, Meta(description="When at least one question is answered, the response is stored (true). The response is stored when all questions are answered (false).")] | None = None
+    """
+    When at least one question is answered, the response is stored (true). The response is stored when all questions are answered (false).
+    """
+    linked_flag_id: Annotated[float | None, Meta(description="The feature flag to link to this survey")] | None = None
+    """
+    The feature flag to link to this survey
+    """
+    targeting_flag_id: Annotated[float, Meta(description="An existing targeting flag to use for this survey")] | None = None
+    """
+    An existing targeting flag to use for this survey
+    """
+    targeting_flag_filters: Annotated[TargetingFlagFilters1, Meta(description="Target specific users based on their properties. Example: {groups:" " [{properties: [{key: 'email', value: ['@company.com'], operator:" " 'icontains'}], rollout_percentage: 50}]}")] | None = None
+    """
+    Target specific users based on their properties. Example: {groups: [{properties: [{key: 'email', value: ['@company.com'], operator: 'icontains'}], rollout_percentage: 50}]}
+    """
+    remove_targeting_flag: Annotated[bool, Meta(description="Set to true to completely remove all targeting filters from the" " survey, making it visible to all users (subject to other display" " conditions like URL matching).")] | None = None
+    """
+    Set to true to completely remove all targeting filters from the survey, making it visible to all users (subject to other display conditions like URL matching).
+    """
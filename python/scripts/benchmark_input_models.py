@@ -0,0 +1,104 @@
+"""
+Compare validating tool arguments with the Pydantic models in schema/tool_inputs.py against the
+msgspec structs the toolkit uses.
+
+Run from the python directory, after generating both with generate-pydantic-models.sh:
+
+    uv run --extra msgspec python scripts/benchmark_input_models.py
+"""
+
+import json
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Arguments of typical calls, from a lookup to a nested create
+SAMPLES: dict[str, tuple[str, dict[str, Any]]] = {
+    "dashboard-get": ("DashboardGetSchema", {"dashboardId": 42}),
+    "list-errors": (
+        "ErrorTrackingListSchema",
+        {"orderBy": "users", "dateFrom": "2025-01-01T00:00:00Z", "orderDirection": "DESC", "status": "active"},
+    ),
+    "create-feature-flag": (
+        "FeatureFlagCreateSchema",
+        {
+            "name": "New checkout",
+            "key": "new-checkout",
+            "description": "Roll out the new checkout flow",
+            "active": True,
+            "tags": ["checkout", "growth"],
+            "filters": {
+                "groups": [
+                    {
+                        "properties": [
+                            {"key": "email", "value": "@posthog.com", "operator": "icontains"},
+                            {"key": "country", "value": ["US", "CA", "GB"], "operator": "exact"},
+                        ],
+                        "rollout_percentage": 100,
+                    },
+                    {"properties": [], "rollout_percentage": 20},
+                ]
+            },
+        },
+    ),
+    "experiment-create": (
+        "ExperimentCreateSchema",
+        {
+            "name": "Checkout button color",
+            "feature_flag_key": "checkout-button-color",
+            "description": "A green button gets more clicks than a blue one",
+            "type": "product",
+            "primary_metrics": [
+                {"name": "Purchases", "metric_type": "mean", "event_name": "purchase"},
+                {"name": "Checkout funnel", "metric_type": "funnel", "event_name": "$pageview", "funnel_steps": ["$pageview", "add_to_cart", "purchase"]},
+            ],
+            "variants": [{"key": "control", "rollout_percentage": 50}, {"key": "test", "rollout_percentage": 50}],
+            "minimum_detectable_effect": 20,
+            "filter_test_accounts": True,
+            "draft": True,
+        },
+    ),
+}
+
+# Calls timed per round, and rounds of which the fastest counts
+CALLS = 20_000
+ROUNDS = 5
+
+
+def best_of(function: Any) -> float:
+    """Microseconds per call in the fastest of `ROUNDS` rounds."""
+    return min(timeit.repeat(function, number=CALLS, repeat=ROUNDS)) / CALLS * 1e6
+
+
+def main() -> None:
+    started = time.perf_counter()
+    from schema import tool_inputs
+
+    pydantic_import = time.perf_counter() - started
+
+    started = time.perf_counter()
+    from posthog_agent_toolkit import inputs
+
+    msgspec_import = time.perf_counter() - started
+
+    print(f"Import: Pydantic {pydantic_import * 1000:.1f} ms, msgspec {msgspec_import * 1000:.1f} ms\n")
+    print(f"{'Tool':<22}{'Pydantic':>12}{'Pydantic JSON':>15}{'msgspec':>12}{'Speedup':>10}")
+
+    for tool, (schema, arguments) in SAMPLES.items():
+        model = getattr(tool_inputs, schema)
+        # Both must accept the arguments, or the comparison is of error paths
+        model.model_validate(arguments)
+        inputs.validate_arguments(tool, arguments)
+
+        pydantic_time = best_of(lambda model=model, arguments=arguments: model.model_validate(arguments))
+        pydantic_json_time = best_of(lambda model=model, arguments=arguments: model.model_validate_json(json.dumps(arguments)))
+        msgspec_time = best_of(lambda tool=tool, arguments=arguments: inputs.validate_arguments(tool, arguments))
+        print(f"{tool:<22}{pydantic_time:>10.2f}us{pydantic_json_time:>13.2f}us{msgspec_time:>10.2f}us{pydantic_time / msgspec_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
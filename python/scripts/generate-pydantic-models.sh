@@ -10,6 +10,7 @@ PYTHON_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 # Input and output paths
 INPUT_PATH="$PROJECT_ROOT/schema/tool-inputs.json"
 OUTPUT_PATH="$PYTHON_ROOT/schema/tool_inputs.py"
+STRUCTS_OUTPUT_PATH="$PYTHON_ROOT/posthog_agent_toolkit/tool_input_structs.py"
 
 # Ensure output directory exists
 mkdir -p "$(dirname "$OUTPUT_PATH")"
@@ -61,18 +62,64 @@ uv run ruff format "$OUTPUT_PATH"
 echo "🔍 Checking with ruff..."
 uv run ruff check --fix "$OUTPUT_PATH"
 
+# Edit a file in place with GNU or BSD/macOS sed
+sed_in_place() {
+    if sed --version 2>&1 | grep -q GNU; then
+        sed -i "$@"
+    else
+        sed -i '' "$@"
+    fi
+}
+
 # Replace class Foo(str, Enum) with class Foo(StrEnum) for proper handling in format strings in python 3.11
 # Remove this when https://github.com/koxudaxi/datamodel-code-generator/issues/1313 is resolved
 echo "🔄 Updating enum imports for Python 3.11+..."
-if sed --version 2>&1 | grep -q GNU; then
-    # GNU sed
-    sed -i -e 's/str, Enum/StrEnum/g' "$OUTPUT_PATH"
-    sed -i 's/from enum import Enum/from enum import Enum, StrEnum/g' "$OUTPUT_PATH"
-else
-    # BSD/macOS sed
-    sed -i '' -e 's/str, Enum/StrEnum/g' "$OUTPUT_PATH"
-    sed -i '' 's/from enum import Enum/from enum import Enum, StrEnum/g' "$OUTPUT_PATH"
-fi
+sed_in_place -e 's/str, Enum/StrEnum/g' "$OUTPUT_PATH"
+sed_in_place 's/from enum import Enum/from enum import Enum, StrEnum/g' "$OUTPUT_PATH"
+
+# Generate msgspec structs with the same fields and constraints, which the toolkit validates
+# and encodes tool arguments with. They live in the package, since schema/ is not shipped.
+echo "🔧 Generating msgspec structs from $INPUT_PATH"
+uv run datamodel-codegen \
+    --class-name='ToolInputs' \
+    --collapse-root-models \
+    --target-python-version 3.11 \
+    --disable-timestamp \
+    --use-one-literal-as-default \
+    --use-default \
+    --use-default-kwarg \
+    --use-subclass-enum \
+    --input "$INPUT_PATH" \
+    --input-file-type jsonschema \
+    --output "$STRUCTS_OUTPUT_PATH" \
+    --output-model-type msgspec.Struct \
+    --output-datetime-class datetime \
+    --custom-file-header "# mypy: disable-error-code=\"assignment\"" \
+    --set-default-enum-member \
+    --capitalise-enum-members \
+    --wrap-string-literal \
+    --use-field-description \
+    --use-schema-description \
+    --field-constraints \
+    --use-annotated
+
+uv run ruff format "$STRUCTS_OUTPUT_PATH"
+uv run ruff check --fix "$STRUCTS_OUTPUT_PATH"
+
+# Adapt the structs to what msgspec supports:
+# - enums of strings subclass StrEnum, as above, and enums of numbers IntEnum, since msgspec has no float enums
+# - a union may hold only one list type, so lists of strings or numbers become lists of both
+# - required fields may follow optional ones, which msgspec only allows for keyword-only fields
+# - the schemas reject unknown properties (`"additionalProperties": false`), and so do the structs
+echo "🔄 Adapting structs to msgspec..."
+sed_in_place -e 's/str, Enum/StrEnum/g' -e 's/(float, Enum)/(IntEnum)/g' "$STRUCTS_OUTPUT_PATH"
+sed_in_place 's/from enum import Enum/from enum import Enum, IntEnum, StrEnum/g' "$STRUCTS_OUTPUT_PATH"
+sed_in_place -e 's/list\[str\] | list\[float\]/list[str | float]/g' "$STRUCTS_OUTPUT_PATH"
+sed_in_place -e 's/^\(class [A-Za-z0-9_]*(Struct\)/\1, kw_only=True, forbid_unknown_fields=True/' "$STRUCTS_OUTPUT_PATH"
+
+# Bundle the tool definitions with the package so the toolkit can read tool metadata at runtime
+echo "📦 Copying tool definitions..."
+cp "$PROJECT_ROOT/schema/tool-definitions.json" "$PYTHON_ROOT/posthog_agent_toolkit/tool_definitions.json"
 
-echo "🎉 Successfully generated Pydantic models!"
-echo "📋 Output file: $OUTPUT_PATH"
+echo "🎉 Successfully generated Pydantic models and msgspec structs!"
+echo "📋 Output files: $OUTPUT_PATH, $STRUCTS_OUTPUT_PATH"
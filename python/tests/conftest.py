@@ -0,0 +1,188 @@
+"""Fixtures of the tests, including a fake PostHog MCP server running in the test process."""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+import pytest
+import uvicorn
+from mcp.server.fastmcp import Context, FastMCP
+
+from posthog_agent_toolkit.integrations.langchain.toolkit import PostHogAgentToolkit
+
+
+class FakeServer:
+    """
+    A PostHog MCP server with a few of its tools, served over streamable HTTP from a thread.
+
+    Records the calls it receives, so tests can check what reached the server.
+    """
+
+    def __init__(self, json_response: bool = False):
+        self.mcp = FastMCP("PostHog", json_response=json_response, log_level="WARNING")
+        self._add_tools()
+        self.url = ""
+        self._server: uvicorn.Server | None = None
+        self._thread: threading.Thread | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        # Name and arguments of every tool call, in the order they started
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        # Names of the tools whose calls were cancelled while they ran
+        self.cancelled: list[str] = []
+        # Seconds the next calls of a tool take, in order, before calls go back to taking none
+        self.delays: dict[str, list[float]] = {}
+        self.flags: dict[str, dict[str, Any]] = {
+            "new-checkout": {
+                "id": 1,
+                "key": "new-checkout",
+                "name": "New checkout",
+                "active": True,
+                "tags": ["checkout"],
+                "filters": {"groups": [{"properties": [], "rollout_percentage": 50}], "payloads": {"true": "{}"}},
+            },
+        }
+        self._context: dict[int, dict[str, Any]] = {}
+
+    def start(self) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}/mcp"
+        self._server = uvicorn.Server(uvicorn.Config(self.mcp.streamable_http_app(), log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]}, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        if self._server is not None and self._thread is not None:
+            self._server.should_exit = True
+            self._thread.join(5)
+
+    def calls_of(self, tool: str) -> list[dict[str, Any]]:
+        return [arguments for name, arguments in self.calls if name == tool]
+
+    async def _run(self, tool: str, arguments: dict[str, Any]) -> None:
+        """Record a call, and take the time set for it in `delays`."""
+        self.calls.append((tool, arguments))
+        delays = self.delays.get(tool)
+        if not delays:
+            return
+        try:
+            await asyncio.sleep(delays.pop(0))
+        except asyncio.CancelledError:
+            self.cancelled.append(tool)
+            raise
+
+    def _add_tools(self) -> None:
+        mcp = self.mcp
+
+        @mcp.tool(name="slow")
+        async def slow(seconds: float) -> str:
+            self.calls.append(("slow", {"seconds": seconds}))
+            try:
+                await asyncio.sleep(seconds)
+            except asyncio.CancelledError:
+                self.cancelled.append("slow")
+                raise
+            return "done"
+
+        @mcp.tool(name="fail")
+        async def fail() -> str:
+            self.calls.append(("fail", {}))
+            raise ValueError("Something went wrong")
+
+        @mcp.tool(name="switch-organization")
+        async def switch_organization(orgId: str, ctx: Context) -> str:
+            await self._run("switch-organization", {"orgId": orgId})
+            self._context.setdefault(id(ctx.session), {})["organization"] = orgId
+            return f"Switched to organization {orgId}"
+
+        @mcp.tool(name="switch-project")
+        async def switch_project(projectId: int, ctx: Context) -> str:
+            await self._run("switch-project", {"projectId": projectId})
+            self._context.setdefault(id(ctx.session), {})["project"] = projectId
+            return f"Switched to project {projectId}"
+
+        @mcp.tool(name="whoami")
+        async def whoami(ctx: Context) -> str:
+            context = self._context.get(id(ctx.session), {})
+            return json.dumps({"organization": context.get("organization"), "project": context.get("project")})
+
+        @mcp.tool(name="projects-get")
+        async def projects_get() -> str:
+            await self._run("projects-get", {})
+            return json.dumps([{"id": 1, "name": "Default project"}])
+
+        @mcp.tool(name="insight-get")
+        async def insight_get(insightId: str) -> str:
+            await self._run("insight-get", {"insightId": insightId})
+            return json.dumps({"id": 1, "short_id": insightId, "name": "Signups"})
+
+        @mcp.tool(name="query-run")
+        async def query_run(query: dict[str, Any], ctx: Context) -> str:
+            await self._run("query-run", {"query": query})
+            for step in range(3):
+                await ctx.report_progress(step, 3, f"Scanned {step * 1000} rows")
+                await asyncio.sleep(0.01)
+            return json.dumps({"results": [[1]]})
+
+        @mcp.tool(name="feature-flag-get-all")
+        async def flags_get_all() -> str:
+            await self._run("feature-flag-get-all", {})
+            return json.dumps([{key: flag[key] for key in ("id", "key", "name", "active")} for flag in self.flags.values()])
+
+        @mcp.tool(name="feature-flag-get-definition")
+        async def flag_definition(flagId: int | None = None, flagKey: str | None = None) -> str:
+            await self._run("feature-flag-get-definition", {"flagId": flagId, "flagKey": flagKey})
+            flag = next((flag for flag in self.flags.values() if flag["id"] == flagId or flag["key"] == flagKey), None)
+            if flag is None:
+                raise ValueError("Flag not found")
+            return json.dumps(flag)
+
+        @mcp.tool(name="update-feature-flag")
+        async def update_flag(flagKey: str, data: dict[str, Any]) -> str:
+            await self._run("update-feature-flag", {"flagKey": flagKey, "data": data})
+            self.flags[flagKey] = {**self.flags[flagKey], **data}
+            return json.dumps(self.flags[flagKey])
+
+
+@pytest.fixture(scope="session")
+def _server() -> Iterator[FakeServer]:
+    server = FakeServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def _json_server() -> Iterator[FakeServer]:
+    server = FakeServer(json_response=True)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def server(_server: FakeServer) -> FakeServer:
+    """The fake server, answering tool calls over server-sent event streams."""
+    _server.reset()
+    return _server
+
+
+@pytest.fixture
+def json_server(_json_server: FakeServer) -> FakeServer:
+    """The fake server, answering each tool call with a single JSON response."""
+    _json_server.reset()
+    return _json_server
+
+
+@pytest.fixture
+async def toolkit(server: FakeServer) -> AsyncIterator[PostHogAgentToolkit]:
+    async with PostHogAgentToolkit(url=server.url, personal_api_key="phx_test") as toolkit:
+        yield toolkit
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from langchain_core.tools import ToolException
+
+from posthog_agent_toolkit.artifacts import AGGREGATE_TOOL, FILTER_TOOL, PAGE_TOOL, ArtifactOptions, ArtifactStore, filter_items
+from posthog_agent_toolkit.integrations.langchain.toolkit import PostHogAgentToolkit
+
+ISSUES = [{"id": str(n), "status": "active" if n % 2 else "resolved", "aggregations": {"users": n * 10}} for n in range(50)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(ArtifactOptions(threshold=100, directory=str(tmp_path)))
+    yield store
+    store.close()
+
+
+async def test_spills_long_results_with_a_preview(store):
+    summary = json.loads(await store.spill("list-errors", json.dumps({"results": ISSUES})))
+    artifact = store.get(summary["artifact"])
+
+    assert artifact.main_path == "results"
+    assert artifact.file.read_text() == json.dumps({"results": ISSUES})
+    assert await store.spill("list-errors", "[]") == "[]"
+
+
+async def test_pages_filters_and_aggregates_an_artifact(store):
+    handle = (await store.put("list-errors", json.dumps(ISSUES))).handle
+
+    page = json.loads(await store.answer(PAGE_TOOL, {"artifact": handle, "offset": 48, "fields": ["id"]}))
+    assert page == {"path": "", "total": 50, "offset": 48, "items": [{"id": "48"}, {"id": "49"}]}
+
+    where = [{"field": "aggregations.users", "op": "gte", "value": 400}]
+    matched = json.loads(await store.answer(FILTER_TOOL, {"artifact": handle, "where": where}))
+    assert matched["matches"] == 10
+
+    groups = json.loads(
+        await store.answer(AGGREGATE_TOOL, {"artifact": handle, "group_by": ["status"], "metrics": [{"op": "sum", "field": "aggregations.users"}]})
+    )
+    assert groups["groups"] == [{"status": "active", "sum(aggregations.users)": 6250}, {"status": "resolved", "sum(aggregations.users)": 6000}]
+
+
+async def test_reads_text_that_is_not_json(store):
+    handle = (await store.put("docs-search", "é line\n" * 50)).handle
+    page = json.loads(await store.answer(PAGE_TOOL, {"artifact": handle, "limit": 2}))
+    assert page["items"] == ["é line", "é line"]
+
+
+@pytest.mark.parametrize("where", [[{"op": "eq", "value": 1}], [{"field": "status", "op": "like"}], ["status = active"]])
+def test_rejects_invalid_conditions(where):
+    with pytest.raises(ValueError):
+        filter_items(ISSUES, where)
+
+
+async def test_invalid_filter_is_a_tool_error(server, tmp_path):
+    options = ArtifactOptions(threshold=100, directory=str(tmp_path))
+    async with PostHogAgentToolkit(url=server.url, personal_api_key="phx_test", artifacts=options) as toolkit:
+        handle = (await toolkit.artifacts.put("list-errors", json.dumps(ISSUES))).handle
+        with pytest.raises(ToolException, match="needs a field"):
+            await toolkit.call_tool(FILTER_TOOL, {"artifact": handle, "where": [{"op": "eq", "value": "active"}]})
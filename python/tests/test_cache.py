@@ -0,0 +1,101 @@
+import asyncio
+import functools
+from collections.abc import AsyncIterator
+
+import pytest
+
+from posthog_agent_toolkit.cache import CacheFactory, ScopedCache
+from posthog_agent_toolkit.cache.memory import MemoryCache
+from posthog_agent_toolkit.cache.sqlite import SQLiteCache, SQLiteStorage
+from posthog_agent_toolkit.integrations.langchain import toolkit as toolkit_module
+from posthog_agent_toolkit.integrations.langchain.toolkit import CONTEXT_KEY, PostHogAgentToolkit
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+async def cache_factory(request, tmp_path) -> AsyncIterator[CacheFactory]:
+    """Creates the caches of each scope, sharing their entries between instances of a scope."""
+    if request.param == "memory":
+        yield MemoryCache
+        for scope in ("a", "b"):
+            await MemoryCache(scope).clear()
+    elif request.param == "sqlite":
+        storage = SQLiteStorage(str(tmp_path / "cache.db"))
+        yield functools.partial(SQLiteCache, storage=storage)
+        storage.close()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        from posthog_agent_toolkit.cache.redis import RedisCache
+
+        client = fakeredis.FakeAsyncRedis()
+        yield functools.partial(RedisCache, client=client)
+        await client.aclose()
+
+
+async def test_sets_gets_and_deletes_values(cache_factory):
+    cache: ScopedCache = cache_factory("a")
+    assert await cache.get("tools") is None
+
+    await cache.set("tools", [{"name": "insight-get"}])
+    assert await cache.get("tools") == [{"name": "insight-get"}]
+    # Another instance of the scope, as in another worker, sees the same entries
+    assert await cache_factory("a").get("tools") == [{"name": "insight-get"}]
+
+    await cache.delete("tools")
+    assert await cache.get("tools") is None
+
+
+async def test_values_expire_after_their_ttl(cache_factory):
+    cache = cache_factory("a")
+    await cache.set("listing", "[]", ttl=0.05)
+    assert await cache.get("listing") == "[]"
+    await asyncio.sleep(0.1)
+    assert await cache.get("listing") is None
+
+
+async def test_clear_only_deletes_the_keys_of_its_scope(cache_factory):
+    a, b = cache_factory("a"), cache_factory("b")
+    await a.set("context", {"switch-project": {"projectId": 1}})
+    await b.set("context", {"switch-project": {"projectId": 2}})
+
+    await a.clear()
+    assert await a.get("context") is None
+    assert await b.get("context") == {"switch-project": {"projectId": 2}}
+    await b.clear()
+
+
+class CountingCache(MemoryCache):
+    def __init__(self, scope: str):
+        super().__init__(scope, shared=True)
+        self.reads: list[str] = []
+
+    async def get(self, key: str):
+        self.reads.append(key)
+        return await super().get(key)
+
+
+async def test_context_switched_by_another_toolkit_is_picked_up(server, monkeypatch):
+    monkeypatch.setattr(toolkit_module, "CONTEXT_REFRESH_INTERVAL", 0.2)
+    caches: list[CountingCache] = []
+
+    def factory(scope: str) -> CountingCache:
+        caches.append(CountingCache(scope))
+        return caches[-1]
+
+    async with (
+        PostHogAgentToolkit(url=server.url, personal_api_key="phx_shared", cache=factory) as first,
+        PostHogAgentToolkit(url=server.url, personal_api_key="phx_shared", cache=factory) as second,
+    ):
+        try:
+            assert await second.call_tool("whoami") == '{"organization": null, "project": null}'
+            await first.call_tool("switch-project", {"projectId": 2})
+
+            # The second toolkit reads the context at most once per refresh interval
+            for _ in range(3):
+                assert await second.call_tool("whoami") == '{"organization": null, "project": null}'
+            assert caches[1].reads.count(CONTEXT_KEY) == 1
+
+            await asyncio.sleep(0.2)
+            assert await second.call_tool("whoami") == '{"organization": null, "project": 2}'
+            assert caches[1].reads.count(CONTEXT_KEY) == 2
+        finally:
+            await caches[0].clear()
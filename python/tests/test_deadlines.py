@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from posthog_agent_toolkit.deadlines import call_deadline, current_deadline, deadline
+
+
+async def wait_for_cancellation(server) -> None:
+    for _ in range(100):
+        if server.cancelled:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_nested_deadlines_only_shorten_the_outer_one():
+    with deadline(10):
+        outer = current_deadline()
+        with deadline(60):
+            assert current_deadline() == outer
+        with deadline(1):
+            assert current_deadline() < outer
+    assert current_deadline() is None
+
+
+def test_call_deadline_is_the_earlier_of_timeout_and_context():
+    now = time.monotonic()
+    assert call_deadline("slow", None, {}, None) is None
+    assert call_deadline("slow", None, {"slow": 5}, 60) == pytest.approx(now + 5, abs=0.1)
+    assert call_deadline("slow", 1, {"slow": 5}, 60) == pytest.approx(now + 1, abs=0.1)
+    with deadline(0.5):
+        assert call_deadline("slow", 1, {}, 60) == pytest.approx(now + 0.5, abs=0.1)
+
+
+async def test_timeout_cancels_the_call_on_the_server(toolkit, server):
+    with pytest.raises(TimeoutError):
+        await toolkit.call_tool("slow", {"seconds": 5}, timeout=0.3)
+
+    await wait_for_cancellation(server)
+    assert server.cancelled == ["slow"]
+    # The server stopped the call, so its session is reused
+    assert await toolkit.call_tool("slow", {"seconds": 0}) == "done"
+    assert toolkit._pool.size == 1
+
+
+async def test_deadline_of_the_context_applies_to_every_call(toolkit, server):
+    with deadline(0.3), pytest.raises(TimeoutError):
+        await toolkit.call_tool("slow", {"seconds": 0.1})
+        await toolkit.call_tool("slow", {"seconds": 5})
+
+    await wait_for_cancellation(server)
+    assert server.cancelled == ["slow"]
+    assert [arguments["seconds"] for arguments in server.calls_of("slow")] == [0.1, 5]
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from posthog_agent_toolkit.entities import EntityCache
+
+SURVEY = {"id": "s1", "name": "NPS", "conditions": {"url": "/checkout", "selector": ".buy"}, "appearance": {"position": "right"}}
+INSIGHT = {"id": 7, "short_id": "abc", "name": "Signups", "filters": {"events": [{"id": "signup"}], "interval": "day"}, "query": {"kind": "TrendsQuery"}}
+
+
+async def stored(tool: str, arguments: dict, entity: dict) -> EntityCache:
+    cache = EntityCache()
+    await cache.store(tool, arguments, json.dumps(entity), "1:2")
+    return cache
+
+
+async def test_skips_an_update_that_changes_nothing():
+    cache = await stored("survey-get", {"surveyId": "s1"}, SURVEY)
+    arguments = {"surveyId": "s1", "name": "NPS", "conditions": dict(SURVEY["conditions"])}
+    assert await cache.trim("survey-update", arguments, "1:2") == (arguments, json.dumps(SURVEY))
+
+
+async def test_trims_fields_that_would_not_change():
+    cache = await stored("survey-get", {"surveyId": "s1"}, SURVEY)
+    arguments = {"surveyId": "s1", "name": "NPS 2", "appearance": {"position": "right"}}
+    assert await cache.trim("survey-update", arguments, "1:2") == ({"surveyId": "s1", "name": "NPS 2"}, None)
+
+
+@pytest.mark.parametrize(
+    "tool, read_tool, read_arguments, entity, arguments",
+    [
+        ("survey-update", "survey-get", {"surveyId": "s1"}, SURVEY, {"surveyId": "s1", "conditions": {"url": "/checkout"}}),
+        ("insight-update", "insight-get", {"insightId": "abc"}, INSIGHT, {"insightId": "abc", "data": {"filters": {"events": [{"id": "signup"}]}}}),
+    ],
+)
+async def test_keeps_a_replaced_field_that_leaves_out_keys(tool, read_tool, read_arguments, entity, arguments):
+    cache = await stored(read_tool, read_arguments, entity)
+    trimmed, skipped = await cache.trim(tool, arguments, "1:2")
+    assert skipped is None
+    assert trimmed == arguments
+
+
+async def test_insight_updates_always_send_the_query():
+    cache = await stored("insight-get", {"insightId": "abc"}, INSIGHT)
+    arguments = {"insightId": "abc", "data": {"name": "Signups per day", "query": INSIGHT["query"]}}
+    assert await cache.trim("insight-update", arguments, "1:2") == (arguments, None)
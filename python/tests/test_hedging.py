@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from posthog_agent_toolkit.hedging import Hedger, HedgingOptions, LatencyTracker
+from posthog_agent_toolkit.integrations.langchain.toolkit import PostHogAgentToolkit
+
+
+def test_percentile_of_recent_latencies():
+    tracker = LatencyTracker(window=4)
+    assert tracker.percentile("insight-get", 95) is None
+    for seconds in (9.0, 1.0, 2.0, 3.0, 4.0):
+        tracker.observe("insight-get", seconds)
+
+    # The oldest latency fell out of the window
+    assert tracker.count("insight-get") == 4
+    assert tracker.percentile("insight-get", 50) == 2.0
+    assert tracker.percentile("insight-get", 95) == 4.0
+
+
+def test_delay_waits_for_enough_samples():
+    hedger = Hedger(HedgingOptions(min_samples=2, min_delay=0.1))
+    hedger.latencies.observe("insight-get", 0.01)
+    assert hedger.delay("insight-get") is None
+
+    hedger.latencies.observe("insight-get", 0.02)
+    # Faster tools are hedged no sooner than min_delay
+    assert hedger.delay("insight-get") == 0.1
+
+
+def test_budget_is_a_token_bucket():
+    hedger = Hedger(HedgingOptions(budget=0.5, max_burst=2))
+    assert hedger.try_spend()
+    assert hedger.try_spend()
+    assert not hedger.try_spend()
+
+    hedger.delay("insight-get")
+    assert not hedger.try_spend()
+    hedger.delay("insight-get")
+    assert hedger.try_spend()
+
+    # Credits saved up while no hedge is sent stop at max_burst
+    for _ in range(10):
+        hedger.delay("insight-get")
+    assert [hedger.try_spend() for _ in range(3)] == [True, True, False]
+
+
+async def test_hedge_stops_the_slower_request_before_returning(server):
+    options = HedgingOptions(min_samples=2, min_delay=0.1)
+    async with PostHogAgentToolkit(url=server.url, personal_api_key="phx_test", hedging=options) as toolkit:
+        for insight in ("a", "b"):
+            await toolkit.call_tool("insight-get", {"insightId": insight})
+
+        server.delays["insight-get"] = [5.0]
+        result = await toolkit.call_tool("insight-get", {"insightId": "c"})
+
+        # Both sessions were returned, the slower one after the server was told to stop its request
+        assert toolkit.sessions_in_use == 0
+        assert toolkit._pool.size == 2
+        assert "Signups" in result
+        assert server.calls_of("insight-get")[-2:] == [{"insightId": "c"}, {"insightId": "c"}]
+
+        for _ in range(100):
+            if server.cancelled:
+                break
+            await asyncio.sleep(0.01)
+        assert server.cancelled == ["insight-get"]
+
+
+async def test_no_hedge_once_the_budget_is_spent(server):
+    options = HedgingOptions(min_samples=1, min_delay=0.1, budget=0, max_burst=0)
+    async with PostHogAgentToolkit(url=server.url, personal_api_key="phx_test", hedging=options) as toolkit:
+        await toolkit.call_tool("insight-get", {"insightId": "a"})
+        server.delays["insight-get"] = [0.3]
+        await toolkit.call_tool("insight-get", {"insightId": "b"})
+
+    assert server.calls_of("insight-get") == [{"insightId": "a"}, {"insightId": "b"}]
+
+
+@pytest.mark.parametrize("tool, arguments", [("update-feature-flag", {"flagKey": "new-checkout", "data": {"active": False}})])
+async def test_writes_are_never_hedged(server, tool, arguments):
+    options = HedgingOptions(min_samples=0, min_delay=0.01)
+    async with PostHogAgentToolkit(url=server.url, personal_api_key="phx_test", hedging=options) as toolkit:
+        server.delays[tool] = [0.2]
+        await toolkit.call_tool(tool, arguments)
+
+    assert len(server.calls_of(tool)) == 1
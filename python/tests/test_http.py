@@ -0,0 +1,69 @@
+import gzip
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+
+from posthog_agent_toolkit.http import shared_client_factory
+
+DATA = [b'{"results": [' + b"1, " * 5000 + b"1]}", b"event: message\ndata: {}\n\n"]
+
+
+class Chunks(httpx.AsyncByteStream):
+    """Yields a body a few bytes at a time, so frames and members span several chunks."""
+
+    def __init__(self, body: bytes, size: int = 7):
+        self.body = body
+        self.size = size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.body), self.size):
+            yield self.body[start : start + self.size]
+
+
+def zstd_frames(*parts: bytes) -> bytes:
+    zstandard = pytest.importorskip("zstandard")
+    return b"".join(zstandard.ZstdCompressor().compress(part) for part in parts)
+
+
+def gzip_members(*parts: bytes) -> bytes:
+    return b"".join(gzip.compress(part) for part in parts)
+
+
+async def fetch(body: bytes, encoding: str) -> tuple[httpx.Response, list[tuple[str, int, int]], httpx.Request]:
+    requests: list[httpx.Request] = []
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, headers={"Content-Encoding": encoding}, stream=Chunks(body))
+
+    observed: list[tuple[str, int, int]] = []
+    async with httpx.AsyncClient(transport=httpx.MockTransport(respond)) as shared:
+        factory = shared_client_factory(shared, (encoding,), lambda *sizes: observed.append(sizes))
+        async with factory() as client:
+            response = await client.get("http://posthog.test/mcp")
+            await response.aread()
+    return response, observed, requests[0]
+
+
+@pytest.mark.parametrize("compress, encoding", [(gzip_members, "gzip"), (zstd_frames, "zstd")])
+async def test_decodes_every_frame_of_a_response(compress, encoding):
+    body = compress(*DATA)
+    response, observed, request = await fetch(body, encoding)
+
+    assert response.content == b"".join(DATA)
+    assert "content-encoding" not in response.headers
+    assert request.headers["Accept-Encoding"] == encoding
+    assert observed == [(encoding, len(body), len(b"".join(DATA)))]
+
+
+@pytest.mark.parametrize("compress, encoding", [(gzip_members, "gzip"), (zstd_frames, "zstd")])
+async def test_rejects_a_response_that_ends_mid_frame(compress, encoding):
+    body = compress(*DATA)
+    with pytest.raises(httpx.DecodingError):
+        await fetch(body[:-10], encoding)
+
+
+async def test_rejects_a_corrupt_response():
+    with pytest.raises(httpx.DecodingError):
+        await fetch(b"not gzip at all", "gzip")
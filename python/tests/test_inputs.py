@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip("msgspec")
+
+from langchain_core.tools import ToolException  # noqa: E402
+
+from posthog_agent_toolkit.inputs import validate_arguments, validates  # noqa: E402
+from posthog_agent_toolkit.integrations.langchain.toolkit import PostHogAgentToolkit  # noqa: E402
+from posthog_agent_toolkit.metrics import NoopMetricsSink  # noqa: E402
+
+
+class SizeRecorder(NoopMetricsSink):
+    def __init__(self):
+        self.sizes: list[tuple[str, int]] = []
+
+    def observe_request_size(self, tool: str, category: str, num_bytes: int) -> None:
+        self.sizes.append((tool, num_bytes))
+
+
+def test_checks_arguments_against_the_input_schema():
+    validate_arguments("dashboard-get", {"dashboardId": 42})
+    with pytest.raises(ValueError, match="dashboard-get"):
+        validate_arguments("dashboard-get", {"dashboardId": "forty-two"})
+    with pytest.raises(ValueError, match="unknown field"):
+        validate_arguments("dashboard-get", {"dashboardId": 42, "extra": True})
+
+
+def test_leaves_unsupported_schemas_to_the_server():
+    assert not validates("query-run")
+    validate_arguments("query-run", {"query": "not an object"})
+
+
+async def test_invalid_arguments_never_reach_the_server(server):
+    async with PostHogAgentToolkit(url=server.url, personal_api_key="phx_test", validate_arguments=True) as toolkit:
+        with pytest.raises(ToolException, match="insight-get"):
+            await toolkit.call_tool("insight-get", {"insightId": 42})
+    assert not server.calls_of("insight-get")
+
+
+async def test_records_the_size_of_the_request_sent(server):
+    metrics = SizeRecorder()
+    async with PostHogAgentToolkit(url=server.url, personal_api_key="phx_test", metrics=metrics, validate_arguments=True) as toolkit:
+        await toolkit.call_tool("insight-get", {"insightId": "abc"})
+        await toolkit.call_tool("insight-get", {"insightId": "abcdef"})
+
+    (first_tool, first), (_, second) = metrics.sizes
+    assert first_tool == "insight-get"
+    # The whole JSON-RPC request, of which the arguments are a part
+    assert second - first == 3
+    assert first > len('{"insightId": "abc"}')
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from posthog_agent_toolkit.invalidation import Invalidation, invalidations_for
+
+
+def by_feature(invalidations: list[Invalidation]) -> dict[str, Invalidation]:
+    return {invalidation.feature: invalidation for invalidation in invalidations}
+
+
+def test_reads_make_nothing_stale():
+    assert invalidations_for("feature-flag-get-all", {}) == []
+    assert invalidations_for("switch-project", {"projectId": 2}) == []
+
+
+def test_write_names_the_entity_it_changed():
+    result = json.dumps({"id": 1, "key": "new-checkout", "active": False})
+    (invalidation,) = invalidations_for("update-feature-flag", {"flagKey": "new-checkout", "data": {"active": False}}, result)
+
+    assert invalidation.ids == {"flagKey": frozenset({"new-checkout"}), "flagId": frozenset({"1"})}
+    assert invalidation.covers("feature-flag-get-definition", {"flagId": 1})
+    assert not invalidation.covers("feature-flag-get-definition", {"flagKey": "old-checkout"})
+    # Listings include every flag
+    assert invalidation.covers("feature-flag-get-all", {})
+    assert not invalidation.covers("dashboards-get-all", {})
+
+
+def test_insight_delete_makes_every_dashboard_stale():
+    invalidations = by_feature(invalidations_for("insight-delete", {"insightId": "abc"}))
+    assert invalidations["dashboards"].ids is None
+    assert invalidations["insights"].covers("insight-get", {"insightId": "abc"})
+
+
+@pytest.mark.parametrize(
+    "tool, arguments",
+    [
+        ("survey-create", {"name": "NPS", "questions": [], "targeting_flag_filters": {"groups": []}}),
+        ("survey-update", {"surveyId": "s1", "targeting_flag_filters": {"groups": []}}),
+        ("survey-update", {"surveyId": "s1", "end_date": "2026-10-01T00:00:00Z"}),
+        ("experiment-update", {"experimentId": 3, "data": {"launch": True}}),
+        ("experiment-update", {"experimentId": 3, "data": {"conclude": "won"}}),
+    ],
+)
+def test_writes_that_change_a_linked_flag_make_flags_stale(tool, arguments):
+    invalidations = by_feature(invalidations_for(tool, arguments))
+    assert invalidations["flags"].covers("feature-flag-get-all", {})
+
+
+@pytest.mark.parametrize(
+    "tool, arguments",
+    [
+        ("survey-create", {"name": "NPS", "questions": []}),
+        ("survey-update", {"surveyId": "s1", "name": "NPS"}),
+        ("experiment-update", {"experimentId": 3, "data": {"name": "Checkout", "launch": False}}),
+    ],
+)
+def test_other_writes_leave_flags_cached(tool, arguments):
+    assert "flags" not in by_feature(invalidations_for(tool, arguments))
@@ -0,0 +1,41 @@
+import asyncio
+
+from posthog_agent_toolkit.integrations.langchain.manager import ToolkitManager
+from posthog_agent_toolkit.scheduling import Scheduler
+
+
+async def test_keeps_one_toolkit_per_api_key(server):
+    async with ToolkitManager(url=server.url) as manager:
+        first = await manager.get_toolkit("phx_a")
+        assert await manager.get_toolkit("phx_a") is first
+        assert await manager.get_toolkit("phx_b") is not first
+        assert len(manager) == 2
+
+
+async def test_evicts_least_recently_used_idle_toolkit(server):
+    async with ToolkitManager(url=server.url, max_size=2) as manager:
+        a = await manager.get_toolkit("phx_a")
+        await manager.get_toolkit("phx_b")
+        await manager.get_toolkit("phx_a")
+        await manager.get_toolkit("phx_c")
+
+        assert len(manager) == 2
+        assert await manager.get_toolkit("phx_a") is a
+
+
+async def test_keeps_toolkit_whose_call_waits_for_the_scheduler(server):
+    scheduler = Scheduler(capacity=1, costs={"slow": 1})
+    async with ToolkitManager(url=server.url, max_size=1, scheduler=scheduler) as manager:
+        b = await manager.get_toolkit("phx_b")
+        running = asyncio.create_task(b.call_tool("slow", {"seconds": 0.3}))
+        while not server.calls_of("slow"):
+            await asyncio.sleep(0.01)
+
+        # A's call holds no session while it waits for B's to finish
+        a = await manager.get_toolkit("phx_a")
+        queued = asyncio.create_task(a.call_tool("slow", {"seconds": 0}))
+        await asyncio.sleep(0.05)
+        assert a.sessions_in_use == 0
+        await manager.get_toolkit("phx_c")
+
+        assert await asyncio.gather(running, queued) == ["done", "done"]
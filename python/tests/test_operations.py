@@ -0,0 +1,35 @@
+from posthog_agent_toolkit.operations import equals, matches
+
+CHECKOUT_GROUPS = [{"properties": [], "rollout_percentage": 50}]
+
+
+def test_matches_ignores_fields_the_server_adds():
+    assert matches({"id": 1, "name": "Signups", "tags": ["a"]}, {"name": "Signups"})
+    assert matches({"name": "Signups"}, {"description": None})
+    assert not matches({"tags": ["a", "b"]}, {"tags": ["a"]})
+    assert not matches({"active": 1}, {"active": True})
+
+
+def test_equals_requires_the_same_keys():
+    assert equals({"groups": CHECKOUT_GROUPS}, {"groups": CHECKOUT_GROUPS})
+    assert not equals({"groups": CHECKOUT_GROUPS, "payloads": {}}, {"groups": CHECKOUT_GROUPS})
+    assert not equals([{"a": 1, "b": 2}], [{"a": 1}])
+    assert not equals(1, True)
+
+
+async def test_update_replaces_filters_that_leave_out_keys(toolkit, server):
+    report = await toolkit.update_feature_flags({"new-checkout": {"filters": {"groups": CHECKOUT_GROUPS}, "tags": ["checkout"]}})
+
+    assert report["flags"]["new-checkout"]["status"] == "updated"
+    assert set(report["flags"]["new-checkout"]["changes"]) == {"filters"}
+    # The payloads were removed, and the tags, which already matched, were not sent
+    assert server.calls_of("update-feature-flag") == [{"flagKey": "new-checkout", "data": {"filters": {"groups": CHECKOUT_GROUPS}}}]
+    assert server.flags["new-checkout"]["filters"] == {"groups": CHECKOUT_GROUPS}
+
+
+async def test_update_skips_flags_already_up_to_date(toolkit, server):
+    filters = server.flags["new-checkout"]["filters"]
+    report = await toolkit.update_feature_flags({"new-checkout": {"filters": filters, "active": True}, "missing": {"active": False}})
+
+    assert report["counts"] == {"unchanged": 1, "not_found": 1}
+    assert not server.calls_of("update-feature-flag")
@@ -0,0 +1,34 @@
+from posthog_agent_toolkit.integrations.langchain.toolkit import PostHogAgentToolkit
+from posthog_agent_toolkit.profiling import Phase, ToolCall, ToolCallHooks
+
+
+class Recorder(ToolCallHooks):
+    def __init__(self):
+        self.calls: list[ToolCall] = []
+
+    def on_call_end(self, call: ToolCall) -> None:
+        self.calls.append(call)
+
+
+async def test_reports_the_phases_of_each_call(server):
+    recorder = Recorder()
+    async with PostHogAgentToolkit(url=server.url, personal_api_key="phx_test", hooks=[recorder]) as toolkit:
+        await toolkit.call_tool("whoami")
+        await toolkit.call_tool("whoami")
+
+    first, second = recorder.calls
+    assert {Phase.POOL_ACQUIRE, Phase.HANDSHAKE, Phase.SERVER, Phase.TRANSFER, Phase.DECODE} <= first.phases.keys()
+    # The second call reuses the session
+    assert Phase.HANDSHAKE not in second.phases
+    assert first.duration is not None and first.error is None
+
+
+async def test_server_phase_is_the_wait_for_the_tool_call(json_server):
+    recorder = Recorder()
+    async with PostHogAgentToolkit(url=json_server.url, personal_api_key="phx_test", hooks=[recorder]) as toolkit:
+        # The first call of a session is followed by a tools/list that validates its result
+        await toolkit.call_tool("slow", {"seconds": 0.3})
+        await toolkit.call_tool("slow", {"seconds": 0.3})
+
+    for call in recorder.calls:
+        assert call.phases[Phase.SERVER] >= 0.3
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+pytest.importorskip("msgspec")
+
+from posthog_agent_toolkit.results import Insight, Series, decode_result, to_builtins  # noqa: E402
+
+
+def test_decodes_trends_and_sql_rows():
+    trends = [{"label": "signup", "data": [1, 2], "days": ["2026-10-01", "2026-10-02"], "count": 3}]
+    (series,) = decode_result("query-run", json.dumps(trends))
+    assert isinstance(series, Series)
+    assert series.days == ["2026-10-01", "2026-10-02"]
+
+    assert decode_result("query-run", '[[1, "a"], [2, "b"]]') == [[1, "a"], [2, "b"]]
+
+
+def test_decodes_days_of_stickiness_as_numbers():
+    (series,) = decode_result("query-run", json.dumps([{"label": "signup", "data": [5, 2], "days": [1, 2]}]))
+    assert series.days == [1, 2]
+
+
+def test_decodes_results_that_are_an_object():
+    time_to_convert = {"bins": [[60, 4], [120, 1]], "average_conversion_time": 75.5}
+    assert decode_result("query-run", json.dumps(time_to_convert)) == time_to_convert
+
+
+def test_skips_undeclared_fields():
+    insight = decode_result("insight-get", json.dumps({"id": 1, "short_id": "abc", "name": "Signups", "is_sample": False}))
+    assert isinstance(insight, Insight)
+    assert insight.name == "Signups"
+    assert "is_sample" not in to_builtins(insight)
+
+
+def test_rejects_results_of_the_wrong_shape():
+    with pytest.raises(ValueError):
+        decode_result("insight-get", json.dumps({"name": "No ID"}))
+    with pytest.raises(ValueError, match="no result type"):
+        decode_result("projects-get", "[]")
+
+
+async def test_toolkit_decodes_query_results(toolkit):
+    assert await toolkit.call_tool_typed("query-run", {"query": {"kind": "HogQLQuery", "query": "select 1"}}) == {"results": [[1]]}
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from posthog_agent_toolkit.scheduling import Priority, Scheduler, SchedulerOverloadedError, current_lane, lane
+
+
+async def hold(scheduler: Scheduler, tenant: str, release: asyncio.Event, priority: str | None = None, cost: float = 1.0) -> None:
+    async with scheduler.slot(tenant, cost, priority):
+        await release.wait()
+
+
+async def admit(scheduler: Scheduler, tenant: str, order: list[str], priority: str | None = None, cost: float = 1.0) -> None:
+    async with scheduler.slot(tenant, cost, priority):
+        order.append(tenant)
+        await asyncio.sleep(0)
+
+
+async def admission_order(scheduler: Scheduler, calls: list[tuple[str, str | None]]) -> list[str]:
+    """Queue the calls behind one that takes the whole capacity, then release it."""
+    release = asyncio.Event()
+    blocker = asyncio.create_task(hold(scheduler, "blocker", release, cost=scheduler.capacity))
+    await asyncio.sleep(0)
+
+    order: list[str] = []
+    tasks = [asyncio.create_task(admit(scheduler, tenant, order, priority)) for tenant, priority in calls]
+    await asyncio.sleep(0)
+    assert scheduler.queued == len(calls)
+
+    release.set()
+    await asyncio.gather(blocker, *tasks)
+    return order
+
+
+async def test_tenants_take_turns_however_many_calls_they_queue():
+    scheduler = Scheduler(capacity=1)
+    order = await admission_order(scheduler, [("a", None)] * 4 + [("b", None)] * 2)
+    assert order == ["a", "b", "a", "b", "a", "a"]
+
+
+async def test_weight_gives_a_tenant_a_larger_share():
+    scheduler = Scheduler(capacity=1)
+    scheduler.set_weight("a", 2)
+    order = await admission_order(scheduler, [("a", None)] * 4 + [("b", None)] * 4)
+    assert order[:3].count("a") == 2
+    assert order[:6].count("a") == 4
+
+
+async def test_interactive_calls_never_wait_behind_batch_calls():
+    scheduler = Scheduler(capacity=1)
+    with lane(Priority.BATCH):
+        assert current_lane() == Priority.BATCH
+        order = await admission_order(scheduler, [("batch", None), ("batch", None), ("interactive", Priority.INTERACTIVE)])
+    assert order == ["interactive", "batch", "batch"]
+
+
+async def test_batch_calls_leave_part_of_the_capacity_to_interactive_ones():
+    scheduler = Scheduler(capacity=4, batch_share=0.5)
+    release = asyncio.Event()
+    batch = [asyncio.create_task(hold(scheduler, "job", release, Priority.BATCH)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert (scheduler.running, scheduler.queued) == (2, 1)
+
+    order: list[str] = []
+    await admit(scheduler, "chat", order, Priority.INTERACTIVE)
+    assert order == ["chat"]
+
+    release.set()
+    await asyncio.gather(*batch)
+    assert (scheduler.running, scheduler.queued, scheduler.in_flight) == (0, 0, 0)
+
+
+async def test_rejects_calls_once_the_queue_is_full():
+    scheduler = Scheduler(capacity=1, max_queue=1)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(scheduler, "a", release))
+    queued = asyncio.create_task(hold(scheduler, "a", release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(SchedulerOverloadedError):
+        await hold(scheduler, "b", release)
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+
+async def test_cancelled_call_leaves_the_queue():
+    scheduler = Scheduler(capacity=1)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(scheduler, "a", release))
+    queued = asyncio.create_task(hold(scheduler, "b", release))
+    await asyncio.sleep(0)
+    assert scheduler.queued == 1
+
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+    assert scheduler.queued == 0
+
+    release.set()
+    await running
+    assert scheduler.running == 0
+
+
+async def test_max_in_flight_limits_the_calls_of_a_tenant():
+    scheduler = Scheduler(capacity=4)
+    release = asyncio.Event()
+
+    async def limited() -> None:
+        async with scheduler.slot("a", 1, max_in_flight=1):
+            await release.wait()
+
+    calls = [asyncio.create_task(limited()) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert (scheduler.running, scheduler.queued) == (1, 1)
+
+    release.set()
+    await asyncio.gather(*calls)
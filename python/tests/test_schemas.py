@@ -0,0 +1,30 @@
+import pytest
+
+from posthog_agent_toolkit.schemas import SchemaCompaction, compact_schema
+
+
+def schema_with_default(default):
+    return {"type": "object", "properties": {"value": {"type": ["number", "boolean", "string", "array", "object", "null"], "default": default}}}
+
+
+@pytest.mark.parametrize("default", [None, False, "", [], {}])
+def test_strips_empty_defaults(default):
+    assert "default" not in compact_schema(schema_with_default(default))["properties"]["value"]
+
+
+@pytest.mark.parametrize("default", [0, 0.0, True, 1, "0", [0], {"a": 0}])
+def test_keeps_defaults_that_are_not_empty(default):
+    value = compact_schema(schema_with_default(default))["properties"]["value"]
+    assert value["default"] == default
+    assert type(value["default"]) is type(default)
+
+
+def test_strips_defaults_of_required_properties():
+    schema = {"type": "object", "properties": {"limit": {"type": "integer", "default": 100}}, "required": ["limit"]}
+    assert compact_schema(schema)["properties"]["limit"] == {"type": "integer"}
+    assert compact_schema(schema, SchemaCompaction(strip_defaults=False))["properties"]["limit"]["default"] == 100
+
+
+def test_turns_unions_of_constants_into_an_enum():
+    schema = {"type": "object", "properties": {"kind": {"anyOf": [{"type": "string", "const": "a"}, {"type": "string", "const": "b"}]}}}
+    assert compact_schema(schema)["properties"]["kind"] == {"type": "string", "enum": ["a", "b"]}
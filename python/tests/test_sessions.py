@@ -0,0 +1,117 @@
+import asyncio
+
+import httpx
+import pytest
+
+from posthog_agent_toolkit.sessions import SessionPool
+
+
+class SlowTransport(httpx.AsyncHTTPTransport):
+    """Delays every request, so tests can act while a session is being opened."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.delay)
+        return await super().handle_async_request(request)
+
+
+def connection(url: str, delay: float | None = None) -> dict:
+    config = {"url": url, "transport": "streamable_http", "headers": {"Authorization": "Bearer phx_test"}}
+    if delay is not None:
+        config["httpx_client_factory"] = lambda headers=None, timeout=None, auth=None: httpx.AsyncClient(
+            transport=SlowTransport(delay), headers=headers, timeout=timeout, auth=auth
+        )
+    return config
+
+
+def session_tasks() -> list[asyncio.Task]:
+    return [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == "SessionPool._run" and not task.done()]
+
+
+async def test_reuses_idle_sessions(server):
+    pool = SessionPool(connection(server.url))
+    async with pool.acquire() as first:
+        assert first.handshake_duration is not None
+        await first.call_tool("whoami", {})
+    async with pool.acquire() as second:
+        assert second is first
+        assert second.handshake_duration is None
+    assert pool.size == 1
+    await pool.aclose()
+
+
+async def test_opens_a_session_per_concurrent_call(server):
+    pool = SessionPool(connection(server.url), max_size=2)
+
+    async def call() -> None:
+        async with pool.acquire() as pooled:
+            await pooled.call_tool("slow", {"seconds": 0.1})
+
+    await asyncio.gather(call(), call(), call())
+    assert pool.size == 2
+    assert pool.in_use == 0
+    await pool.aclose()
+
+
+async def test_close_closes_idle_sessions(server):
+    pool = SessionPool(connection(server.url))
+    async with pool.acquire() as pooled:
+        pass
+    await pool.aclose()
+
+    assert not pooled.alive
+    with pytest.raises(RuntimeError):
+        async with pool.acquire():
+            pass
+
+
+async def test_closes_session_when_call_is_cancelled_during_handshake(server):
+    pool = SessionPool(connection(server.url, delay=0.2))
+
+    async def call() -> None:
+        async with pool.acquire():
+            pass
+
+    task = asyncio.create_task(call())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The session was never handed out, so nothing may keep it open
+    assert session_tasks() == []
+    assert pool.size == 0
+    await pool.aclose()
+
+
+async def test_cancelled_call_is_stopped_on_the_server(server):
+    pool = SessionPool(connection(server.url))
+    started = asyncio.Event()
+
+    async def call() -> None:
+        async with pool.acquire() as pooled:
+            started.set()
+            await pooled.call_tool("slow", {"seconds": 5})
+
+    task = asyncio.create_task(call())
+    await started.wait()
+    while not server.calls_of("slow"):
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    for _ in range(100):
+        if server.cancelled:
+            break
+        await asyncio.sleep(0.01)
+    assert server.cancelled == ["slow"]
+    # The server was told to stop the call, so the session can be reused
+    assert pool.size == 1
+    async with pool.acquire() as pooled:
+        result = await pooled.call_tool("slow", {"seconds": 0})
+    assert not result.isError
+    await pool.aclose()